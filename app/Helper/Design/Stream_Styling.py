@@ -7,6 +7,8 @@ import sys
 import time
 from typing import Any
 
+from ..ticks import Tick
+
 # ── Colors ──────────────────────────────────────────────────────────────────
 USE_COLOR = True
 USE_UNICODE = True
@@ -73,10 +75,14 @@ class RateMeter:
 # ── Row renderers ───────────────────────────────────────────────────────────
 def fmt_tick(e: Any) -> str:
     """Format tick event for display."""
-    sym = str(get(e, "symbol", "?")).upper()
-    bid = get(e, "bid", None)
-    ask = get(e, "ask", None)
-    time_obj = get(e, "time", None)
+    if type(e) is Tick:
+        # decoded tick: plain slot reads, no hasattr/getattr probing
+        sym, bid, ask, time_obj = e.symbol.upper(), e.bid, e.ask, e.time_msc // 1000
+    else:
+        sym = str(get(e, "symbol", "?")).upper()
+        bid = get(e, "bid", None)
+        ask = get(e, "ask", None)
+        time_obj = get(e, "time", None)
 
     # Handle time as protobuf object or string
     if time_obj and hasattr(time_obj, "seconds"):
@@ -0,0 +1,284 @@
+# app/bar_engine.py
+from __future__ import annotations
+import logging
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .symbols import norm_symbol
+
+
+# Timeframe -> bar length in milliseconds (all divide a UTC day, so buckets align to midnight)
+TIMEFRAME_MS = {
+    "M1": 60_000,
+    "M5": 300_000,
+    "M15": 900_000,
+    "M30": 1_800_000,
+    "H1": 3_600_000,
+    "H4": 14_400_000,
+    "D1": 86_400_000,
+}
+DEFAULT_TIMEFRAMES = ("M1", "M5", "M15", "H1", "H4", "D1")
+
+
+class BarClose:
+    """Bar-close event: one finished bar of `symbol` on `timeframe` (time = bar open, epoch ms)."""
+
+    __slots__ = ("symbol", "timeframe", "time", "open", "high", "low", "close", "volume", "spread")
+
+    def __init__(self, symbol: str, timeframe: str, row: Tuple) -> None:
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.time, self.open, self.high, self.low, self.close, self.volume, self.spread = row
+
+    def as_dict(self) -> dict:
+        return {"time": self.time, "open": self.open, "high": self.high, "low": self.low,
+                "close": self.close, "volume": self.volume, "spread": self.spread}
+
+    def __repr__(self) -> str:
+        return (f"BarClose({self.symbol!r}, {self.timeframe}, time={self.time}, o={self.open}, "
+                f"h={self.high}, l={self.low}, c={self.close}, v={self.volume})")
+
+
+class BarRing:
+    """
+    Fixed-capacity ring of bars for one symbol and timeframe, stored column-wise in
+    preallocated arrays. The newest slot is the bar currently forming.
+    """
+
+    __slots__ = ("tf_ms", "capacity", "t", "o", "h", "l", "c", "v", "spr_sum", "head", "size", "late")
+
+    def __init__(self, tf_ms: int, capacity: int) -> None:
+        self.tf_ms = tf_ms
+        self.capacity = capacity
+        self.t = array("q", bytes(8 * capacity))       # bar open time, epoch ms
+        self.o = array("d", bytes(8 * capacity))
+        self.h = array("d", bytes(8 * capacity))
+        self.l = array("d", bytes(8 * capacity))
+        self.c = array("d", bytes(8 * capacity))
+        self.v = array("q", bytes(8 * capacity))       # ticks (live) or tick_volume (history)
+        self.spr_sum = array("d", bytes(8 * capacity))  # sum of spreads; avg = spr_sum / v
+        self.head = -1      # slot of the newest bar
+        self.size = 0
+        self.late = 0       # ticks older than the forming bar (ignored)
+
+    def _row(self, i: int) -> Tuple:
+        v = self.v[i]
+        return (self.t[i], self.o[i], self.h[i], self.l[i], self.c[i], v, self.spr_sum[i] / v if v else 0.0)
+
+    def last_time(self) -> Optional[int]:
+        return self.t[self.head] if self.size else None
+
+    def push(self, t: int, o: float, h: float, l: float, c: float, v: int, spr_sum: float) -> None:
+        i = self.head = (self.head + 1) % self.capacity
+        self.t[i], self.o[i], self.h[i], self.l[i], self.c[i] = t, o, h, l, c
+        self.v[i], self.spr_sum[i] = v, spr_sum
+        if self.size < self.capacity:
+            self.size += 1
+
+    def update(self, time_ms: int, price: float, spread: float) -> Optional[Tuple]:
+        """Applies one tick; returns the row of the bar it closed, if any."""
+        bucket = time_ms - time_ms % self.tf_ms
+        i = self.head
+        if self.size:
+            cur = self.t[i]
+            if bucket == cur:
+                if price > self.h[i]:
+                    self.h[i] = price
+                elif price < self.l[i]:
+                    self.l[i] = price
+                self.c[i] = price
+                self.v[i] += 1
+                self.spr_sum[i] += spread
+                return None
+            if bucket < cur:
+                self.late += 1
+                return None
+            closed = self._row(i)
+        else:
+            closed = None
+        self.push(bucket, price, price, price, price, 1, spread)
+        return closed
+
+    def close_due(self, now_ms: int) -> Optional[Tuple]:
+        """Returns the forming bar's row if its period ended before `now_ms` (it stays in the ring)."""
+        if self.size and self.t[self.head] + self.tf_ms <= now_ms:
+            return self._row(self.head)
+        return None
+
+    def rows(self, count: Optional[int] = None, include_open: bool = True) -> List[Tuple]:
+        """Newest `count` bars, oldest first; O(count)."""
+        n = self.size if include_open else self.size - 1
+        if count is not None:
+            n = min(n, max(0, count))
+        if n <= 0:
+            return []
+        last = self.head if include_open else (self.head - 1) % self.capacity
+        start = (last - n + 1) % self.capacity
+        return [self._row((start + k) % self.capacity) for k in range(n)]
+
+
+class BarEngine:
+    """
+    Incremental OHLC bars for many symbols and timeframes, fed tick by tick.
+
+    Bars are built from the bid, like MT4's own history bars that seed() loads, so live bars
+    continue history without a half-spread jump; `volume` counts ticks and `spread` is the
+    average spread.
+    """
+
+    def __init__(
+        self,
+        timeframes: Iterable[str] = DEFAULT_TIMEFRAMES,
+        capacity: int = 500,
+        log: Optional[logging.Logger] = None,
+    ) -> None:
+        self.timeframes = tuple(tf.upper() for tf in timeframes)
+        for tf in self.timeframes:
+            if tf not in TIMEFRAME_MS:
+                raise ValueError(f"Unsupported timeframe: {tf}")
+        self.capacity = max(2, int(capacity))
+        self.log = log or logging.getLogger("MT4Sugar.BarEngine")
+        self._rings: Dict[str, Dict[str, BarRing]] = {}      # symbol -> tf -> ring
+        self._listeners: List[Callable[[BarClose], Any]] = []
+        self._emitted: Dict[Tuple[str, str], int] = {}       # last bar time announced per (symbol, tf)
+        self._now_ms = 0            # latest server time seen on any symbol
+        self._sweep_ms = 0          # next minute boundary at which quiet symbols are checked
+        # stats
+        self.ticks = 0
+        self.closed = 0
+
+    # --- setup ---
+    def _rings_for(self, symbol: str) -> Dict[str, BarRing]:
+        rings = self._rings.get(symbol)
+        if rings is None:
+            rings = self._rings[symbol] = {tf: BarRing(TIMEFRAME_MS[tf], self.capacity) for tf in self.timeframes}
+        return rings
+
+    def on_bar_close(self, callback: Callable[[BarClose], Any]) -> Callable[[], None]:
+        """Registers callback(BarClose); returns a function that unregisters it."""
+        self._listeners.append(callback)
+        return lambda: self._listeners.remove(callback) if callback in self._listeners else None
+
+    def seed(self, symbol: str, timeframe: str, bars: Iterable[dict]) -> int:
+        """
+        Replaces the bars of one symbol/timeframe with history (dicts with time in epoch ms,
+        open, high, low, close and optionally volume/spread), oldest first. The newest bar
+        keeps forming from live ticks. Returns the number of bars kept.
+        """
+        key, tf = norm_symbol(symbol), timeframe.upper()
+        if tf not in self.timeframes:
+            raise ValueError(f"Timeframe {tf} is not built by this engine ({', '.join(self.timeframes)})")
+        ring = BarRing(TIMEFRAME_MS[tf], self.capacity)
+        for b in bars:
+            v = int(b.get("volume") or 0)
+            spread = float(b.get("spread") or 0.0)
+            ring.push(int(b["time"]), float(b["open"]), float(b["high"]), float(b["low"]),
+                      float(b["close"]), v, spread * v)
+        self._rings_for(key)[tf] = ring
+        if ring.size:
+            # history bars are not announced again; the forming one will be
+            self._emitted[(key, tf)] = ring.t[(ring.head - 1) % ring.capacity] if ring.size > 1 else ring.t[ring.head] - ring.tf_ms
+        return ring.size
+
+    # --- feed ---
+    def update(self, symbol: str, time_ms: int, bid: float, ask: float) -> None:
+        """Applies one tick to every timeframe of `symbol`."""
+        self.ticks += 1
+        key = norm_symbol(symbol)
+        spread = ask - bid
+        for tf, ring in self._rings_for(key).items():
+            row = ring.update(time_ms, bid, spread)
+            if row is not None:
+                self._emit(key, tf, row)
+        if time_ms > self._now_ms:
+            self._now_ms = time_ms
+            if time_ms >= self._sweep_ms:
+                self._sweep_ms = time_ms - time_ms % 60_000 + 60_000
+                self.close_due(time_ms)
+
+    def update_tick(self, tick: Any) -> None:
+        """Applies a Tick (app.Helper.ticks) or OnSymbolTickData / TickEvent."""
+        t = getattr(tick, "symbol_tick", None)
+        if t is None:
+            self.update(tick.symbol, tick.time_msc, tick.bid, tick.ask)
+            return
+        ms = t.time_msc or (t.time.seconds * 1000 + t.time.nanos // 1_000_000)
+        self.update(t.symbol, ms, t.bid, t.ask)
+
+    def close_due(self, now_ms: Optional[int] = None) -> None:
+        """Announces bars whose period has ended even though their symbol hasn't ticked since."""
+        now_ms = self._now_ms if now_ms is None else now_ms
+        for key, rings in self._rings.items():
+            for tf, ring in rings.items():
+                row = ring.close_due(now_ms)
+                if row is not None:
+                    self._emit(key, tf, row)
+
+    def _emit(self, symbol: str, tf: str, row: Tuple) -> None:
+        if self._emitted.get((symbol, tf), -1) >= row[0]:
+            return   # already announced by close_due()
+        self._emitted[(symbol, tf)] = row[0]
+        self.closed += 1
+        if not self._listeners:
+            return
+        ev = BarClose(symbol, tf, row)
+        for cb in list(self._listeners):
+            try:
+                cb(ev)
+            except Exception as ex:
+                self.log.error("bar close callback failed: %s", ex, exc_info=False)
+
+    # --- reads ---
+    def has(self, symbol: str, timeframe: str) -> bool:
+        rings = self._rings.get(norm_symbol(symbol))
+        return rings is not None and rings.get(timeframe.upper()) is not None and rings[timeframe.upper()].size > 0
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        rings = self._rings.get(norm_symbol(symbol))
+        ring = rings.get(timeframe.upper()) if rings else None
+        return ring.size if ring is not None else 0
+
+    def bars(self, symbol: str, timeframe: str, count: Optional[int] = None, *, include_open: bool = True) -> List[dict]:
+        """Newest `count` bars (oldest first) as dicts; the last one is still forming unless include_open=False."""
+        rings = self._rings.get(norm_symbol(symbol))
+        ring = rings.get(timeframe.upper()) if rings else None
+        if ring is None:
+            return []
+        return [
+            {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v, "spread": s}
+            for t, o, h, l, c, v, s in ring.rows(count, include_open)
+        ]
+
+    def symbols(self) -> List[str]:
+        return list(self._rings)
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._rings),
+            "timeframes": list(self.timeframes),
+            "capacity": self.capacity,
+            "ticks": self.ticks,
+            "bars_closed": self.closed,
+            "late_ticks": sum(r.late for rings in self._rings.values() for r in rings.values()),
+        }
+
+
+"""
+BarEngine keeps rolling OHLC bars in memory, updated tick by tick, so bar reads don't
+re-download and re-aggregate history.
+
+- One BarRing per (symbol, timeframe): preallocated column arrays (time/open/high/low/close/
+  volume/spread) used as a ring of `capacity` bars. A tick touches one slot per timeframe.
+- Bars use the bid (what MT4 history bars are built from); buckets are aligned to epoch milliseconds (UTC midnight for D1).
+  Ticks older than the forming bar are counted as late and ignored.
+- Bar-close events (BarClose) fire when the first tick of the next bar arrives, or, for quiet
+  symbols, once the server clock seen on any symbol passes the bar's end (checked every minute).
+- seed() loads server history first, so bars() has depth immediately; live ticks continue the
+  newest bar.
+- bars(symbol, tf, count) is O(count).
+
+Used by MT4Sugar.bars() and MT4Sugar.bar_engine:
+    eng = sugar.bar_engine
+    eng.on_bar_close(lambda b: print(b.symbol, b.timeframe, b.close))
+    await sugar.bars("EURUSD", "M5", count=100)      # first call seeds from history + starts the feed
+    eng.bars("EURUSD", "H1", 24)                     # from memory
+"""
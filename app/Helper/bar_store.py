@@ -0,0 +1,320 @@
+# app/bar_store.py
+from __future__ import annotations
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from package.MetaRpcMT4 import mt4_term_api_market_info_pb2 as market_info_pb2
+from .symbols import norm_symbol
+
+try:
+    import numpy as np  # optional: only needed for history_to_array()/rows_to_array()
+except ImportError:
+    np = None
+
+
+# Bar length per timeframe in ms (W1/MN1: upper bounds, only used to decide what may still change)
+TF_MS = {
+    "M1": 60_000,
+    "M5": 300_000,
+    "M15": 900_000,
+    "M30": 1_800_000,
+    "H1": 3_600_000,
+    "H4": 14_400_000,
+    "D1": 86_400_000,
+    "W1": 604_800_000,
+    "MN1": 2_678_400_000,
+}
+
+# (time ms, open, high, low, close, tick_volume, real_volume, spread in points)
+Row = Tuple[int, float, float, float, float, int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL, tf TEXT NOT NULL, time INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    tick_volume INTEGER, real_volume INTEGER, spread INTEGER,
+    PRIMARY KEY (symbol, tf, time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL, tf TEXT NOT NULL, from_ms INTEGER NOT NULL, to_ms INTEGER NOT NULL,
+    PRIMARY KEY (symbol, tf)
+);
+"""
+
+
+def dt_to_ms(dt: datetime) -> int:
+    """Naive datetimes are UTC (what quote_history takes)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def ms_to_dt(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).replace(tzinfo=None)
+
+
+# numpy structured layout of a bar series (48 bytes per bar)
+BAR_DTYPE = (
+    np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<i8")])
+    if np is not None else None
+)
+# staging layouts: one flat tuple per bar converts in a single np.array() call
+_QUOTE_DTYPE = (
+    np.dtype([("s", "<i8"), ("ns", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<i8")])
+    if np is not None else None
+)
+_ROW_DTYPE = (
+    np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+              ("volume", "<i8"), ("real_volume", "<i8"), ("spread", "<i8")])
+    if np is not None else None
+)
+
+
+def history_to_array(data: Any) -> Any:
+    """QuoteHistoryData -> BAR_DTYPE array (time = bar open, epoch ms; volume = tick_volume), sorted by time."""
+    if np is None:
+        raise ImportError("history_to_array() requires numpy (pip install numpy)")
+    quotes = getattr(data, "historical_quotes", None) or []
+    # each protobuf field is read once, into a tuple (about half the cost of a dict per bar)
+    staged = np.array(
+        [(t.seconds, t.nanos, q.open, q.high, q.low, q.close, q.tick_volume) for q in quotes for t in (q.time,)],
+        dtype=_QUOTE_DTYPE,
+    )
+    arr = np.empty(len(staged), dtype=BAR_DTYPE)
+    arr["time"] = staged["s"] * 1000 + staged["ns"] // 1_000_000
+    for name in ("open", "high", "low", "close", "volume"):
+        arr[name] = staged[name]
+    if len(arr) > 1 and (arr["time"][1:] < arr["time"][:-1]).any():
+        arr = arr[np.argsort(arr["time"], kind="stable")]
+    return arr
+
+
+def rows_to_array(rows: List[Row]) -> Any:
+    """BarStore rows -> BAR_DTYPE array."""
+    if np is None:
+        raise ImportError("rows_to_array() requires numpy (pip install numpy)")
+    return np.array(rows, dtype=_ROW_DTYPE)[list(BAR_DTYPE.names)].astype(BAR_DTYPE)
+
+
+class BarStore:
+    """
+    Persistent bar cache (sqlite) in front of quote_history, keyed by symbol and timeframe.
+
+    For each key the store remembers one contiguous time range it holds completely; a request
+    downloads only the part before (head) and after (tail) that range, upserts the bars and
+    answers from disk. The newest tf-length window (on the broker's clock: bar times are
+    server time) is never marked complete, so the forming bar is re-read on the next top-up.
+
+    Every sqlite statement runs on one dedicated thread, so reads and upserts of thousands of
+    bars don't hold up the event loop (tick delivery) and never interleave with each other;
+    rows(), coverage() and invalidate() are coroutines for that reason.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetch: Callable[[str, str, datetime, datetime], Awaitable[Any]],
+        log: Optional[logging.Logger] = None,
+        server_now: Optional[Callable[[str], Awaitable[int]]] = None,
+    ) -> None:
+        """
+        Args:
+            path: sqlite file (":memory:" for a process-local cache).
+            fetch: async fetch(symbol, timeframe, since, until) -> QuoteHistoryData (naive UTC datetimes).
+            server_now: async server_now(symbol) -> the broker's current time in epoch ms, the
+                clock bar times use. Defaults to the local UTC clock (right for GMT+0 brokers only).
+        """
+        self.path = path
+        self._fetch = fetch
+        self._server_now = server_now
+        self.log = log or logging.getLogger("MT4Service.BarStore")
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        # one thread owns the statements issued by history(): sqlite work in order, off the loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bar-store")
+        self._closed = False
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # stats
+        self.requests = 0
+        self.hits = 0            # answered from disk without any download
+        self.fetches = 0         # quote_history calls made
+        self.bars_fetched = 0
+        self._counts: Dict[Tuple[str, str], int] = {}   # bars stored per key, kept by the store thread
+        self._recount(None)
+
+    # --- reads ---
+    async def history(self, symbol: str, timeframe: str, since_ms: int, until_ms: int) -> List[Row]:
+        """Bars with since_ms <= open time < until_ms, oldest first; downloads only what is missing."""
+        key = (norm_symbol(symbol), timeframe.upper())
+        if key[1] not in TF_MS:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        self.requests += 1
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:
+            now = await self._now(key[0])
+            end = min(until_ms, now)            # nothing exists past now (server time)
+            cov = await self._run(self._coverage, key)
+            if cov is None:
+                gaps = [(since_ms, end)]
+            else:
+                gaps = [(since_ms, cov[0]), (cov[1], end)]
+            gaps = [(a, b) for a, b in gaps if b > a]
+            if not gaps:
+                self.hits += 1
+            for a, b in gaps:
+                await self._fill(key, a, b, now)
+        return await self._run(self._rows, key, since_ms, until_ms)
+
+    async def rows(self, symbol: str, timeframe: str, since_ms: int, until_ms: int) -> List[Row]:
+        """Stored bars only (no download)."""
+        return await self._run(self._rows, (norm_symbol(symbol), timeframe.upper()), since_ms, until_ms)
+
+    async def coverage(self, symbol: str, timeframe: str) -> Optional[Tuple[int, int]]:
+        """(from_ms, to_ms) held completely for this key, or None."""
+        return await self._run(self._coverage, (norm_symbol(symbol), timeframe.upper()))
+
+    async def _now(self, symbol: str) -> int:
+        if self._server_now is None:
+            return int(time.time() * 1000)
+        return await self._server_now(symbol)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # --- store thread ---
+    def _rows(self, key: Tuple[str, str], since_ms: int, until_ms: int) -> List[Row]:
+        return self._db.execute(
+            "SELECT time, open, high, low, close, tick_volume, real_volume, spread FROM bars "
+            "WHERE symbol = ? AND tf = ? AND time >= ? AND time < ? ORDER BY time",
+            (*key, since_ms, until_ms),
+        ).fetchall()
+
+    def _coverage(self, key: Tuple[str, str]) -> Optional[Tuple[int, int]]:
+        row = self._db.execute("SELECT from_ms, to_ms FROM coverage WHERE symbol = ? AND tf = ?", key).fetchone()
+        return (row[0], row[1]) if row else None
+
+    # --- writes ---
+    async def _fill(self, key: Tuple[str, str], a: int, b: int, now: int) -> None:
+        data = await self._fetch(key[0], key[1], ms_to_dt(a), ms_to_dt(b))
+        self.fetches += 1
+        self.bars_fetched += await self._run(self._store, key, data, a, b, now)
+
+    def _store(self, key: Tuple[str, str], data: Any, a: int, b: int, now: int) -> int:
+        """Upserts one downloaded range and extends the coverage (store thread); returns bars."""
+        symbol, tf = key
+        rows = [
+            (symbol, tf, q.time.seconds * 1000 + q.time.nanos // 1_000_000,
+             q.open, q.high, q.low, q.close, q.tick_volume, q.real_volume, q.spread)
+            for q in getattr(data, "historical_quotes", None) or []
+        ]
+        cov = self._coverage(key)
+        lo = a if cov is None else min(cov[0], a)
+        # the last tf window may still gain or change bars: keep it outside the covered range
+        hi = min(b, now - TF_MS[tf])
+        if cov is not None:
+            hi = max(cov[1], hi)
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if hi > lo:
+                self._db.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)", (symbol, tf, lo, hi))
+        self._recount(key)
+        return len(rows)
+
+    def _recount(self, key: Optional[Tuple[str, str]]) -> None:
+        """Refreshes the per-key bar counts stats() reports (one key, or all of them)."""
+        if key is None:
+            self._counts = {(sym, tf): n for sym, tf, n in self._db.execute(
+                "SELECT symbol, tf, COUNT(*) FROM bars GROUP BY symbol, tf")}
+        else:
+            self._counts[key] = self._db.execute(
+                "SELECT COUNT(*) FROM bars WHERE symbol = ? AND tf = ?", key).fetchone()[0]
+
+    async def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """Forgets stored bars (all, one symbol, or one symbol/timeframe)."""
+        where, args = "", ()
+        if symbol is not None:
+            where, args = " WHERE symbol = ?", (norm_symbol(symbol),)
+            if timeframe is not None:
+                where, args = where + " AND tf = ?", args + (timeframe.upper(),)
+        await self._run(self._delete, where, args)
+
+    def _delete(self, where: str, args: tuple) -> None:
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM bars" + where, args)
+            self._db.execute("DELETE FROM coverage" + where, args)
+        self._recount(None)
+
+    # --- helpers ---
+    @staticmethod
+    def to_reply(symbol: str, rows: List[Row]) -> Any:
+        """Rows -> QuoteHistoryData, the shape quote_history returns."""
+        out = market_info_pb2.QuoteHistoryData()
+        for i, (t, o, h, l, c, tv, rv, spr) in enumerate(rows):
+            q = out.historical_quotes.add()
+            q.symbol = symbol
+            q.index = i
+            q.time.FromMilliseconds(t)
+            q.open, q.high, q.low, q.close = o, h, l, c
+            q.tick_volume, q.real_volume, q.spread = tv, rv, spr
+        return out
+
+    async def close(self) -> None:
+        """Waits for queued statements, then closes the database."""
+        if self._closed:
+            return
+        self._closed = True
+        await self._run(self._db.close)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        counts = list(self._counts.values())
+        return {
+            "path": self.path,
+            "keys": sum(1 for n in counts if n),
+            "bars": sum(counts),
+            "requests": self.requests,
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "bars_fetched": self.bars_fetched,
+        }
+
+
+"""
+BarStore keeps downloaded history on disk so repeated and restarted history reads only
+top up what is new.
+
+- One sqlite table of bars (symbol, tf, open time) with upsert, so overlapping downloads merge
+  without duplicates, plus one covered range (from_ms, to_ms) per symbol/timeframe.
+- history(symbol, tf, since_ms, until_ms) fetches [since, covered_from) and [covered_to, until)
+  when they are not empty, then serves the range from disk. Ranges stay contiguous, so the
+  coverage check is two comparisons.
+- The last timeframe window before now is never counted as covered: the forming bar (and a
+  bar the server hasn't produced yet) is fetched again on the next call and replaced.
+- WAL journal with synchronous=NORMAL: commits don't fsync, reads don't block writes.
+- All sqlite work (coverage check, upserts, range SELECT, invalidate) runs on one dedicated
+  thread, so large top-ups don't stall the event loop and statements never interleave;
+  stats() reports counts that thread keeps.
+- "Now" is the broker's clock (server_now), the time base of bar open times: the window end
+  and the forming-bar exclusion are right for brokers ahead of or behind UTC.
+- Broker history corrections are not detected; await invalidate() drops a key.
+
+Used by MT4Service(bar_store="data/bars.sqlite"): quote_history() answers from the store and
+returns the usual QuoteHistoryData, so MT4Sugar.bars()/ticks() and ATR/session helpers that
+read history go through it too. quote_history_array() turns rows (or a reply) into a numpy
+BAR_DTYPE array column by column.
+    svc = MT4Service(acc, bar_store="data/bars.sqlite")
+    await svc.quote_history("EURUSD", timeframe="H1", limit=500)   # full download once
+    await svc.quote_history("EURUSD", timeframe="H1", limit=500)   # only the newest bar(s)
+    svc.bar_store.stats()
+"""
@@ -0,0 +1,258 @@
+# app/history_downloader.py
+from __future__ import annotations
+import asyncio
+import itertools
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import grpc
+
+from package.MetaRpcMT4 import mt4_term_api_market_info_pb2 as market_info_pb2
+from .bar_store import TF_MS, dt_to_ms, ms_to_dt
+from .rate_limit import RateLimiter
+
+
+def _tf_pair(timeframe: Union[str, int]) -> Tuple[str, int]:
+    """"H1" / "QH_PERIOD_H1" / enum value -> ("H1", enum value)."""
+    enum = market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME
+    if isinstance(timeframe, int):
+        return enum.Name(timeframe)[len("QH_PERIOD_"):], timeframe
+    name = str(timeframe).strip().upper()
+    name = name[len("QH_PERIOD_"):] if name.startswith("QH_PERIOD_") else name
+    if name not in TF_MS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return name, enum.Value("QH_PERIOD_" + name)
+
+
+def _retryable(ex: BaseException) -> bool:
+    """Transport failures and timeouts are retried; API errors (bad symbol, ...) are final."""
+    return isinstance(ex, (grpc.aio.AioRpcError, asyncio.TimeoutError, ConnectionError))
+
+
+class _Chunk:
+    __slots__ = ("symbol", "tf", "since_ms", "until_ms", "attempt", "future")
+
+    def __init__(self, symbol: str, tf: int, since_ms: int, until_ms: int, future: asyncio.Future) -> None:
+        self.symbol = symbol
+        self.tf = tf
+        self.since_ms = since_ms
+        self.until_ms = until_ms
+        self.attempt = 0
+        self.future = future
+
+
+class HistoryDownloader:
+    """
+    Splits long quote_history ranges into timeframe-sized chunks and downloads them with a
+    bounded pool of workers, a rate limit and per-chunk retries.
+
+    Chunks wait in one priority queue shared by every download (lower priority value first,
+    then submission order), so a high-priority symbol is not stuck behind a bulk backfill.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, int, datetime, datetime], Awaitable[Any]],
+        *,
+        max_concurrency: int = 4,
+        per_second: float = 0.0,
+        chunk_bars: int = 5000,
+        chunk_timeout_s: float = 30.0,
+        max_retries: int = 3,
+        retry_backoff_s: float = 0.5,
+        log: Optional[logging.Logger] = None,
+    ) -> None:
+        """
+        Args:
+            fetch: MT4Account.quote_history-compatible: fetch(symbol, timeframe_enum, from, to).
+            max_concurrency: Chunks in flight at once (over all downloads).
+            per_second: Max chunk requests started per second (0 = unlimited).
+            chunk_bars: Bars per chunk; a chunk spans chunk_bars * timeframe.
+            chunk_timeout_s: Per-request timeout; a timed-out chunk is retried.
+            max_retries: Extra attempts per chunk (exponential backoff from retry_backoff_s).
+        """
+        self._fetch = fetch
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.chunk_bars = max(1, int(chunk_bars))
+        self.chunk_timeout_s = chunk_timeout_s
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff_s = retry_backoff_s
+        self.log = log or logging.getLogger("MT4Service.HistoryDownloader")
+        self._limiter = RateLimiter(per_second)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._inflight = 0
+        # stats
+        self.downloads = 0
+        self.chunks = 0
+        self.retries = 0
+        self.failures = 0
+        self.bars = 0
+
+    # --- planning ---
+    def plan(self, timeframe: Union[str, int], since_ms: int, until_ms: int) -> List[Tuple[int, int]]:
+        """[since, until) cut at multiples of chunk_bars bars (epoch-aligned), in order."""
+        span = self.chunk_bars * TF_MS[_tf_pair(timeframe)[0]]
+        out, a = [], since_ms
+        while a < until_ms:
+            b = min(until_ms, a - a % span + span)
+            out.append((a, b))
+            a = b
+        return out
+
+    # --- downloads ---
+    async def download(
+        self,
+        symbol: str,
+        timeframe: Union[str, int],
+        since: datetime,
+        until: datetime,
+        *,
+        priority: int = 0,
+    ) -> Any:
+        """One symbol's range as a single QuoteHistoryData, oldest first, without duplicate bars."""
+        tf_name, tf = _tf_pair(timeframe)
+        self._ensure_workers()
+        self.downloads += 1
+        loop = asyncio.get_running_loop()
+        chunks = [
+            _Chunk(symbol, tf, a, b, loop.create_future())
+            for a, b in self.plan(tf_name, dt_to_ms(since), dt_to_ms(until))
+        ]
+        for c in chunks:
+            self._queue.put_nowait((priority, next(self._seq), c))
+        try:
+            parts = await asyncio.gather(*(c.future for c in chunks))
+        except BaseException:
+            for c in chunks:
+                c.future.cancel()     # queued siblings are skipped by the workers
+            raise
+        return self._assemble(parts)
+
+    async def download_many(
+        self,
+        symbols: Union[Sequence[str], Mapping[str, int]],
+        timeframe: Union[str, int],
+        since: datetime,
+        until: datetime,
+        *,
+        return_exceptions: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Several symbols at once. A mapping gives each symbol's priority; for a sequence the
+        position is the priority (first symbol first). Returns {symbol: QuoteHistoryData}.
+        """
+        prio = dict(symbols) if isinstance(symbols, Mapping) else {s: i for i, s in enumerate(symbols)}
+        names = list(prio)
+        results = await asyncio.gather(
+            *(self.download(s, timeframe, since, until, priority=prio[s]) for s in names),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(names, results))
+
+    @staticmethod
+    def _assemble(parts: List[Any]) -> Any:
+        out = market_info_pb2.QuoteHistoryData()
+        last = None
+        for data in parts:
+            quotes = getattr(data, "historical_quotes", None) or []
+            for q in sorted(quotes, key=lambda q: (q.time.seconds, q.time.nanos)):
+                t = (q.time.seconds, q.time.nanos)
+                if last is not None and t <= last:
+                    continue          # chunk edges overlap by one bar
+                last = t
+                dst = out.historical_quotes.add()
+                dst.CopyFrom(q)
+                dst.index = len(out.historical_quotes) - 1
+        return out
+
+    # --- workers ---
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.max_concurrency:
+            self._workers.append(asyncio.ensure_future(self._worker()))
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            priority, seq, c = await queue.get()
+            if c.future.done():
+                continue              # download already failed or was cancelled
+            await self._limiter.acquire()
+            self._inflight += 1
+            try:
+                data = await asyncio.wait_for(
+                    self._fetch(c.symbol, c.tf, ms_to_dt(c.since_ms), ms_to_dt(c.until_ms)),
+                    self.chunk_timeout_s,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                if c.attempt < self.max_retries and _retryable(ex) and not c.future.done():
+                    c.attempt += 1
+                    self.retries += 1
+                    delay = self.retry_backoff_s * (2 ** (c.attempt - 1))
+                    reason = ex.code().name if isinstance(ex, grpc.aio.AioRpcError) else type(ex).__name__
+                    self.log.warning("history chunk %s %s-%s failed (%s), retry %d in %.1fs",
+                                     c.symbol, c.since_ms, c.until_ms, reason, c.attempt, delay)
+                    # back into the queue with its original priority/order, after the backoff
+                    asyncio.get_running_loop().call_later(delay, queue.put_nowait, (priority, seq, c))
+                else:
+                    self.failures += 1
+                    if not c.future.done():
+                        c.future.set_exception(ex)
+            else:
+                self.chunks += 1
+                self.bars += len(getattr(data, "historical_quotes", None) or [])
+                if not c.future.done():
+                    c.future.set_result(data)
+            finally:
+                self._inflight -= 1
+
+    async def close(self) -> None:
+        workers, self._workers = self._workers, []
+        for w in workers:
+            w.cancel()
+        for w in workers:
+            try:
+                await w
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "downloads": self.downloads,
+            "chunks": self.chunks,
+            "retries": self.retries,
+            "failures": self.failures,
+            "bars": self.bars,
+            "inflight": self._inflight,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+"""
+HistoryDownloader turns one long quote_history request into many small ones.
+
+- plan(): the range is cut at epoch-aligned multiples of chunk_bars * timeframe, so chunk
+  sizes (and reply message sizes) stay bounded whatever the range.
+- Chunks of all downloads share one priority queue drained by max_concurrency workers; an
+  optional RateLimiter (per_second) spaces request starts.
+- Each chunk has its own timeout and retries (transport errors/timeouts only, exponential
+  backoff); a chunk that fails for good fails its download and the siblings still queued are
+  skipped.
+- Results are reassembled in time order, bars on chunk edges deduplicated and `index`
+  renumbered, into one QuoteHistoryData.
+- download_many(): several symbols concurrently, prioritized by mapping value or list order.
+
+Used by MT4Service.quote_history() for windows above chunk_bars bars and by the bar store's
+top-up downloads:
+    dl = svc.history_downloader
+    d = await dl.download("EURUSD", "M1", since, until)
+    many = await dl.download_many({"EURUSD": 0, "XAUUSD": 0, "USDJPY": 5}, "M5", since, until)
+    dl.stats()
+"""
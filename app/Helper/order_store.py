@@ -0,0 +1,305 @@
+# app/order_store.py
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from package.MetaRpcMT4 import mt4_term_api_account_helper_pb2 as account_helper_pb2
+from .symbols import norm_symbol
+
+
+# OnTradeOrderInfo field -> OpenedOrderInfo field (only where the names differ)
+_EVENT_FIELD_MAP = {
+    "commission": "commision",
+    "expiration": "expiration_time",
+    "order_profit": "profit",
+    "type": "order_type",
+}
+_OPENED_FIELDS = frozenset(f.name for f in account_helper_pb2.OpenedOrderInfo.DESCRIPTOR.fields)
+
+
+def opened_from_event(info: Any) -> Any:
+    """Converts an OnTradeOrderInfo into the OpenedOrderInfo shape opened_orders() returns."""
+    out = account_helper_pb2.OpenedOrderInfo()
+    for field, value in info.ListFields():
+        name = _EVENT_FIELD_MAP.get(field.name, field.name)
+        if name not in _OPENED_FIELDS:
+            continue
+        if field.message_type is not None:
+            getattr(out, name).CopyFrom(value)
+        else:
+            setattr(out, name, value)
+    return out
+
+
+class OrderStore:
+    """
+    Local mirror of the account's opened orders (market + pending), indexed by ticket,
+    symbol and magic number.
+
+    Seeded once from opened_orders(), kept current from on_trade() events and reconciled
+    against opened_orders() periodically and after our own order operations.
+    """
+
+    def __init__(
+        self,
+        fetch_opened: Callable[[], Awaitable[Any]],
+        trade_events: Callable[[], Any],
+        reconcile_s: float = 30.0,
+        log: Optional[logging.Logger] = None,
+    ) -> None:
+        self._fetch_opened = fetch_opened
+        self._trade_events = trade_events
+        self.reconcile_s = max(0.0, float(reconcile_s))
+        self.log = log or logging.getLogger("MT4Service.OrderStore")
+
+        self._by_ticket: Dict[int, Any] = {}
+        self._by_symbol: Dict[str, Set[int]] = {}
+        self._by_magic: Dict[int, Set[int]] = {}
+
+        self._started: Optional[asyncio.Future] = None
+        self._tasks: List[asyncio.Task] = []
+        self._syncing: Optional[asyncio.Future] = None
+        self._buffer: Optional[list] = None        # events received while a snapshot is loading
+        self._dirty = False
+        self._waiters: Set[asyncio.Future] = set()
+        self.updated_at: Optional[float] = None
+
+        # stats
+        self.events = 0          # on_trade events applied
+        self.reconciles = 0      # snapshots loaded (seed included)
+        self.corrections = 0     # orders a reconcile had to add/remove/replace
+        self.stream_errors = 0
+
+    # --- lifecycle ---
+    async def start(self) -> None:
+        """Seeds the mirror and starts the event and reconcile tasks (idempotent)."""
+        if self._started is None:
+            self._started = asyncio.ensure_future(self._start())
+        await asyncio.shield(self._started)
+
+    async def _start(self) -> None:
+        # subscribe first, so nothing between the snapshot and the first event is missed
+        self._buffer = []
+        self._tasks.append(asyncio.ensure_future(self._pump()))
+        try:
+            await self._sync()
+        except BaseException:
+            self._started = None
+            await self._cancel_tasks()
+            raise
+        if self.reconcile_s > 0:
+            self._tasks.append(asyncio.ensure_future(self._reconcile_loop()))
+
+    async def close(self) -> None:
+        self._started = None
+        await self._cancel_tasks()
+
+    async def _cancel_tasks(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        for t in tasks:
+            try:
+                await t
+            except asyncio.CancelledError:
+                pass
+
+    def mark_dirty(self) -> None:
+        """Our own order operation just ran: the next read waits for a fresh snapshot."""
+        self._dirty = True
+
+    async def _ready(self) -> None:
+        await self.start()
+        if self._dirty:
+            await self.reconcile()
+
+    # --- snapshot / reconcile ---
+    async def reconcile(self) -> None:
+        """Reloads opened_orders() and replaces the mirror; concurrent callers share one RPC."""
+        if self._syncing is None:
+            self._syncing = asyncio.ensure_future(self._sync())
+            self._syncing.add_done_callback(self._sync_done)
+        await asyncio.shield(self._syncing)
+
+    def _sync_done(self, fut: asyncio.Future) -> None:
+        self._syncing = None
+        if not fut.cancelled():
+            fut.exception()
+
+    async def _sync(self) -> None:
+        self._dirty = False
+        if self._buffer is None:
+            self._buffer = []
+        try:
+            data = await self._fetch_opened()
+        except BaseException:
+            self._dirty = True   # still stale: the next read or wait_for tries again
+            self._replay()
+            raise
+        fresh = {int(o.ticket): o for o in getattr(data, "order_infos", None) or []}
+        if self.reconciles:
+            for t in set(fresh) | set(self._by_ticket):
+                if fresh.get(t) != self._by_ticket.get(t):
+                    self.corrections += 1
+        self.reconciles += 1
+        self._by_ticket = {}
+        self._by_symbol = {}
+        self._by_magic = {}
+        for o in fresh.values():
+            self._index(o)
+        # events that raced with the snapshot are re-applied in order on top of it
+        self._replay()
+        self._changed()
+
+    def _replay(self) -> None:
+        buffered, self._buffer = self._buffer, None
+        for data in buffered or []:
+            self._apply(data)
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_s)
+            try:
+                await self.reconcile()
+            except Exception as ex:
+                self.log.error("opened orders reconcile failed: %s", ex, exc_info=False)
+
+    # --- events ---
+    async def _pump(self) -> None:
+        while True:
+            try:
+                async for data in self._trade_events():
+                    if self._buffer is not None:
+                        self._buffer.append(data)
+                    else:
+                        self._apply(data)
+                        self._changed()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.stream_errors += 1
+                self.log.error("on_trade stream failed: %s", ex, exc_info=False)
+            # events may have been lost: resync on the next read and wake wait_for() callers
+            # now, so they reconcile instead of sleeping until the next periodic one
+            self._dirty = True
+            self._wake()
+            await asyncio.sleep(1.0)   # then resubscribe
+
+    def _apply(self, data: Any) -> None:
+        ev = getattr(data, "event_data", None)
+        if ev is None:
+            return
+        self.events += 1
+        for info in ev.removed_orders:
+            self._unindex(int(info.ticket))
+        for info in ev.new_orders:
+            self._put(opened_from_event(info))
+        for upd in ev.updated_orders:
+            self._put(opened_from_event(upd.current))
+
+    def _put(self, o: Any) -> None:
+        self._unindex(int(o.ticket))
+        self._index(o)
+
+    def _index(self, o: Any) -> None:
+        t = int(o.ticket)
+        self._by_ticket[t] = o
+        self._by_symbol.setdefault(norm_symbol(o.symbol), set()).add(t)
+        self._by_magic.setdefault(int(o.magic_number), set()).add(t)
+
+    def _unindex(self, ticket: int) -> None:
+        o = self._by_ticket.pop(ticket, None)
+        if o is None:
+            return
+        for index, key in ((self._by_symbol, norm_symbol(o.symbol)), (self._by_magic, int(o.magic_number))):
+            group = index.get(key)
+            if group is not None:
+                group.discard(ticket)
+                if not group:
+                    del index[key]
+
+    def _changed(self) -> None:
+        self.updated_at = time.monotonic()
+        self._wake()
+
+    def _wake(self) -> None:
+        waiters, self._waiters = self._waiters, set()
+        for w in waiters:
+            if not w.done():
+                w.set_result(None)
+
+    # --- reads ---
+    async def get(self, ticket: int) -> Optional[Any]:
+        await self._ready()
+        return self._by_ticket.get(int(ticket))
+
+    async def orders(self, *, symbol: Optional[str] = None, magic: Optional[int] = None) -> List[Any]:
+        """Opened orders, optionally filtered by symbol and/or magic (index lookups)."""
+        await self._ready()
+        tickets: Optional[Iterable[int]] = None
+        if symbol is not None:
+            tickets = self._by_symbol.get(norm_symbol(symbol), set())
+        if magic is not None:
+            by_magic = self._by_magic.get(int(magic), set())
+            tickets = by_magic if tickets is None else (set(tickets) & by_magic)
+        if tickets is None:
+            return list(self._by_ticket.values())
+        return [self._by_ticket[t] for t in sorted(tickets)]
+
+    async def wait_for(self, predicate: Callable[[], Any], timeout_s: Optional[float] = None) -> Any:
+        """Waits until predicate() is truthy, re-checking after every change; returns its value."""
+        await self._ready()
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        while True:
+            if self._dirty:
+                await self.reconcile()
+            res = predicate()
+            if res:
+                return res
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError()
+            w = asyncio.get_running_loop().create_future()
+            self._waiters.add(w)
+            try:
+                await asyncio.wait_for(w, remaining)
+            finally:
+                self._waiters.discard(w)
+
+    def peek(self, ticket: int) -> Optional[Any]:
+        """Mirror lookup without waiting for start/reconcile."""
+        return self._by_ticket.get(int(ticket))
+
+    def stats(self) -> dict:
+        return {
+            "orders": len(self._by_ticket),
+            "symbols": len(self._by_symbol),
+            "live": bool(self._started is not None and self._started.done() and not self._started.exception()),
+            "events": self.events,
+            "reconciles": self.reconciles,
+            "corrections": self.corrections,
+            "stream_errors": self.stream_errors,
+            "age_s": None if self.updated_at is None else round(time.monotonic() - self.updated_at, 3),
+        }
+
+
+"""
+OrderStore answers "which orders are open?" from memory.
+
+- start(): subscribes to on_trade, then loads opened_orders() once; events that arrive while
+  the snapshot loads are re-applied on top of it, in order.
+- on_trade events (new / updated / removed orders) update the mirror immediately; event
+  records are converted to OpenedOrderInfo so readers always see the opened_orders() shape.
+- reconcile() reloads the snapshot: every reconcile_s seconds, after the event stream failed,
+  and before the next read after our own order operation (mark_dirty(), called by MT4Service).
+- wait_for(predicate) wakes on every change, so fill/close detection has event latency
+  instead of polling latency.
+
+Used by MT4Service.order_store and the order helpers of MT4Sugar:
+    o = await svc.order_store.get(ticket)
+    eurusd = await svc.order_store.orders(symbol="EURUSD", magic=42)
+    await svc.order_store.wait_for(lambda: svc.order_store.peek(ticket) is None, timeout_s=30)
+    svc.order_store.stats()
+"""
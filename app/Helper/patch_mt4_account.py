@@ -46,8 +46,8 @@ def apply_patch() -> None:
 
     _orig_init = MT4Account.__init__
 
-    def _patched_init(self, user: int, password: str, grpc_server: Optional[str] = None, id_: Optional[str] = None):
-        _orig_init(self, user=user, password=password, grpc_server=grpc_server, id_=id_)
+    def _patched_init(self, user: int, password: str, grpc_server: Optional[str] = None, id_: Optional[str] = None, **kwargs):
+        _orig_init(self, user=user, password=password, grpc_server=grpc_server, id_=id_, **kwargs)
 
         # Ensure connection stub exists (name is stable)
         try:
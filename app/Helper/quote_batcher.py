@@ -0,0 +1,132 @@
+# app/quote_batcher.py
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .symbols import norm_symbol
+
+
+class QuoteBatcher:
+    """Coalesces concurrent single-symbol quote requests into one QuoteMany RPC."""
+
+    def __init__(
+        self,
+        fetch_one: Callable[[str], Awaitable[Any]],
+        fetch_many: Callable[[List[str]], Awaitable[Any]],
+        window_ms: float = 1.0,
+        max_batch: int = 64,
+    ) -> None:
+        self._fetch_one = fetch_one
+        self._fetch_many = fetch_many
+        self.window_s = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}   # normalized -> (name as first asked, future)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        # stats
+        self.requests = 0        # quote() calls
+        self.coalesced = 0       # calls that joined an already pending symbol
+        self.rpcs_many = 0       # QuoteMany RPCs sent
+        self.rpcs_one = 0        # single Quote RPCs sent (lone symbol or fallback)
+        self.fallbacks = 0       # symbols re-fetched one by one after a failed/partial batch
+
+    async def quote(self, symbol: str) -> Any:
+        """Returns the quote for `symbol`, sharing one RPC with concurrent callers."""
+        self.requests += 1
+        key = norm_symbol(symbol)
+        slot = self._pending.get(key)
+        if slot is not None:
+            self.coalesced += 1
+            fut = slot[1]
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[key] = (symbol, fut)
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window_s, self._flush)
+        # shield: one cancelled caller must not cancel the result other callers wait on
+        return await asyncio.shield(fut)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, Tuple[str, asyncio.Future]]) -> None:
+        if len(batch) == 1:
+            (symbol, fut), = batch.values()
+            await self._resolve_one(symbol, fut)
+            return
+
+        try:
+            self.rpcs_many += 1
+            data = await self._fetch_many([symbol for symbol, _ in batch.values()])
+        except Exception:
+            # one bad symbol can fail the whole QuoteMany: give every caller its own answer
+            data = None
+
+        by_name: Dict[str, Any] = {}
+        for q in getattr(data, "quotes", None) or []:
+            by_name[q.symbol] = q
+            by_name.setdefault(norm_symbol(q.symbol), q)
+
+        missing = []
+        for symbol, fut in batch.values():
+            q = by_name.get(symbol) or by_name.get(norm_symbol(symbol))
+            if q is None:
+                missing.append((symbol, fut))
+            elif not fut.done():
+                fut.set_result(q)
+
+        if missing:
+            self.fallbacks += len(missing)
+            await asyncio.gather(*(self._resolve_one(s, f) for s, f in missing))
+
+    async def _resolve_one(self, symbol: str, fut: asyncio.Future) -> None:
+        try:
+            self.rpcs_one += 1
+            res = await self._fetch_one(symbol)
+        except BaseException as ex:
+            if not fut.done():
+                fut.set_exception(ex)
+            if not isinstance(ex, Exception):
+                raise
+        else:
+            if not fut.done():
+                fut.set_result(res)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window_s * 1000.0,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "rpcs_many": self.rpcs_many,
+            "rpcs_one": self.rpcs_one,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
+
+
+"""
+QuoteBatcher merges single-symbol quote() calls that arrive within a short window
+(default 1 ms) into one QuoteMany RPC and hands each caller its own QuoteData.
+
+- Same symbol requested twice in one window -> one slot, both callers get the same quote
+  ("eurusd" and "EURUSD." share it too: slots are keyed by norm_symbol()).
+- Only one symbol in the window -> a plain Quote RPC is sent (no QuoteMany overhead).
+- max_batch pending symbols -> the batch is flushed immediately, without waiting for the timer.
+- QuoteMany failed or returned no row for a symbol -> that symbol is re-fetched with Quote,
+  so callers see exactly the result/exception a direct quote() would give.
+- A cancelled caller doesn't cancel the shared RPC.
+
+Used by MT4Service when created with quote_batch_window_ms=..., e.g.
+    svc = MT4Service(acc, quote_batch_window_ms=1.5)
+    q = await svc.quote("EURUSD")      # transparently batched with concurrent callers
+    svc.quote_batch_stats()            # {'requests': ..., 'rpcs_many': ..., 'coalesced': ...}
+"""
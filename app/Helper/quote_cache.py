@@ -0,0 +1,163 @@
+# app/quote_cache.py
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+from .symbols import norm_symbol
+
+
+class CachedQuote:
+    """Last known bid/ask of one symbol; `received` is the local monotonic receipt time."""
+
+    __slots__ = ("symbol", "bid", "ask", "time", "received", "source")
+
+    def __init__(self, symbol: str, bid: float, ask: float, time_: Any, received: float, source: str) -> None:
+        self.symbol = symbol
+        self.bid = bid
+        self.ask = ask
+        self.time = time_          # server time as delivered (pb Timestamp / datetime)
+        self.received = received
+        self.source = source       # "stream" | "rpc"
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2.0
+
+    def age_s(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.received
+
+    def __repr__(self) -> str:
+        return f"CachedQuote({self.symbol!r}, bid={self.bid}, ask={self.ask}, source={self.source!r})"
+
+
+class QuoteCache:
+    """Per-symbol last-value cache fed by the shared tick stream (and by RPC fallbacks)."""
+
+    def __init__(self, hub: Optional[Any] = None, max_age_ms: float = 1000.0, log: Optional[logging.Logger] = None) -> None:
+        self._hub = hub
+        self.max_age_s = max(0.0, float(max_age_ms)) / 1000.0
+        self.log = log or logging.getLogger("MT4Sugar.QuoteCache")
+        self._quotes: Dict[str, CachedQuote] = {}
+        self._watched: Dict[str, str] = {}    # normalized -> name as requested
+        self._sub: Optional[Any] = None
+        self._pump: Optional[asyncio.Task] = None
+        # stats
+        self.hits = 0             # fresh value served from memory
+        self.misses = 0           # absent or older than the allowed staleness
+        self.stream_updates = 0
+        self.rpc_updates = 0
+
+    # --- reads ---
+    def get(self, symbol: str, max_age_ms: Optional[float] = None) -> Optional[CachedQuote]:
+        """Cached quote if it is at most `max_age_ms` old (default: the cache's max_age_ms), else None."""
+        q = self._quotes.get(norm_symbol(symbol))
+        max_age = self.max_age_s if max_age_ms is None else max_age_ms / 1000.0
+        if q is None or time.monotonic() - q.received > max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return q
+
+    def peek(self, symbol: str) -> Optional[CachedQuote]:
+        """Cached quote regardless of its age."""
+        return self._quotes.get(norm_symbol(symbol))
+
+    # --- writes ---
+    def put_quote(self, symbol: str, q: Any) -> None:
+        """Stores a QuoteData reply (from an RPC fallback)."""
+        bid, ask = getattr(q, "bid", None), getattr(q, "ask", None)
+        if bid is None or ask is None:
+            return
+        key = norm_symbol(symbol)
+        self._quotes[key] = CachedQuote(key, float(bid), float(ask), getattr(q, "date_time", None), time.monotonic(), "rpc")
+        self.rpc_updates += 1
+
+    def _put_tick(self, data: Any) -> None:
+        tick = getattr(data, "symbol_tick", None)
+        if tick is None:
+            return
+        key = norm_symbol(tick.symbol)
+        self._quotes[key] = CachedQuote(key, float(tick.bid), float(tick.ask), tick.time, time.monotonic(), "stream")
+        self.stream_updates += 1
+
+    # --- stream feed ---
+    def watch(self, *symbols: str) -> None:
+        """Keeps `symbols` fed from the tick stream (no-op without a tick hub)."""
+        if self._hub is None:
+            return
+        new = []
+        for s in symbols:
+            key = norm_symbol(s)
+            if key and key not in self._watched:
+                self._watched[key] = str(s).strip()
+                new.append(self._watched[key])
+        if self._sub is None or self._sub.closed:
+            if not self._watched:
+                return
+            # conflate: the cache only ever needs the latest tick per symbol
+            self._sub = self._hub.subscribe(list(self._watched.values()), policy="conflate", maxsize=100_000)
+            self._pump = asyncio.ensure_future(self._run(self._sub))
+        elif new:
+            self._sub.add(*new)
+
+    def unwatch(self, *symbols: str) -> None:
+        for s in symbols:
+            key = norm_symbol(s)
+            name = self._watched.pop(key, None)
+            if name is not None and self._sub is not None:
+                self._sub.remove(name)
+
+    @property
+    def watched(self) -> Set[str]:
+        return set(self._watched)
+
+    async def _run(self, sub: Any) -> None:
+        try:
+            async for data in sub:
+                self._put_tick(data)
+        except Exception as ex:
+            # stream failed: entries age out and readers fall back to RPC until watch() resubscribes
+            self.log.error("quote cache feed stopped: %s", ex, exc_info=False)
+
+    async def close(self) -> None:
+        sub, task = self._sub, self._pump
+        self._sub = self._pump = None
+        if sub is not None:
+            sub.close()
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "max_age_ms": self.max_age_s * 1000.0,
+            "symbols": len(self._quotes),
+            "watched": len(self._watched),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stream_updates": self.stream_updates,
+            "rpc_updates": self.rpc_updates,
+        }
+
+
+"""
+QuoteCache keeps the last bid/ask/time per symbol so pricing helpers read a dict instead of
+sending a Quote RPC.
+
+- Fed by one conflating TickHub subscription (MT4Service.tick_hub) for every watched symbol;
+  entries carry the local receipt time and their source ("stream" or "rpc").
+- get(symbol, max_age_ms) returns the entry only if it is fresh enough; otherwise the caller
+  does the RPC and stores the reply with put_quote(), which keeps it useful for max_age_ms.
+- Symbols start being watched the first time MT4Sugar prices them.
+- If the stream fails, entries simply age out and reads fall back to RPC.
+
+Used by MT4Sugar (spread_pips, mid_price, last_quote, wait_price, market entry price, trailing):
+    sugar = MT4Sugar(svc, quote_max_age_ms=500)
+    await sugar.mid_price("EURUSD")        # first call: Quote RPC + starts watching EURUSD
+    await sugar.mid_price("EURUSD")        # from the tick stream
+    sugar.quote_cache.stats()              # {'hits': ..., 'misses': ..., 'stream_updates': ...}
+"""
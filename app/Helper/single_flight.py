@@ -0,0 +1,98 @@
+# app/single_flight.py
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Shares one in-flight call (and optionally its result for a short TTL) per key."""
+
+    def __init__(self, ttl_s: float = 0.0) -> None:
+        self.ttl_s = max(0.0, float(ttl_s))
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        # stats
+        self.calls = 0        # do() invocations
+        self.executed = 0     # underlying calls actually made
+        self.shared = 0       # callers that joined an in-flight call
+        self.cache_hits = 0   # callers served from the TTL cache
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], ttl_s: Optional[float] = None) -> Any:
+        """Returns fn()'s result, running fn at most once for concurrent callers with the same key."""
+        self.calls += 1
+        ttl = self.ttl_s if ttl_s is None else ttl_s
+
+        if ttl > 0:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                self.cache_hits += 1
+                return hit[1]
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.shared += 1
+        else:
+            self.executed += 1
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key, t=ttl: self._done(k, f, t))
+        # shield: a cancelled caller must not cancel the call others are waiting on
+        return await asyncio.shield(fut)
+
+    def _done(self, key: Hashable, fut: asyncio.Future, ttl: float) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+            if ttl > 0 and not fut.cancelled() and fut.exception() is None:
+                self._cache[key] = (time.monotonic() + ttl, fut.result())
+        elif not fut.cancelled():
+            fut.exception()  # invalidated while running: mark the outcome as retrieved
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Forgets cached results and in-flight calls for `keys` (all keys if none given).
+
+        Callers already waiting keep their result; the next caller starts a fresh call.
+        """
+        if not keys:
+            self._cache.clear()
+            self._inflight.clear()
+            return
+        for key in keys:
+            self._cache.pop(key, None)
+            self._inflight.pop(key, None)
+
+    def invalidate_prefix(self, name: str) -> None:
+        """Forgets every tuple key whose first element is `name` (e.g. all opened_orders sort modes)."""
+        for store in (self._cache, self._inflight):
+            for key in [k for k in store if isinstance(k, tuple) and k and k[0] == name]:
+                del store[key]
+
+    def stats(self) -> dict:
+        return {
+            "ttl_s": self.ttl_s,
+            "calls": self.calls,
+            "executed": self.executed,
+            "shared": self.shared,
+            "cache_hits": self.cache_hits,
+            "inflight": len(self._inflight),
+            "cached": len(self._cache),
+        }
+
+
+"""
+SingleFlight deduplicates identical read calls.
+
+- Concurrent do(key, fn) calls with the same key share ONE execution of fn and its result
+  (or its exception).
+- With ttl_s > 0 a successful result is also reused for ttl_s seconds after it arrives.
+- invalidate()/invalidate_prefix() drop both the cached value and the in-flight call, so a
+  read issued after a write never joins a call that started before the write.
+- Results are shared objects: treat them as read-only.
+
+Example:
+    sf = SingleFlight(ttl_s=0.25)
+    summary = await sf.do(("account_summary",), acc.account_summary)
+
+MT4Service uses it for account_summary(), opened_orders() and symbols() (see read_ttl_ms).
+Its trading methods invalidate account_summary/opened_orders after every order operation.
+"""
@@ -0,0 +1,196 @@
+# app/stream_deltas.py
+from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, FrozenSet, Optional, Tuple
+
+
+class TicketDelta:
+    """What changed between two OnOpenedOrdersTicketsData snapshots."""
+
+    __slots__ = ("added", "removed", "filled", "positions", "pendings", "server_time")
+
+    def __init__(
+        self,
+        added: FrozenSet[int],
+        removed: FrozenSet[int],
+        filled: FrozenSet[int],
+        positions: int,
+        pendings: int,
+        server_time: Any,
+    ) -> None:
+        self.added = added            # tickets that appeared (market or pending)
+        self.removed = removed        # tickets that disappeared (closed / deleted)
+        self.filled = filled          # pending tickets that became positions
+        self.positions = positions    # book size after the change
+        self.pendings = pendings
+        self.server_time = server_time
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.filled)
+
+    def __repr__(self) -> str:
+        return (f"TicketDelta(added={sorted(self.added)}, removed={sorted(self.removed)}, "
+                f"filled={sorted(self.filled)})")
+
+
+class ProfitDelta:
+    """Per-ticket profit changes between two OnOpenedOrdersProfitData snapshots."""
+
+    __slots__ = ("changed", "opened", "closed", "account_info")
+
+    def __init__(
+        self,
+        changed: Dict[int, Tuple[float, float]],
+        opened: Dict[int, float],
+        closed: FrozenSet[int],
+        account_info: Any,
+    ) -> None:
+        self.changed = changed        # ticket -> (last emitted profit, current profit)
+        self.opened = opened          # ticket -> profit, for tickets not seen before
+        self.closed = closed          # tickets no longer reported
+        self.account_info = account_info
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.opened or self.closed)
+
+    def __repr__(self) -> str:
+        return (f"ProfitDelta(changed={len(self.changed)}, opened={len(self.opened)}, "
+                f"closed={sorted(self.closed)})")
+
+
+class TicketDiffer:
+    """Turns successive ticket snapshots into TicketDelta (set differences, O(changes) output)."""
+
+    def __init__(self, initial: bool = True) -> None:
+        self.initial = initial
+        self._positions: Optional[FrozenSet[int]] = None
+        self._pendings: FrozenSet[int] = frozenset()
+        # stats
+        self.snapshots = 0
+        self.emitted = 0
+
+    def update(self, data: Any) -> Optional[TicketDelta]:
+        """Feeds one snapshot; returns the delta, or None if nothing changed."""
+        self.snapshots += 1
+        positions = frozenset(data.position_tickets)
+        pendings = frozenset(data.pending_order_tickets)
+        prev_positions, prev_pendings = self._positions, self._pendings
+        self._positions, self._pendings = positions, pendings
+
+        if prev_positions is None:
+            if not self.initial:
+                return None
+            prev_positions = frozenset()
+        cur, prev = positions | pendings, prev_positions | prev_pendings
+        delta = TicketDelta(
+            added=cur - prev,
+            removed=prev - cur,
+            filled=prev_pendings & positions,
+            positions=len(positions),
+            pendings=len(pendings),
+            server_time=getattr(data, "server_time", None),
+        )
+        if not delta:
+            return None
+        self.emitted += 1
+        return delta
+
+    def stats(self) -> dict:
+        return {"snapshots": self.snapshots, "emitted": self.emitted}
+
+
+class ProfitDiffer:
+    """
+    Turns successive profit snapshots into ProfitDelta.
+
+    A ticket counts as changed once its profit moved by at least `threshold` (account
+    currency) from the value last emitted for it, so slow drifts are reported too.
+    """
+
+    def __init__(self, threshold: float = 0.01, initial: bool = True) -> None:
+        self.threshold = max(0.0, float(threshold))
+        self.initial = initial
+        self._last: Optional[Dict[int, float]] = None   # ticket -> last emitted profit
+        # stats
+        self.snapshots = 0
+        self.emitted = 0
+
+    def update(self, data: Any) -> Optional[ProfitDelta]:
+        """Feeds one snapshot; returns the delta, or None if no ticket moved past the threshold."""
+        self.snapshots += 1
+        cur = {int(o.ticket): float(o.order_profit) for o in data.opened_orders_with_profit_updated}
+        first = self._last is None
+        last = self._last if self._last is not None else {}
+
+        changed: Dict[int, Tuple[float, float]] = {}
+        opened: Dict[int, float] = {}
+        for ticket, profit in cur.items():
+            prev = last.get(ticket)
+            if prev is None:
+                opened[ticket] = profit
+                last[ticket] = profit
+            elif abs(profit - prev) >= self.threshold and profit != prev:
+                changed[ticket] = (prev, profit)
+                last[ticket] = profit
+        closed = frozenset(last.keys() - cur.keys())
+        for ticket in closed:
+            del last[ticket]
+        self._last = last
+
+        if first and not self.initial:
+            return None
+        delta = ProfitDelta(changed, opened, closed, getattr(data, "account_info", None))
+        if not delta:
+            return None
+        self.emitted += 1
+        return delta
+
+    def stats(self) -> dict:
+        return {
+            "snapshots": self.snapshots,
+            "emitted": self.emitted,
+            "tracked": len(self._last or ()),
+            "threshold": self.threshold,
+        }
+
+
+async def ticket_deltas(stream: AsyncIterator[Any], *, initial: bool = True) -> AsyncIterator[TicketDelta]:
+    """Relays an on_opened_orders_tickets() stream as TicketDelta, skipping unchanged snapshots."""
+    differ = TicketDiffer(initial=initial)
+    async for data in stream:
+        delta = differ.update(data)
+        if delta is not None:
+            yield delta
+
+
+async def profit_deltas(
+    stream: AsyncIterator[Any],
+    *,
+    threshold: float = 0.01,
+    initial: bool = True,
+) -> AsyncIterator[ProfitDelta]:
+    """Relays an on_opened_orders_profit() stream as ProfitDelta, skipping snapshots below the threshold."""
+    differ = ProfitDiffer(threshold=threshold, initial=initial)
+    async for data in stream:
+        delta = differ.update(data)
+        if delta is not None:
+            yield delta
+
+
+"""
+Delta views of the two snapshot streams of opened orders.
+
+- on_opened_orders_tickets() sends every ticket on every pull; TicketDiffer keeps the previous
+  position/pending sets and reports only added, removed and filled (pending -> position) tickets.
+- on_opened_orders_profit() sends every order's profit on every tick of the timer; ProfitDiffer
+  keeps the last emitted profit per ticket and reports tickets that opened, closed, or moved by
+  at least `threshold` since they were last reported.
+- Unchanged snapshots produce nothing, so consumers do work proportional to the change.
+- initial=True reports the first snapshot as "everything added/opened" so consumers can
+  bootstrap from the delta stream alone.
+
+Used by MT4Sugar.watch_tickets_delta() / watch_profit_delta(), or directly:
+    async for d in ticket_deltas(svc.on_opened_orders_tickets(500)):
+        print(d.added, d.removed, d.filled)
+    async for d in profit_deltas(svc.on_opened_orders_profit(1000), threshold=0.5):
+        for ticket, (old, new) in d.changed.items(): ...
+"""
@@ -0,0 +1,179 @@
+# app/symbol_registry.py
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from .symbols import norm_symbol
+
+
+def _entry_name(x: Any) -> str:
+    """Broker symbol name of one Symbols row (pb SymbolNameInfo, dict or plain str)."""
+    if isinstance(x, str):
+        return x
+    if isinstance(x, dict):
+        return str(x.get("symbol_name") or x.get("symbol") or x.get("name") or "")
+    return str(getattr(x, "symbol_name", None) or getattr(x, "symbol", None) or getattr(x, "name", "") or "")
+
+
+class SymbolRegistry:
+    """In-memory index of the broker's symbol universe, loaded once and refreshed in the background."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh_s: float = 300.0,
+        miss_refresh_s: float = 5.0,
+    ) -> None:
+        self._fetch = fetch
+        self.refresh_s = max(0.0, float(refresh_s))
+        self.miss_refresh_s = max(0.0, float(miss_refresh_s))
+        self._by_name: Dict[str, str] = {}      # normalized name -> broker name
+        self._index: Dict[str, int] = {}        # normalized name -> symbol_index
+        self._loaded_at: Optional[float] = None
+        self._loading: Optional[asyncio.Future] = None
+        self._refresher: Optional[asyncio.Task] = None
+        # stats
+        self.lookups = 0      # resolve() calls
+        self.hits = 0         # answered from memory
+        self.misses = 0       # unknown after the lookup (including the miss refresh)
+        self.loads = 0        # Symbols RPCs made
+        self.load_errors = 0  # failed Symbols RPCs
+
+    # --- state ---
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def names(self) -> List[str]:
+        """Broker symbol names in server order."""
+        return list(self._by_name.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, symbol: str) -> bool:
+        return norm_symbol(symbol) in self._by_name
+
+    def get(self, symbol: str) -> Optional[str]:
+        """Broker name for `symbol` from memory only (no RPC); None if unknown or not loaded."""
+        return self._by_name.get(norm_symbol(symbol))
+
+    def index_of(self, symbol: str) -> Optional[int]:
+        """symbol_index reported by the terminal, if any."""
+        return self._index.get(norm_symbol(symbol))
+
+    # --- loading ---
+    async def load(self, force: bool = False) -> None:
+        """Loads the universe unless it is already loaded; concurrent callers share one RPC."""
+        if self.loaded and not force:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+            self._loading.add_done_callback(self._load_done)
+        await asyncio.shield(self._loading)
+
+    def _load_done(self, fut: asyncio.Future) -> None:
+        self._loading = None
+        if not fut.cancelled():
+            fut.exception()  # consumed here: waiters re-raise it themselves
+
+    async def _load(self) -> None:
+        self.loads += 1
+        try:
+            raw = await self._fetch()
+        except Exception:
+            self.load_errors += 1
+            raise
+        by_name: Dict[str, str] = {}
+        index: Dict[str, int] = {}
+        for row in raw or []:
+            name = _entry_name(row)
+            key = norm_symbol(name)
+            if not key:
+                continue
+            by_name.setdefault(key, name)
+            idx = row.get("symbol_index") if isinstance(row, dict) else getattr(row, "symbol_index", None)
+            if idx is not None:
+                index.setdefault(key, int(idx))
+        # swap in one step: readers never see a half-built index
+        self._by_name, self._index = by_name, index
+        self._loaded_at = time.monotonic()
+        self._ensure_refresher()
+
+    async def resolve(self, symbol: str) -> Optional[str]:
+        """
+        Broker name for `symbol`, or None if the broker doesn't list it.
+
+        Answers from memory; the first call loads the universe. A miss triggers one forced
+        reload (at most every `miss_refresh_s`) so symbols added on the server are picked up.
+        """
+        self.lookups += 1
+        key = norm_symbol(symbol)
+        await self.load()
+        name = self._by_name.get(key)
+        if name is None and time.monotonic() - (self._loaded_at or 0.0) >= self.miss_refresh_s:
+            await self.load(force=True)
+            name = self._by_name.get(key)
+        if name is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return name
+
+    # --- background refresh ---
+    def _ensure_refresher(self) -> None:
+        if self.refresh_s <= 0 or (self._refresher is not None and not self._refresher.done()):
+            return
+        self._refresher = asyncio.ensure_future(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_s)
+            try:
+                await self.load(force=True)
+            except Exception:
+                pass  # keep serving the last good universe; retry next period
+
+    async def close(self) -> None:
+        """Stops the background refresh task."""
+        task, self._refresher = self._refresher, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._by_name),
+            "age_s": None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 3),
+            "refresh_s": self.refresh_s,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+        }
+
+
+"""
+SymbolRegistry keeps the broker's symbol list in memory so symbol checks cost a dict lookup
+instead of a full Symbols RPC.
+
+- The first resolve()/load() fetches the universe once; concurrent callers share that RPC.
+- Names are indexed normalized (trimmed, upper-case, trailing dot removed) and map back to
+  the broker's own spelling.
+- A background task reloads the list every refresh_s seconds (0 disables it); if a reload
+  fails the previous list keeps being served.
+- An unknown symbol forces one reload (rate-limited by miss_refresh_s) before it is reported
+  as missing, so symbols added on the server side are found without waiting for the timer.
+
+Used by MT4Sugar.ensure_symbol():
+    sugar = MT4Sugar(svc)
+    await sugar.ensure_symbol("eurusd")      # first call loads the universe
+    await sugar.ensure_symbol("EURUSD")      # answered from memory
+    sugar.symbol_registry.stats()            # {'symbols': ..., 'hits': ..., 'loads': ...}
+    await sugar.symbol_registry.close()      # stop the refresh task on shutdown
+"""
@@ -0,0 +1,217 @@
+# app/symbol_specs.py
+from __future__ import annotations
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from .symbols import norm_symbol
+
+
+# ENUM_SYMBOL_TRADE_MODE values that don't allow opening new positions
+_TRADE_MODE_DISABLED = 0
+_TRADE_MODE_CLOSEONLY = 3
+
+
+class SymbolSpec:
+    """Trading parameters of one symbol, with pip/lot values precomputed at load time."""
+
+    __slots__ = (
+        "name", "digits", "point", "pip_size",
+        "volume_min", "volume_max", "volume_step",
+        "trade_mode", "tick_value", "tick_size", "contract_size",
+        "pip_value_per_lot",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        digits: int = 0,
+        point: float = 0.0,
+        volume_min: Optional[float] = None,
+        volume_max: Optional[float] = None,
+        volume_step: float = 0.0,
+        trade_mode: Optional[int] = None,
+        tick_value: float = 0.0,
+        tick_size: float = 0.0,
+        contract_size: float = 0.0,
+    ) -> None:
+        point = float(point or 0.0) or 1e-5
+        digits = int(digits or 0) or max(0, int(round(-math.log10(point))))
+        self.name = name
+        self.digits = digits
+        self.point = point
+        self.pip_size = point * 10.0 if digits in (3, 5) else point
+        self.volume_min = float(volume_min) if volume_min else None
+        self.volume_max = float(volume_max) if volume_max else None
+        self.volume_step = float(volume_step or 0.0) or 0.01
+        self.trade_mode = trade_mode
+        self.tick_size = float(tick_size or 0.0)
+        self.contract_size = float(contract_size or 0.0)
+        self.tick_value = 0.0
+        self.pip_value_per_lot = 0.0
+        self.set_tick_value(tick_value, tick_size)
+
+    def set_tick_value(self, tick_value: float, tick_size: Optional[float] = None) -> None:
+        """Updates the tick value per lot and the derived money-per-pip value."""
+        if tick_size:
+            self.tick_size = float(tick_size)
+        self.tick_value = float(tick_value or 0.0)
+        # same formula as MT4Sugar always used: tick value * (pip / point)
+        self.pip_value_per_lot = self.tick_value * (self.pip_size / self.point)
+
+    @property
+    def trade_allowed(self) -> bool:
+        return self.trade_mode not in (_TRADE_MODE_DISABLED, _TRADE_MODE_CLOSEONLY)
+
+    def money_per_pip(self, lots: float) -> float:
+        return self.pip_value_per_lot * float(lots)
+
+    @classmethod
+    def from_params(cls, info: Any) -> "SymbolSpec":
+        """Builds a spec from one SymbolParamsManyInfo row."""
+        return cls(
+            str(info.SymbolName),
+            digits=info.Digits,
+            point=info.Point,
+            volume_min=info.VolumeMin,
+            volume_max=info.VolumeMax,
+            volume_step=info.VolumeStep,
+            trade_mode=int(info.TradeMode),
+            tick_value=info.TradeTickValue,
+            tick_size=info.TradeTickSize,
+            contract_size=info.TradeContractSize,
+        )
+
+    def __repr__(self) -> str:
+        return (f"SymbolSpec({self.name!r}, digits={self.digits}, point={self.point}, "
+                f"pip={self.pip_size}, step={self.volume_step}, pip_value={self.pip_value_per_lot})")
+
+
+class SymbolSpecTable:
+    """All symbol specs of the account, bulk-loaded with two RPCs and refreshed on a TTL."""
+
+    def __init__(
+        self,
+        fetch_params: Callable[[], Awaitable[Iterable[Any]]],
+        fetch_tick_values: Optional[Callable[[List[str]], Awaitable[Any]]] = None,
+        ttl_s: float = 3600.0,
+    ) -> None:
+        self._fetch_params = fetch_params
+        self._fetch_tick_values = fetch_tick_values
+        self.ttl_s = max(0.0, float(ttl_s))
+        self._specs: Dict[str, SymbolSpec] = {}
+        self._loaded_at: Optional[float] = None
+        self._loading: Optional[asyncio.Future] = None
+        # stats
+        self.lookups = 0          # get() calls
+        self.misses = 0           # symbols not in the table
+        self.loads = 0            # bulk loads (SymbolParamsMany + TickValueWithSize)
+        self.load_errors = 0
+        self.tick_value_errors = 0  # TickValueWithSize failed; SymbolParamsMany values kept
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def get_cached(self, symbol: str) -> Optional[SymbolSpec]:
+        """Spec from memory only (no RPC, no TTL check)."""
+        return self._specs.get(norm_symbol(symbol))
+
+    async def get(self, symbol: str, force_refresh: bool = False) -> Optional[SymbolSpec]:
+        """
+        Spec for `symbol`, or None if the terminal doesn't report it.
+
+        The first call loads the whole table. Once the TTL has passed the table is
+        reloaded in the background while the current specs keep being served.
+        """
+        self.lookups += 1
+        if force_refresh or not self.loaded:
+            await self.load(force=force_refresh)
+        elif self.ttl_s > 0 and time.monotonic() - self._loaded_at >= self.ttl_s and self._loading is None:
+            self._start_load()
+        spec = self._specs.get(norm_symbol(symbol))
+        if spec is None:
+            self.misses += 1
+        return spec
+
+    async def load(self, force: bool = False) -> None:
+        """Loads every spec unless already loaded; concurrent callers share one load."""
+        if self.loaded and not force:
+            return
+        await asyncio.shield(self._start_load())
+
+    def _start_load(self) -> asyncio.Future:
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+            self._loading.add_done_callback(self._load_done)
+        return self._loading
+
+    def _load_done(self, fut: asyncio.Future) -> None:
+        self._loading = None
+        if not fut.cancelled():
+            fut.exception()  # background refresh errors are counted in load_errors
+
+    async def _load(self) -> None:
+        self.loads += 1
+        try:
+            rows = await self._fetch_params()
+        except Exception:
+            self.load_errors += 1
+            raise
+
+        specs: Dict[str, SymbolSpec] = {}
+        for info in rows or []:
+            spec = SymbolSpec.from_params(info)
+            key = norm_symbol(spec.name)
+            if key:
+                specs.setdefault(key, spec)
+
+        # One TickValueWithSize for all symbols: tick values in account currency
+        if specs and self._fetch_tick_values is not None:
+            try:
+                data = await self._fetch_tick_values([s.name for s in specs.values()])
+            except Exception:
+                self.tick_value_errors += 1
+            else:
+                for it in getattr(data, "infos", None) or []:
+                    spec = specs.get(norm_symbol(it.symbolName))
+                    if spec is not None and it.TradeTickValue:
+                        spec.set_tick_value(it.TradeTickValue, it.TradeTickSize)
+
+        self._specs = specs
+        self._loaded_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._specs),
+            "age_s": None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 3),
+            "ttl_s": self.ttl_s,
+            "lookups": self.lookups,
+            "misses": self.misses,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "tick_value_errors": self.tick_value_errors,
+        }
+
+
+"""
+SymbolSpecTable gives the pricing and sizing helpers of MT4Sugar their symbol data without RPCs.
+
+- One load = SymbolParamsMany(None) for every symbol + one TickValueWithSize for all of them.
+  Concurrent callers share the load.
+- SymbolSpec keeps only what the helpers need (__slots__) and precomputes pip_size
+  (point * 10 for 3/5-digit symbols) and pip_value_per_lot (tick_value * pip / point).
+- After ttl_s the table is reloaded in the background; the old specs are served meanwhile.
+  If TickValueWithSize fails, the tick values from SymbolParamsMany are kept.
+- Unknown symbols return None; callers choose their own defaults.
+
+Used by MT4Sugar:
+    await sugar.warmup()                       # registry + specs loaded up front
+    await sugar.pip_size("EURUSD")             # no RPC
+    sugar.symbol_specs.get_cached("EURUSD")    # SymbolSpec('EURUSD', digits=5, ...)
+    sugar.symbol_specs.stats()
+"""
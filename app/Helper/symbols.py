@@ -0,0 +1,19 @@
+# app/symbols.py
+from __future__ import annotations
+from typing import Any
+
+
+def norm_symbol(symbol: Any) -> str:
+    """Canonical symbol key: stripped, upper-case, trailing dot removed ('eurusd.' -> 'EURUSD')."""
+    s = str(symbol or "").strip().upper()
+    return s[:-1] if s.endswith(".") else s
+
+
+"""
+norm_symbol() is the one symbol-key rule shared by every helper that indexes by symbol
+(quote batcher/cache, symbol registry/specs, tick hub, order store, bar engine/store) and by
+MT4Service, so "eurusd", "EURUSD " and "EURUSD." always land on the same entry.
+
+    from app.Helper.symbols import norm_symbol
+    norm_symbol(" eurusd. ")   # 'EURUSD'
+"""
@@ -0,0 +1,434 @@
+# app/tick_codec.py
+from __future__ import annotations
+import os
+import struct
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # optional: vectorized block encode/decode
+except ImportError:
+    np = None
+
+
+MAGIC = b"MT4TKA01"          # file header
+INDEX_MAGIC = b"MT4TKIX1"    # footer, present once the writer was closed
+_FOOTER = struct.Struct("<Q8s")  # index offset, INDEX_MAGIC
+DEFAULT_BLOCK_TICKS = 4096
+
+
+# ──────────────────────────────── varints ────────────────────────────────────
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(z: int) -> int:
+    return (z >> 1) ^ -(z & 1)
+
+
+def _put_varint(out: bytearray, z: int) -> None:
+    while z >= 0x80:
+        out.append((z & 0x7F) | 0x80)
+        z >>= 7
+    out.append(z)
+
+
+def _get_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    z = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        z |= (b & 0x7F) << shift
+        if b < 0x80:
+            return z, pos
+        shift += 7
+
+
+def _pack_py(values: Sequence[int]) -> bytes:
+    out = bytearray()
+    for v in values:
+        _put_varint(out, _zigzag(v))
+    return bytes(out)
+
+
+def _unpack_py(buf: bytes, count: int) -> List[int]:
+    out: List[int] = []
+    pos = 0
+    for _ in range(count):
+        z, pos = _get_varint(buf, pos)
+        out.append(_unzigzag(z))
+    return out
+
+
+def _pack_np(values: Any) -> bytes:
+    """int64 array -> zigzag varints, one pass per output byte position (at most 10)."""
+    v = values.astype(np.int64, copy=False)
+    z = ((v << 1) ^ (v >> 63)).view(np.uint64)
+    nbytes = np.ones(len(z), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += z >= np.uint64(1 << (7 * k))
+    offsets = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for j in range(10):
+        m = nbytes > j
+        if not m.any():
+            break
+        zj, nj = z[m], nbytes[m]
+        byte = ((zj >> np.uint64(7 * j)) & np.uint64(0x7F)).astype(np.uint8)
+        byte |= np.where(nj - 1 > j, 0x80, 0).astype(np.uint8)
+        out[offsets[m] + j] = byte
+    return out.tobytes()
+
+
+def _unpack_np(buf: bytes, count: int) -> Any:
+    """zigzag varints -> int64 array; a varint ends at each byte < 0x80."""
+    b = np.frombuffer(buf, dtype=np.uint8)
+    ends = np.flatnonzero(b < 0x80)[:count]
+    if len(ends) != count:
+        raise ValueError("truncated tick block")
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    b = b[: ends[-1] + 1]
+    shift = (np.arange(len(b), dtype=np.int64) - np.repeat(starts, ends - starts + 1)) * 7
+    z = np.add.reduceat((b & 0x7F).astype(np.uint64) << shift.astype(np.uint64), starts)
+    return (z >> np.uint64(1)).astype(np.int64) ^ -(z & np.uint64(1)).astype(np.int64)
+
+
+# ──────────────────────────────── blocks ─────────────────────────────────────
+# A block holds `count` ticks as three varint columns, each self-contained (no state
+# carried across blocks, so any block decodes on its own):
+#   time:   delta-of-delta of epoch ms (first = absolute time, second = first delta)
+#   bid:    delta of bid in points (first = absolute)
+#   spread: delta of (ask - bid) in points (first = absolute)
+
+def _encode_block(times: Sequence[int], bid_pts: Sequence[int], spr_pts: Sequence[int]) -> bytes:
+    if np is not None:
+        t = np.asarray(times, dtype=np.int64)
+        d = np.diff(t, prepend=0)
+        dod = d.copy()
+        dod[2:] = d[2:] - d[1:-1]
+        b = np.diff(np.asarray(bid_pts, dtype=np.int64), prepend=0)
+        s = np.diff(np.asarray(spr_pts, dtype=np.int64), prepend=0)
+        return _pack_np(np.concatenate((dod, b, s)))
+    vals: List[int] = []
+    prev_t = prev_d = 0
+    for i, t in enumerate(times):
+        d = t - prev_t
+        vals.append(d if i < 2 else d - prev_d)
+        prev_t, prev_d = t, d
+    for col in (bid_pts, spr_pts):
+        prev = 0
+        for p in col:
+            vals.append(p - prev)
+            prev = p
+    return _pack_py(vals)
+
+
+def _decode_block(payload: bytes, count: int) -> Tuple[Any, Any, Any]:
+    """-> (times, bid points, spread points): int64 arrays with numpy, lists without."""
+    if np is not None:
+        v = _unpack_np(payload, 3 * count)
+        d = v[:count].copy()
+        d[1:] = np.cumsum(d[1:])
+        return np.cumsum(d), np.cumsum(v[count:2 * count]), np.cumsum(v[2 * count:])
+    v = _unpack_py(payload, 3 * count)
+    times: List[int] = []
+    t = d = 0
+    for i in range(count):
+        d = v[i] if i < 2 else d + v[i]
+        t += d
+        times.append(t)
+    cols = []
+    for k in (1, 2):
+        acc, col = 0, []
+        for x in v[k * count:(k + 1) * count]:
+            acc += x
+            col.append(acc)
+        cols.append(col)
+    return times, cols[0], cols[1]
+
+
+class BlockInfo:
+    """Index entry: where a block starts and which ticks it holds."""
+
+    __slots__ = ("offset", "first_ms", "last_ms", "count")
+
+    def __init__(self, offset: int, first_ms: int, last_ms: int, count: int) -> None:
+        self.offset = offset
+        self.first_ms = first_ms
+        self.last_ms = last_ms
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"BlockInfo(offset={self.offset}, first_ms={self.first_ms}, last_ms={self.last_ms}, count={self.count})"
+
+
+def _scale(point: float) -> Tuple[float, bool]:
+    """Prices are converted with 1/point; dividing by an exact integer keeps decoded floats exact."""
+    inv = 1.0 / point
+    r = round(inv)
+    return (float(r), True) if r and abs(inv - r) < 1e-9 * inv else (inv, False)
+
+
+# ──────────────────────────────── writer ─────────────────────────────────────
+
+class TickArchiveWriter:
+    """
+    Streaming encoder. Ticks are buffered and written one block at a time; close() appends
+    the block index. Prices are quantized to `point` (MT4 prices are multiples of it).
+
+        file:  MAGIC | u32 header len | header | block* | index | footer
+        block: varint payload len | varint count | payload
+    """
+
+    def __init__(self, f: BinaryIO, symbol: str, point: float, *, block_ticks: int = DEFAULT_BLOCK_TICKS) -> None:
+        if not point or point <= 0:
+            raise ValueError("point must be > 0")
+        self.f = f
+        self.symbol = symbol
+        self.point = float(point)
+        self.block_ticks = max(16, int(block_ticks))
+        self._inv, _ = _scale(self.point)
+        self._times: List[int] = []
+        self._bids: List[float] = []
+        self._asks: List[float] = []
+        self.blocks: List[BlockInfo] = []
+        self.ticks = 0
+        self.bytes_written = 0
+        self._last_ms: Optional[int] = None
+        name = symbol.encode("utf-8")
+        header = struct.pack("<dH", self.point, len(name)) + name
+        self._write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def _write(self, data: bytes) -> None:
+        self.f.write(data)
+        self.bytes_written += len(data)
+
+    def append(self, time_ms: int, bid: float, ask: float) -> None:
+        self._times.append(int(time_ms))
+        self._bids.append(bid)
+        self._asks.append(ask)
+        if len(self._times) >= self.block_ticks:
+            self.flush_block()
+
+    def extend(self, times: Sequence[int], bids: Sequence[float], asks: Sequence[float]) -> None:
+        """Appends columns (lists or numpy arrays, e.g. TickReader.read() output)."""
+        n = len(times)
+        i = 0
+        while i < n:
+            room = self.block_ticks - len(self._times)
+            j = min(n, i + room)
+            self._times.extend(int(t) for t in times[i:j])
+            self._bids.extend(bids[i:j])
+            self._asks.extend(asks[i:j])
+            i = j
+            if len(self._times) >= self.block_ticks:
+                self.flush_block()
+
+    def flush_block(self) -> None:
+        """Encodes the buffered ticks as one block."""
+        if not self._times:
+            return
+        times, bids, asks, inv = self._times, self._bids, self._asks, self._inv
+        if self._last_ms is not None and times[0] < self._last_ms:
+            raise ValueError("ticks must be appended in time order")
+        if np is not None:
+            b = np.rint(np.asarray(bids, dtype=np.float64) * inv).astype(np.int64)
+            s = np.rint(np.asarray(asks, dtype=np.float64) * inv).astype(np.int64) - b
+        else:
+            b = [int(round(x * inv)) for x in bids]
+            s = [int(round(a * inv)) - p for a, p in zip(asks, b)]
+        payload = _encode_block(times, b, s)
+        head = bytearray()
+        _put_varint(head, len(payload))
+        _put_varint(head, len(times))
+        self.blocks.append(BlockInfo(self.bytes_written, times[0], times[-1], len(times)))
+        self._write(bytes(head) + payload)
+        self.ticks += len(times)
+        self._last_ms = times[-1]
+        self._times, self._bids, self._asks = [], [], []
+
+    def close(self) -> None:
+        """Flushes the last block and writes the index; the file object is left open."""
+        self.flush_block()
+        index_at = self.bytes_written
+        out = bytearray()
+        _put_varint(out, len(self.blocks))
+        prev_off = prev_ms = 0
+        for blk in self.blocks:
+            for v in (blk.offset - prev_off, blk.first_ms - prev_ms, blk.last_ms - blk.first_ms, blk.count):
+                _put_varint(out, _zigzag(v))
+            prev_off, prev_ms = blk.offset, blk.first_ms
+        self._write(bytes(out) + _FOOTER.pack(index_at, INDEX_MAGIC))
+        self.f.flush()
+
+    def __enter__(self) -> "TickArchiveWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# ──────────────────────────────── reader ─────────────────────────────────────
+
+class TickArchiveReader:
+    """
+    Streaming decoder with random seeks. Uses the block index when the file was closed;
+    an unfinished file (no footer) is scanned block by block instead.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self.f = f
+        f.seek(0)
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a tick archive")
+        (hlen,) = struct.unpack("<I", f.read(4))
+        header = f.read(hlen)
+        self.point, nlen = struct.unpack_from("<dH", header)
+        self.symbol = header[10:10 + nlen].decode("utf-8")
+        self._inv, self._exact = _scale(self.point)
+        self._data_at = len(MAGIC) + 4 + hlen
+        self.blocks = self._load_index()
+
+    def _load_index(self) -> List[BlockInfo]:
+        f = self.f
+        end = f.seek(0, os.SEEK_END)
+        if end - self._data_at >= _FOOTER.size:
+            f.seek(end - _FOOTER.size)
+            index_at, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic == INDEX_MAGIC:
+                f.seek(index_at)
+                buf = f.read(end - _FOOTER.size - index_at)
+                n, pos = _get_varint(buf, 0)
+                blocks, off, first = [], 0, 0
+                for _ in range(n):
+                    vals = []
+                    for _k in range(4):
+                        z, pos = _get_varint(buf, pos)
+                        vals.append(_unzigzag(z))
+                    off += vals[0]
+                    first += vals[1]
+                    blocks.append(BlockInfo(off, first, first + vals[2], vals[3]))
+                return blocks
+        # no footer: writer still running or crashed; index what is complete
+        blocks = []
+        pos = self._data_at
+        while pos < end:
+            f.seek(pos)
+            head = f.read(20)
+            try:
+                plen, p = _get_varint(head, 0)
+                count, p = _get_varint(head, p)
+            except IndexError:
+                break
+            if pos + p + plen > end:
+                break
+            f.seek(pos + p)
+            times, _, _ = _decode_block(f.read(plen), count)
+            blocks.append(BlockInfo(pos, int(times[0]), int(times[-1]), count))
+            pos += p + plen
+        return blocks
+
+    @property
+    def ticks(self) -> int:
+        return sum(b.count for b in self.blocks)
+
+    def read_block(self, blk: BlockInfo) -> Tuple[Any, Any, Any]:
+        """-> (times, bids, asks): numpy arrays (int64, float64, float64) or lists without numpy."""
+        self.f.seek(blk.offset)
+        head = self.f.read(20)
+        plen, p = _get_varint(head, 0)
+        count, p = _get_varint(head, p)
+        self.f.seek(blk.offset + p)
+        times, b, s = _decode_block(self.f.read(plen), count)
+        inv, exact = self._inv, self._exact
+        if np is not None:
+            asks_pts = b + s
+            if exact:
+                return times, b / inv, asks_pts / inv
+            return times, b * self.point, asks_pts * self.point
+        if exact:
+            return times, [x / inv for x in b], [(x + y) / inv for x, y in zip(b, s)]
+        return times, [x * self.point for x in b], [(x + y) * self.point for x, y in zip(b, s)]
+
+    def iter_blocks(self, since_ms: Optional[int] = None, until_ms: Optional[int] = None) -> Iterator[Tuple[Any, Any, Any]]:
+        """Decoded blocks overlapping [since_ms, until_ms); the first block is found by bisection."""
+        blocks = self.blocks
+        lo, hi = 0, len(blocks)
+        if since_ms is not None:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if blocks[mid].last_ms < since_ms:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        for blk in blocks[lo:]:
+            if until_ms is not None and blk.first_ms >= until_ms:
+                return
+            yield self.read_block(blk)
+
+    def read(self, since_ms: Optional[int] = None, until_ms: Optional[int] = None) -> Tuple[Any, Any, Any]:
+        """(times, bids, asks) with since_ms <= time < until_ms (whole archive by default)."""
+        parts = list(self.iter_blocks(since_ms, until_ms))
+        if np is not None:
+            if not parts:
+                return np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.float64)
+            t, b, a = (np.concatenate(col) for col in zip(*parts))
+            lo = 0 if since_ms is None else np.searchsorted(t, since_ms, "left")
+            hi = len(t) if until_ms is None else np.searchsorted(t, until_ms, "left")
+            return t[lo:hi], b[lo:hi], a[lo:hi]
+        t, b, a = [], [], []
+        for pt, pb, pa in parts:
+            for x, y, z in zip(pt, pb, pa):
+                if (since_ms is None or x >= since_ms) and (until_ms is None or x < until_ms):
+                    t.append(x)
+                    b.append(y)
+                    a.append(z)
+        return t, b, a
+
+    def __iter__(self) -> Iterator[Tuple[int, float, float]]:
+        """Tick by tick: (time_ms, bid, ask)."""
+        for t, b, a in self.iter_blocks():
+            yield from zip((int(x) for x in t), (float(x) for x in b), (float(x) for x in a))
+
+
+def archive_recorded_day(root: str, symbol: str, day: str, path: str, point: float,
+                         *, block_ticks: int = DEFAULT_BLOCK_TICKS) -> int:
+    """Compresses one TickRecorder day (<root>/<SYMBOL>/<day>) into `path`; returns ticks written."""
+    from .tick_recorder import TickReader
+
+    cols = TickReader(root).read_day(symbol, day)
+    with open(path, "wb") as f, TickArchiveWriter(f, symbol, point, block_ticks=block_ticks) as w:
+        w.extend(cols["time"], cols["bid"], cols["ask"])
+    return w.ticks
+
+
+"""
+Compact archive format for recorded ticks (about an order of magnitude smaller than the raw
+24 bytes/tick of TickRecorder columns).
+
+- Time is delta-of-delta encoded (regular tick spacing becomes runs of small numbers); bid is
+  stored as a delta of integer points (price / symbol point) and ask as a delta of the spread
+  in points. All values are zigzag-varint packed, column by column inside each block.
+- Blocks of block_ticks ticks are self-contained; the index at the end of the file (first/last
+  time, offset, count per block) lets readers bisect to a time and decode only what is needed.
+  A file without index (writer still running or killed) is still readable by scanning blocks.
+- Streaming: TickArchiveWriter.append()/extend() write a block as soon as it fills;
+  TickArchiveReader.iter_blocks()/__iter__ decode lazily.
+- With numpy, block encode/decode is vectorized (varints via reduceat, cumsum for deltas) and
+  columns come back as arrays; without it the same format is handled in pure Python.
+- Prices are quantized to `point`. When 1/point is an integer (10**digits) prices are decoded
+  by division, so they round-trip to the same floats as the terminal's quotes.
+
+Usage:
+    with open("EURUSD-2025-10-10.tka", "wb") as f, TickArchiveWriter(f, "EURUSD", 0.00001) as w:
+        w.extend(times, bids, asks)
+
+    with open("EURUSD-2025-10-10.tka", "rb") as f:
+        times, bids, asks = TickArchiveReader(f).read(since_ms, until_ms)
+
+    archive_recorded_day("data/ticks", "EURUSD", "2025-10-10", "EURUSD-2025-10-10.tka", 0.00001)
+
+Compression ratio and decode speed: examples/Bench_tick_codec.py
+"""
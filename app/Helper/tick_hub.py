@@ -0,0 +1,674 @@
+# app/tick_hub.py
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from package.MetaRpcMT4 import mt4_term_api_subscriptions_pb2 as subscriptions_pb2
+from .symbols import norm_symbol
+
+
+# _offer() outcomes
+_QUEUED, _DROPPED, _CONFLATED, _FULL = 0, 1, 2, -1
+
+# Subscriber queue policies
+BLOCK = "block"                # full queue -> the hub waits (backpressure reaches the gRPC reader)
+DROP_OLDEST = "drop_oldest"    # full queue -> the oldest queued tick is discarded
+CONFLATE = "conflate"          # one slot per symbol, always holding the latest tick
+POLICIES = (BLOCK, DROP_OLDEST, CONFLATE)
+
+
+def _tick_symbol(data: Any) -> str:
+    tick = getattr(data, "symbol_tick", None)
+    return getattr(tick, "symbol", "") if tick is not None else getattr(data, "symbol", "")
+
+
+def _tick_ms(data: Any) -> Optional[int]:
+    """Server time of a tick in epoch milliseconds (time_msc, else time), None if unset."""
+    tick = getattr(data, "symbol_tick", None)
+    if tick is None:
+        return None
+    ms = int(tick.time_msc or 0)
+    if not ms:
+        ts = tick.time
+        ms = int(ts.seconds) * 1000 + int(ts.nanos) // 1_000_000
+    return ms or None
+
+
+_EPOCH = datetime(1970, 1, 1)
+_BAR_MS = 60_000   # backfill reads M1 bars
+
+
+def bars_to_ticks(symbol: str, bars: Iterable[Any], after_ms: int, until_ms: int) -> List[Any]:
+    """
+    Synthetic OnSymbolTickData, one per M1 HistoryQuote that ends after `after_ms`.
+
+    quote_history() only has bars, so each bar becomes one tick at its close: bid = ask =
+    last = close, time = bar end (capped at `until_ms`), volume = tick volume.
+    """
+    out = []
+    for bar in bars:
+        ts = bar.time
+        start = int(ts.seconds) * 1000 + int(ts.nanos) // 1_000_000
+        end = min(start + _BAR_MS, until_ms)
+        if end <= after_ms:
+            continue
+        data = subscriptions_pb2.OnSymbolTickData()
+        tick = data.symbol_tick
+        tick.symbol = symbol
+        tick.bid = tick.ask = tick.last = float(bar.close)
+        tick.volume = int(bar.tick_volume)
+        tick.time_msc = end
+        tick.time.FromMilliseconds(end)
+        out.append(data)
+    out.sort(key=lambda d: d.symbol_tick.time_msc)
+    return out
+
+
+class TickEvent:
+    """
+    What a resume-mode subscription yields: the tick plus whether it is live or backfilled.
+
+    `symbol_tick` is forwarded, so code reading OnSymbolTickData keeps working.
+    """
+
+    __slots__ = ("data", "backfilled")
+
+    def __init__(self, data: Any, backfilled: bool) -> None:
+        self.data = data
+        self.backfilled = backfilled
+
+    @property
+    def live(self) -> bool:
+        return not self.backfilled
+
+    @property
+    def symbol_tick(self) -> Any:
+        return self.data.symbol_tick
+
+    def __repr__(self) -> str:
+        t = self.data.symbol_tick
+        return f"TickEvent({t.symbol!r}, bid={t.bid}, ask={t.ask}, backfilled={self.backfilled})"
+
+
+class _End:
+    """End marker: the subscription is over (optionally because of `error`)."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+
+
+class TickSubscription:
+    """
+    One local consumer of the TickHub; iterate it with `async for`.
+
+    Ticks wait in a bounded per-subscriber queue, so a slow consumer only affects itself
+    (except with the "block" policy, which deliberately pushes back on the hub).
+    """
+
+    def __init__(
+        self,
+        hub: "TickHub",
+        symbols: Set[str],
+        policy: str = BLOCK,
+        maxsize: int = 4096,
+        resume: bool = False,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self._hub = hub
+        self.symbols: Set[str] = symbols   # normalized names
+        self.policy = policy
+        self.maxsize = max(1, int(maxsize))
+        self.resume = resume               # yields TickEvent; gaps after reconnects are backfilled
+        self._buf: deque = deque()
+        self._latest: "OrderedDict[str, Any]" = OrderedDict()   # conflate: symbol -> latest tick
+        self._end_item: Optional[_End] = None
+        self._getter: Optional[asyncio.Future] = None
+        self._space: Optional[asyncio.Future] = None
+        self.closed = False
+        # stats
+        self.received = 0     # ticks offered by the hub
+        self.delivered = 0    # ticks returned by __anext__
+        self.dropped = 0      # discarded because the queue was full
+        self.conflated = 0    # replaced by a newer tick of the same symbol
+        self.blocked = 0      # times the hub had to wait for this subscriber
+        self.backfilled = 0   # backfilled ticks offered (resume mode)
+
+    def qsize(self) -> int:
+        return len(self._latest) if self.policy == CONFLATE else len(self._buf)
+
+    def full(self) -> bool:
+        return self.qsize() >= self.maxsize
+
+    def _offer(self, key: str, item: Any) -> int:
+        """
+        Queues one tick without waiting.
+
+        Returns _QUEUED, _DROPPED (an older tick was discarded to make room), _CONFLATED
+        (it replaced the queued tick of the same symbol) or _FULL ("block" queue is full,
+        nothing was queued).
+        """
+        outcome = _QUEUED
+        if self.policy == CONFLATE:
+            if key in self._latest:
+                self._latest[key] = item   # keeps the symbol's place in line
+                self.conflated += 1
+                outcome = _CONFLATED
+            else:
+                if len(self._latest) >= self.maxsize:
+                    self._latest.popitem(last=False)
+                    self.dropped += 1
+                    outcome = _DROPPED
+                self._latest[key] = item
+        else:
+            if len(self._buf) >= self.maxsize:
+                if self.policy == BLOCK:
+                    return _FULL
+                self._buf.popleft()
+                self.dropped += 1
+                outcome = _DROPPED
+            self._buf.append(item)
+        self.received += 1
+        self._wake_getter()
+        return outcome
+
+    async def _wait_space(self) -> None:
+        self.blocked += 1
+        while self.full() and not self.closed:
+            self._space = asyncio.get_running_loop().create_future()
+            try:
+                await self._space
+            finally:
+                self._space = None
+
+    def _wake_getter(self) -> None:
+        if self._getter is not None and not self._getter.done():
+            self._getter.set_result(None)
+
+    def _end(self, error: Optional[BaseException] = None) -> None:
+        if not self.closed:
+            self.closed = True
+            self._end_item = _End(error)
+            self._wake_getter()
+            if self._space is not None and not self._space.done():
+                self._space.set_result(None)
+
+    def add(self, *symbols: str) -> None:
+        """Adds symbols to this subscription (resubscribes upstream if needed)."""
+        self._hub._add(self, symbols)
+
+    def remove(self, *symbols: str) -> None:
+        """Removes symbols from this subscription."""
+        self._hub._remove(self, symbols)
+
+    def close(self) -> None:
+        """Detaches from the hub; the iterator ends after the ticks already queued."""
+        self._hub._unsubscribe(self)
+        self._end()
+
+    def __aiter__(self) -> "TickSubscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        while True:
+            if self._buf:
+                item = self._buf.popleft()
+                break
+            if self._latest:
+                item = self._latest.popitem(last=False)[1]
+                break
+            end = self._end_item
+            if end is not None:
+                if end.error is not None:
+                    raise end.error
+                raise StopAsyncIteration
+            self._getter = asyncio.get_running_loop().create_future()
+            try:
+                await self._getter
+            finally:
+                self._getter = None
+        self.delivered += 1
+        if self._space is not None and not self._space.done():
+            self._space.set_result(None)
+        return item
+
+    def _take(self, out: list, limit: int) -> None:
+        buf = self._buf
+        while buf and len(out) < limit:
+            out.append(buf.popleft())
+        latest = self._latest
+        while latest and len(out) < limit:
+            out.append(latest.popitem(last=False)[1])
+
+    async def get_batch(self, max_items: int, max_delay_s: float) -> list:
+        """
+        Waits for the first tick, then up to `max_delay_s` more for others; returns at most
+        `max_items` ticks in arrival order. An empty list means the subscription has ended.
+        """
+        loop = asyncio.get_running_loop()
+        max_items = max(1, int(max_items))
+        out: list = []
+        deadline = None
+        while True:
+            self._take(out, max_items)
+            if len(out) >= max_items:
+                break
+            if self._end_item is not None:
+                if not out and self._end_item.error is not None:
+                    raise self._end_item.error
+                break
+            if out and deadline is None:
+                deadline = loop.time() + max_delay_s
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            self._getter = loop.create_future()
+            timer = loop.call_later(remaining, self._wake_getter) if remaining is not None else None
+            try:
+                await self._getter
+            finally:
+                self._getter = None
+                if timer is not None:
+                    timer.cancel()
+        self.delivered += len(out)
+        if out and self._space is not None and not self._space.done():
+            self._space.set_result(None)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "symbols": sorted(self.symbols),
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "resume": self.resume,
+            "queued": self.qsize(),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "blocked": self.blocked,
+            "backfilled": self.backfilled,
+        }
+
+    async def __aenter__(self) -> "TickSubscription":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class TickHub:
+    """One upstream OnSymbolTick stream for the union of all subscribed symbols, fanned out locally."""
+
+    def __init__(
+        self,
+        open_stream: Callable[[list], AsyncIterator[Any]],
+        resubscribe_delay_ms: float = 20.0,
+        log: Optional[logging.Logger] = None,
+        metrics: Optional[Any] = None,
+        fetch_bars: Optional[Callable[[str, datetime, datetime], Awaitable[Iterable[Any]]]] = None,
+        backfill_max_s: float = 6 * 3600.0,
+    ) -> None:
+        self._open_stream = open_stream
+        self._fetch_bars = fetch_bars
+        self.backfill_max_s = max(0.0, float(backfill_max_s))
+        self.metrics = metrics
+        self.resubscribe_delay_s = max(0.0, float(resubscribe_delay_ms)) / 1000.0
+        self.log = log or logging.getLogger("MT4Service.TickHub")
+        self._by_symbol: Dict[str, Set[TickSubscription]] = {}
+        self._names: Dict[str, str] = {}   # normalized -> name as first requested
+        self._upstream: Optional[asyncio.Task] = None
+        self._retiring: Optional[asyncio.Task] = None   # previous upstream, kept until the new one delivers
+        self._upstream_symbols: frozenset = frozenset()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_ms: Dict[str, int] = {}   # normalized symbol -> server time of its last live tick
+        self._server_offset_ms: Optional[int] = None   # server time - local UTC clock, from the last live tick
+        # stats
+        self.streams_opened = 0   # upstream subscriptions started
+        self.handover_duplicates = 0   # ticks the new upstream repeated from the old one during a handover
+        self.messages = 0         # ticks received from upstream
+        self.delivered = 0        # ticks handed to subscribers
+        self.unrouted = 0         # ticks for symbols nobody subscribes to (any more)
+        self.dropped = 0          # ticks discarded by full drop_oldest/conflate queues
+        self.conflated = 0        # ticks replaced by a newer one in conflate queues
+        self.blocked = 0          # times the reader waited for a full "block" subscriber
+        self.reconnects = 0       # upstream reconnects seen through the on_reconnected hook
+        self.backfilled = 0       # synthetic ticks delivered to resume subscribers
+        self.backfill_errors = 0
+
+    # --- subscriber side ---
+    def subscribe(
+        self,
+        symbols: Iterable[str],
+        *,
+        policy: str = BLOCK,
+        maxsize: int = 4096,
+        resume: bool = False,
+    ) -> TickSubscription:
+        """
+        New local subscription; the upstream stream is (re)opened shortly if the symbol set grew.
+
+        Args:
+            symbols: Symbols to receive.
+            policy: What to do when this subscriber's queue is full: "block" (default: make
+                the hub wait, which delays every other subscriber too, but loses nothing),
+                "drop_oldest" or "conflate" (keep only the latest tick per symbol).
+            maxsize: Queue capacity in ticks ("conflate": in symbols).
+            resume: Yield TickEvent instead of raw ticks; after an upstream reconnect the gap
+                since each symbol's last tick is backfilled from M1 history (flagged
+                backfilled=True) before live ticks resume. Needs a hub built with fetch_bars.
+        """
+        if resume and self._fetch_bars is None:
+            raise ValueError("resume needs a TickHub built with fetch_bars")
+        sub = TickSubscription(self, set(), policy=policy, maxsize=maxsize, resume=resume)
+        self._add(sub, symbols)
+        return sub
+
+    def _add(self, sub: TickSubscription, symbols: Iterable[str]) -> None:
+        for s in symbols:
+            key = norm_symbol(s)
+            if key and key not in sub.symbols:
+                sub.symbols.add(key)
+                self._by_symbol.setdefault(key, set()).add(sub)
+                self._names.setdefault(key, str(s).strip())
+        self._symbols_changed()
+
+    def _remove(self, sub: TickSubscription, symbols: Iterable[str]) -> None:
+        for s in symbols:
+            key = norm_symbol(s)
+            if key in sub.symbols:
+                sub.symbols.discard(key)
+                self._drop(sub, key)
+        self._symbols_changed()
+
+    def _unsubscribe(self, sub: TickSubscription) -> None:
+        for key in list(sub.symbols):
+            self._drop(sub, key)
+        sub.symbols = set()
+        self._symbols_changed()
+
+    def _drop(self, sub: TickSubscription, key: str) -> None:
+        subs = self._by_symbol.get(key)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._by_symbol[key]
+                self._names.pop(key, None)
+                self._last_ms.pop(key, None)
+
+    # --- upstream side ---
+    def _symbols_changed(self) -> None:
+        running = self._upstream is not None and not self._upstream.done()
+        if running and frozenset(self._by_symbol) == self._upstream_symbols:
+            return
+        if self._timer is None:
+            # debounce: many subscribe()/close() calls in a row -> one resubscribe
+            self._timer = asyncio.get_running_loop().call_later(self.resubscribe_delay_s, self._resubscribe)
+
+    def _resubscribe(self) -> None:
+        self._timer = None
+        want = frozenset(self._by_symbol)
+        running = self._upstream is not None and not self._upstream.done()
+        if running and want == self._upstream_symbols:
+            return
+        # make-before-break: the old stream keeps delivering until the new one has produced
+        # its first tick, so subscribers of unchanged symbols see no gap
+        if running:
+            if self._retiring is not None and not self._retiring.done():
+                self._upstream.cancel()   # an earlier handover is still pending: it never delivered
+            else:
+                self._retiring = self._upstream
+        self._upstream = None
+        self._upstream_symbols = want
+        if not want:
+            self._cancel_retiring()
+            return
+        self.streams_opened += 1
+        names = sorted(self._names[k] for k in want)
+        self._upstream = asyncio.ensure_future(self._run(names, handover=self._retiring is not None))
+
+    def _cancel_retiring(self) -> None:
+        task, self._retiring = self._retiring, None
+        if task is not None and not task.done():
+            task.cancel()
+
+    def _stream(self, names: list) -> AsyncIterator[Any]:
+        if self._fetch_bars is None:
+            return self._open_stream(names)
+        return self._open_stream(names, on_reconnected=self._on_reconnected)
+
+    async def _run(self, names: list, handover: bool = False) -> None:
+        me = asyncio.current_task()
+        # during a handover the new stream may repeat ticks the old one already delivered:
+        # per symbol, skip anything not newer than the last delivered tick until it catches up
+        pending: Optional[Set[str]] = None
+        try:
+            async for data in self._stream(names):
+                self.messages += 1
+                if self._upstream is not me:
+                    if self._retiring is me:
+                        blocked = self._dispatch(data)   # old stream, still covering the handover
+                        if blocked:
+                            await self._deliver_blocked(blocked, data)
+                    continue
+                if handover:
+                    handover = False
+                    pending = set(self._last_ms)
+                    self._cancel_retiring()
+                if pending:
+                    key = norm_symbol(_tick_symbol(data))
+                    if key in pending:
+                        ms = _tick_ms(data)
+                        last = self._last_ms.get(key)
+                        if ms is not None and last is not None and ms <= last:
+                            self.handover_duplicates += 1
+                            continue
+                        pending.discard(key)
+                blocked = self._dispatch(data)
+                if blocked:
+                    await self._deliver_blocked(blocked, data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            if self._upstream is me:
+                self.log.error("tick stream failed: %s", ex, exc_info=False)
+                self._end_all(ex)
+            return
+        if self._upstream is me:
+            self._end_all(None)  # server ended the stream
+
+    def _dispatch(self, data: Any) -> Optional[list]:
+        """Hands the tick to every subscriber of its symbol; returns full "block" subscribers."""
+        key = norm_symbol(_tick_symbol(data))
+        subs = self._by_symbol.get(key)
+        if not subs:
+            self.unrouted += 1
+            return None
+        ms = _tick_ms(data)
+        if ms is not None:
+            self._last_ms[key] = ms
+            self._server_offset_ms = ms - int(time.time() * 1000)
+        blocked = None
+        event = None
+        for sub in subs:
+            if sub.resume:
+                if event is None:
+                    event = TickEvent(data, False)
+                outcome = sub._offer(key, event)
+            else:
+                outcome = sub._offer(key, data)
+            if outcome == _FULL:
+                if blocked is None:
+                    blocked = []
+                blocked.append(sub)
+                continue
+            self.delivered += 1
+            if outcome != _QUEUED:
+                self._count_lost(sub, outcome)
+        return blocked
+
+    async def _deliver_blocked(self, subs: list, data: Any) -> None:
+        key = norm_symbol(_tick_symbol(data))
+        for sub in subs:
+            self.blocked += 1
+            if self.metrics is not None:
+                self.metrics.inc("tick_subscriber_blocked_total")
+            await sub._wait_space()
+            item = TickEvent(data, False) if sub.resume else data
+            if not sub.closed and sub._offer(key, item) != _FULL:
+                self.delivered += 1
+
+    # --- resume: gap backfill ---
+    async def _on_reconnected(self) -> None:
+        """Upstream reconnected: backfill every resume subscriber's gap before live ticks flow again."""
+        self.reconnects += 1
+        if self._server_offset_ms is None:
+            return   # no live tick yet: nothing to resume from
+        # tick times and M1 bars are broker server time, not UTC: shift the local clock onto it
+        until_ms = int(time.time() * 1000) + self._server_offset_ms
+        for key, subs in list(self._by_symbol.items()):
+            resumed = [s for s in subs if s.resume]
+            last = self._last_ms.get(key)
+            if not resumed or last is None:
+                continue
+            after = max(last, until_ms - int(self.backfill_max_s * 1000))
+            if after >= until_ms:
+                continue
+            try:
+                bars = await self._fetch_bars(
+                    self._names.get(key, key),
+                    _EPOCH + timedelta(milliseconds=after - _BAR_MS),
+                    _EPOCH + timedelta(milliseconds=until_ms),
+                )
+                ticks = bars_to_ticks(self._names.get(key, key), getattr(bars, "historical_quotes", bars) or [], after, until_ms)
+            except Exception as ex:
+                self.backfill_errors += 1
+                self.log.error("tick backfill for %s failed: %s", key, ex, exc_info=False)
+                continue
+            for data in ticks:
+                event = TickEvent(data, True)
+                for sub in resumed:
+                    if sub.closed:
+                        continue
+                    if sub._offer(key, event) == _FULL:
+                        self.blocked += 1
+                        await sub._wait_space()
+                        if sub.closed or sub._offer(key, event) == _FULL:
+                            continue
+                    sub.backfilled += 1
+                    self.backfilled += 1
+            if ticks:
+                self._last_ms[key] = ticks[-1].symbol_tick.time_msc
+                if self.metrics is not None:
+                    self.metrics.inc("tick_backfilled_total", len(ticks) * len(resumed))
+
+    def _count_lost(self, sub: TickSubscription, outcome: int) -> None:
+        if outcome == _CONFLATED:
+            self.conflated += 1
+            name = "tick_conflated_total"
+        else:
+            self.dropped += 1
+            name = "tick_dropped_total"
+        if self.metrics is not None:
+            self.metrics.inc(name, policy=sub.policy)
+
+    def _end_all(self, error: Optional[BaseException]) -> None:
+        subs = {s for group in self._by_symbol.values() for s in group}
+        self._by_symbol.clear()
+        self._names.clear()
+        self._upstream = None
+        self._upstream_symbols = frozenset()
+        self._cancel_retiring()
+        for sub in subs:
+            sub.symbols = set()
+            sub._end(error)
+
+    async def close(self) -> None:
+        """Ends every subscription and stops the upstream stream."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        tasks = [t for t in (self._upstream, self._retiring) if t is not None]
+        self._end_all(None)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    @property
+    def server_offset_ms(self) -> Optional[int]:
+        """Broker server time minus the local UTC clock, from the last live tick (None before one)."""
+        return self._server_offset_ms
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._by_symbol),
+            "subscribers": len({s for group in self._by_symbol.values() for s in group}),
+            "upstream_symbols": len(self._upstream_symbols),
+            "streams_opened": self.streams_opened,
+            "handover_duplicates": self.handover_duplicates,
+            "messages": self.messages,
+            "delivered": self.delivered,
+            "unrouted": self.unrouted,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "blocked": self.blocked,
+            "reconnects": self.reconnects,
+            "backfilled": self.backfilled,
+            "backfill_errors": self.backfill_errors,
+        }
+
+    def subscriber_stats(self) -> list[dict]:
+        """Queue counters of every live subscription."""
+        subs = {s for group in self._by_symbol.values() for s in group}
+        return [sub.stats() for sub in subs]
+
+
+"""
+TickHub multiplexes every local tick consumer onto ONE upstream OnSymbolTick stream.
+
+- subscribe(symbols) returns a TickSubscription (async iterator of OnSymbolTickData).
+- The upstream stream always covers the union of all subscribed symbols. When that set
+  changes (subscribe/add/remove/close) the stream is reopened once, after a short debounce
+  (resubscribe_delay_ms), so a burst of subscriptions costs one resubscribe.
+  Reopening is make-before-break: the old stream keeps delivering until the new one yields
+  its first tick; ticks the new stream repeats (not newer than a symbol's last delivered
+  one) are skipped and counted as handover_duplicates.
+- Ticks are routed by symbol; N subscribers of one symbol cost one upstream message.
+- Each subscription has its own bounded queue, so the reader never waits for a slow
+  consumer that is lossless (the default) or one that opted into shedding load:
+    block (default)        full -> the hub waits; ALL subscribers and, through gRPC flow
+                           control, the server stream slow down          (counted: blocked)
+    drop_oldest            full -> discard the oldest queued tick        (counted: dropped)
+    conflate               one slot per symbol holding the latest tick   (counted: conflated)
+  Totals also go to the account metrics (tick_dropped_total / tick_conflated_total /
+  tick_subscriber_blocked_total) when the hub has a registry.
+- Reconnects happen below, in MT4Account.execute_stream_with_reconnect. A non-recoverable
+  upstream error is raised from every subscription's iterator.
+- Resume mode (subscribe(..., resume=True), hub built with fetch_bars): the hub remembers the
+  server time of each symbol's last tick and the server-minus-local clock offset of the last
+  live tick. When the account reports a reconnect (on_reconnected hook, run before the stream
+  is reopened) it loads M1 quote_history for the gap up to "now" in server time (at most
+  backfill_max_s) and queues one synthetic tick per bar close, in time order, ahead of the
+  live ticks. Resume subscribers get TickEvent(data, backfilled) so consumers can tell them apart.
+
+Used by MT4Service.on_symbol_tick() (tick_hub=True, the default):
+    async for tick in svc.on_symbol_tick(["EURUSD", "GBPUSD"]):   # shared upstream
+        ...
+    async for tick in svc.on_symbol_tick("EURUSD", policy="conflate"):   # latest only
+        ...
+    sub = svc.tick_hub.subscribe(["EURUSD"], maxsize=256); sub.add("USDJPY"); sub.close()
+    batch = await sub.get_batch(512, 0.05)   # up to 512 ticks, gathered for at most 50 ms
+    async for ev in svc.on_symbol_tick("EURUSD", resume=True):   # TickEvent
+        bars.update(ev.symbol_tick, backfilled=ev.backfilled)
+    svc.tick_hub.stats()   # {'symbols': ..., 'subscribers': ..., 'streams_opened': ...}
+"""
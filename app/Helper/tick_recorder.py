@@ -0,0 +1,414 @@
+# app/tick_recorder.py
+from __future__ import annotations
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .symbols import norm_symbol
+
+try:
+    import numpy as np  # optional: only the reader needs it
+except ImportError:
+    np = None
+
+
+_DAY_MS = 86_400_000
+# column name -> (file name, array typecode, numpy dtype)
+_COLUMNS = (
+    ("time", "time.i8", "q", "<i8"),   # server time, epoch ms
+    ("bid", "bid.f8", "d", "<f8"),
+    ("ask", "ask.f8", "d", "<f8"),
+)
+_COUNT_FILE = "count"                 # rows made durable by the last sync (little-endian u64)
+_NO_TIME = -(1 << 63)
+
+
+def _safe(symbol: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_#" else "_" for ch in norm_symbol(symbol)) or "_"
+
+
+def _day_name(day: int) -> str:
+    return datetime.fromtimestamp(day * 86_400, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _read_count(directory: str) -> int:
+    try:
+        with open(os.path.join(directory, _COUNT_FILE), "rb") as f:
+            return struct.unpack("<Q", f.read(8))[0]
+    except (OSError, struct.error):
+        return 0
+
+
+def _read_last_time(directory: str) -> int:
+    """Time of the last durable row of a day directory (_NO_TIME when empty or missing)."""
+    rows = _read_count(directory)
+    if not rows:
+        return _NO_TIME
+    try:
+        with open(os.path.join(directory, _COLUMNS[0][1]), "rb") as f:
+            f.seek((rows - 1) * 8)
+            return struct.unpack("<q", f.read(8))[0]
+    except (OSError, struct.error):
+        return _NO_TIME
+
+
+def _day_index(name: str) -> Optional[int]:
+    try:
+        return int(datetime.strptime(name, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()) // 86_400
+    except ValueError:
+        return None
+
+
+class _Column:
+    """One fixed-width column file, memory-mapped and grown in chunks."""
+
+    __slots__ = ("path", "itemsize", "fd", "mm", "capacity")
+
+    def __init__(self, path: str, itemsize: int, rows: int, chunk_rows: int) -> None:
+        self.path = path
+        self.itemsize = itemsize
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.capacity = max(rows + chunk_rows, os.fstat(self.fd).st_size // itemsize)
+        os.ftruncate(self.fd, self.capacity * itemsize)
+        self.mm = mmap.mmap(self.fd, self.capacity * itemsize)
+
+    def write(self, row: int, data: bytes, chunk_rows: int) -> None:
+        end = row * self.itemsize + len(data)
+        if end > self.capacity * self.itemsize:
+            self.mm.close()
+            self.capacity = max(self.capacity * 2, end // self.itemsize + chunk_rows)
+            os.ftruncate(self.fd, self.capacity * self.itemsize)
+            self.mm = mmap.mmap(self.fd, self.capacity * self.itemsize)
+        self.mm[row * self.itemsize:end] = data
+
+    def close(self, rows: int) -> None:
+        self.mm.close()
+        os.ftruncate(self.fd, rows * self.itemsize)   # drop the preallocated tail
+        os.close(self.fd)
+
+
+class _DayWriter:
+    """Columns of one symbol for one UTC day; appends continue after a restart."""
+
+    def __init__(self, directory: str, chunk_rows: int) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.rows = _read_count(directory)
+        self.synced_rows = self.rows
+        self.last_ms = _read_last_time(directory)    # appends must not go back before this
+        self.cols = [_Column(os.path.join(directory, fname), 8, self.rows, chunk_rows) for _, fname, _, _ in _COLUMNS]
+
+    def append(self, times: array, bids: array, asks: array) -> None:
+        """Appends rows already in time order and not older than last_ms (see TickRecorder.write)."""
+        row = self.rows
+        for col, data in zip(self.cols, (times, bids, asks)):
+            col.write(row, data.tobytes(), self.chunk_rows)
+        self.rows = row + len(times)
+        self.last_ms = times[-1]
+
+    def sync(self) -> None:
+        """msync the columns, then persist the row count (what readers trust)."""
+        if self.rows == self.synced_rows:
+            return
+        for col in self.cols:
+            col.mm.flush()
+        tmp = os.path.join(self.directory, _COUNT_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(struct.pack("<Q", self.rows))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.directory, _COUNT_FILE))
+        self.synced_rows = self.rows
+
+    def close(self) -> None:
+        self.sync()
+        for col in self.cols:
+            col.close(self.rows)
+
+
+class TickRecorder:
+    """
+    Appends every received tick to per-symbol, per-UTC-day columnar files:
+
+        <root>/<SYMBOL>/<YYYY-MM-DD>/time.i8 | bid.f8 | ask.f8 | count
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        fsync_interval_s: float = 1.0,
+        chunk_rows: int = 65536,
+        log: Optional[logging.Logger] = None,
+    ) -> None:
+        self.root = root
+        self.fsync_interval_s = max(0.0, float(fsync_interval_s))
+        self.chunk_rows = max(1024, int(chunk_rows))
+        self.log = log or logging.getLogger("MT4Service.TickRecorder")
+        self._writers: Dict[Tuple[str, int], _DayWriter] = {}
+        self._current_day: Dict[str, int] = {}      # symbol -> newest day being written
+        self._sub: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_sync = time.monotonic()
+        self._sync_future: Optional[asyncio.Future] = None   # sync() running in a worker thread
+        # stats
+        self.ticks = 0
+        self.out_of_order = 0
+        self.batches = 0
+        self.syncs = 0
+        self.rotations = 0
+
+    # --- writing ---
+    def write(self, items: Iterable[Any]) -> int:
+        """
+        Appends ticks (OnSymbolTickData, TickEvent or app.Helper.ticks.Tick) without syncing;
+        returns how many were written. Ticks are grouped per symbol and day, one append each.
+
+        Each day file stays sorted by time (TickReader searches it): a tick older than the
+        last one written for its symbol and day, including rows already on disk from before
+        a restart, is skipped and counted in `out_of_order`.
+        """
+        groups: Dict[Tuple[str, int], list] = {}
+        n = 0
+        for it in items:
+            t = getattr(it, "symbol_tick", None)
+            if t is None:
+                symbol, ms, bid, ask = it.symbol, it.time_msc, it.bid, it.ask
+            else:
+                symbol, ms, bid, ask = t.symbol, t.time_msc, t.bid, t.ask
+                if not ms:
+                    ms = t.time.seconds * 1000 + t.time.nanos // 1_000_000
+            key = (symbol, ms // _DAY_MS)
+            g = groups.get(key)
+            if g is None:
+                # [last time, times, bids, asks]
+                g = groups[key] = [self._last_ms(symbol, key[1]), array("q"), array("d"), array("d")]
+            if ms < g[0]:
+                self.out_of_order += 1
+                continue
+            g[0] = ms
+            g[1].append(ms)
+            g[2].append(bid)
+            g[3].append(ask)
+            n += 1
+        for (symbol, day), (_, times, bids, asks) in groups.items():
+            if times:
+                self._writer(symbol, day).append(times, bids, asks)
+        self.ticks += n
+        self.batches += 1
+        return n
+
+    def _writer(self, symbol: str, day: int) -> _DayWriter:
+        key = (_safe(symbol), day)
+        w = self._writers.get(key)
+        if w is None:
+            w = self._writers[key] = _DayWriter(os.path.join(self.root, key[0], _day_name(day)), self.chunk_rows)
+            prev = self._current_day.get(key[0])
+            if prev is None or day > prev:
+                self._current_day[key[0]] = day
+                if prev is not None:
+                    self._rotate(key[0], prev)
+        return w
+
+    def _last_ms(self, symbol: str, day: int) -> int:
+        w = self._writers.get((_safe(symbol), day))
+        if w is not None:
+            return w.last_ms
+        return _read_last_time(os.path.join(self.root, _safe(symbol), _day_name(day)))
+
+    def _rotate(self, symbol: str, day: int) -> None:
+        """The symbol moved to a new day: the previous day's files are synced and trimmed."""
+        w = self._writers.pop((symbol, day), None)
+        if w is not None:
+            w.close()
+            self.rotations += 1
+
+    def sync(self) -> None:
+        """Makes everything written so far durable (msync + row counts fsynced)."""
+        for w in list(self._writers.values()):
+            w.sync()
+        self.syncs += 1
+        self._last_sync = time.monotonic()
+
+    # --- live recording ---
+    def start(self, service: Any, symbols: Iterable[str], *, maxsize: int = 1_000_000) -> None:
+        """Starts recording `symbols` from service.on_symbol_tick (via its tick hub when present)."""
+        if self._task is not None and not self._task.done():
+            raise RuntimeError("recorder already started")
+        names = [symbols] if isinstance(symbols, str) else list(symbols)
+        hub = getattr(service, "tick_hub", None)
+        if hub is not None:
+            self._sub = hub.subscribe(names, policy="drop_oldest", maxsize=maxsize)
+            self._task = asyncio.ensure_future(self._run_hub(self._sub))
+        else:
+            self._task = asyncio.ensure_future(self._run_stream(service.on_symbol_tick(names)))
+
+    async def _run_hub(self, sub: Any) -> None:
+        try:
+            while True:
+                batch = await sub.get_batch(16384, 0.0)   # everything queued so far
+                if not batch:
+                    return
+                self.write(batch)
+                await self._maybe_sync()
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            self.log.error("tick recorder stopped: %s", ex, exc_info=False)
+
+    async def _run_stream(self, stream: Any) -> None:
+        buf: List[Any] = []
+        try:
+            flushed = time.monotonic()
+            async for data in stream:
+                buf.append(data)
+                # one append per column per batch: per-tick writes cost ~20 µs
+                if len(buf) >= 1024 or time.monotonic() - flushed >= 0.05:
+                    batch, buf = buf, []
+                    self.write(batch)
+                    flushed = time.monotonic()
+                    await self._maybe_sync()
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            self.log.error("tick recorder stopped: %s", ex, exc_info=False)
+        finally:
+            if buf:
+                self.write(buf)   # also on close(): nothing received is left unwritten
+
+    async def _maybe_sync(self) -> None:
+        if time.monotonic() - self._last_sync >= self.fsync_interval_s:
+            # msync/fsync block: keep them off the event loop. The thread can't be cancelled,
+            # so close() waits for this future before it unmaps the files.
+            fut = self._sync_future = asyncio.get_running_loop().run_in_executor(None, self.sync)
+            await asyncio.shield(fut)
+            self._sync_future = None
+
+    async def close(self) -> None:
+        """Stops recording, syncs and trims every open file."""
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        fut, self._sync_future = self._sync_future, None
+        if fut is not None:
+            try:
+                await fut
+            except Exception as ex:
+                self.log.error("tick recorder sync failed: %s", ex, exc_info=False)
+        writers, self._writers = self._writers, {}
+        for w in writers.values():
+            w.close()
+        self._current_day.clear()
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "batches": self.batches,
+            "open_files": len(self._writers),
+            "syncs": self.syncs,
+            "rotations": self.rotations,
+            "out_of_order": self.out_of_order,
+            "dropped": getattr(self._sub, "dropped", 0),
+        }
+
+
+class TickReader:
+    """Reads TickRecorder files as numpy arrays mapped straight from disk (read-only, zero-copy)."""
+
+    def __init__(self, root: str) -> None:
+        if np is None:
+            raise ImportError("TickReader requires numpy (pip install numpy)")
+        self.root = root
+
+    def symbols(self) -> List[str]:
+        try:
+            return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+        except FileNotFoundError:
+            return []
+
+    def days(self, symbol: str) -> List[str]:
+        try:
+            return sorted(os.listdir(os.path.join(self.root, _safe(symbol))))
+        except FileNotFoundError:
+            return []
+
+    def read_day(self, symbol: str, day: str) -> Dict[str, Any]:
+        """{'time', 'bid', 'ask'} of one day: read-only memmaps over the durable rows."""
+        directory = os.path.join(self.root, _safe(symbol), day)
+        rows = _read_count(directory)
+        out: Dict[str, Any] = {}
+        for name, fname, _, dtype in _COLUMNS:
+            path = os.path.join(directory, fname)
+            n = min(rows, os.path.getsize(path) // 8) if os.path.exists(path) else 0
+            out[name] = np.memmap(path, dtype=dtype, mode="r", shape=(n,)) if n else np.empty(0, dtype=dtype)
+        return out
+
+    def iter_range(self, symbol: str, since_ms: int, until_ms: int) -> Iterator[Dict[str, Any]]:
+        """Zero-copy slices, one per day, of the ticks with since_ms <= time < until_ms."""
+        first, last = since_ms // _DAY_MS, (until_ms - 1) // _DAY_MS
+        for name in self.days(symbol):
+            day = _day_index(name)
+            if day is None or day < first or day > last:
+                continue
+            cols = self.read_day(symbol, name)
+            t = cols["time"]
+            lo, hi = np.searchsorted(t, since_ms, "left"), np.searchsorted(t, until_ms, "left")
+            if hi > lo:
+                yield {k: v[lo:hi] for k, v in cols.items()}
+
+    def read(self, symbol: str, since_ms: int, until_ms: int) -> Dict[str, Any]:
+        """
+        {'time', 'bid', 'ask'} for since_ms <= time < until_ms. Views into the mapped file when
+        the range lies within one day; ranges spanning days are concatenated (one copy).
+        """
+        parts = list(self.iter_range(symbol, since_ms, until_ms))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {name: np.empty(0, dtype=dtype) for name, _, _, dtype in _COLUMNS}
+        return {name: np.concatenate([p[name] for p in parts]) for name, _, _, _ in _COLUMNS}
+
+
+"""
+TickRecorder persists the tick stream for research and post-mortems; TickReader maps it back.
+
+- Layout: <root>/<SYMBOL>/<YYYY-MM-DD (UTC, from server tick time)>/ with one fixed-width file
+  per column (time.i8 epoch ms, bid.f8, ask.f8) plus `count`, the number of durable rows.
+- Files are memory-mapped and preallocated in chunk_rows steps; a batch of ticks becomes one
+  slice copy per column and symbol. When a symbol's ticks move to a new day the previous
+  day's files are synced and trimmed to size (rotation).
+- Durability: every fsync_interval_s the mappings are msync'ed and `count` is rewritten and
+  fsync'ed (in a worker thread; close() waits for it). Readers and restarts only trust `count`,
+  so a crash loses at most the last interval and never exposes half-written rows.
+- Each day's time column stays sorted: ticks older than the last row written (or, after a
+  restart, the last durable row) are skipped and counted as out_of_order.
+- Live recording subscribes through the tick hub (own drop_oldest queue, `dropped` in stats())
+  and drains it in batches with get_batch().
+- TickReader returns read-only numpy memmaps; within one day read()/iter_range() slices are
+  zero-copy views located with searchsorted on the time column. numpy is needed for reading only.
+
+Usage:
+    rec = TickRecorder("data/ticks")
+    rec.start(svc, ["EURUSD", "GBPUSD"])
+    ...
+    await rec.close()
+
+    cols = TickReader("data/ticks").read("EURUSD", since_ms, until_ms)
+    spread = cols["ask"] - cols["bid"]
+
+Throughput: examples/Bench_tick_recorder.py
+Long-term storage: tick_codec.archive_recorded_day() compresses a finished day (~3-4 bytes/tick).
+"""
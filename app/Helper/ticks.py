@@ -0,0 +1,138 @@
+# app/ticks.py
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+
+from .tick_hub import TickEvent
+
+try:
+    import numpy as np  # optional: only needed for ticks_to_array()
+except ImportError:
+    np = None
+
+
+class SymbolIds:
+    """Interns symbol names to small integer ids (stable for the life of the table)."""
+
+    __slots__ = ("_ids", "names")
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []     # id -> symbol name
+
+    def id_of(self, symbol: str) -> int:
+        i = self._ids.get(symbol)
+        if i is None:
+            i = self._ids[symbol] = len(self.names)
+            self.names.append(symbol)
+        return i
+
+    def name_of(self, symbol_id: int) -> str:
+        return self.names[symbol_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Process-wide table used when the caller doesn't bring its own
+SYMBOL_IDS = SymbolIds()
+
+
+class Tick:
+    """One decoded tick: plain Python floats/ints in slots instead of a protobuf message."""
+
+    __slots__ = ("symbol_id", "symbol", "bid", "ask", "time_msc", "backfilled")
+
+    def __init__(
+        self,
+        symbol_id: int,
+        symbol: str,
+        bid: float,
+        ask: float,
+        time_msc: int,
+        backfilled: bool = False,
+    ) -> None:
+        self.symbol_id = symbol_id
+        self.symbol = symbol
+        self.bid = bid
+        self.ask = ask
+        self.time_msc = time_msc       # server time, epoch milliseconds
+        self.backfilled = backfilled   # True for ticks replayed by resume mode
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) * 0.5
+
+    @property
+    def spread(self) -> float:
+        return self.ask - self.bid
+
+    @property
+    def time(self) -> float:
+        """Server time in epoch seconds."""
+        return self.time_msc / 1000.0
+
+    def __repr__(self) -> str:
+        return f"Tick({self.symbol!r}, bid={self.bid}, ask={self.ask}, time_msc={self.time_msc})"
+
+
+def decode_tick(data: Any, ids: Optional[SymbolIds] = None) -> Tick:
+    """
+    OnSymbolTickData (or a resume-mode TickEvent wrapping one) -> Tick.
+
+    Each protobuf field is read exactly once; time_msc falls back to `time` when unset.
+    """
+    # exact type check: getattr() with a default on a protobuf message costs an exception
+    backfilled = data.backfilled if type(data) is TickEvent else False
+    t = data.symbol_tick
+    symbol = t.symbol
+    ms = t.time_msc
+    if not ms:
+        ts = t.time
+        ms = ts.seconds * 1000 + ts.nanos // 1_000_000
+    table = SYMBOL_IDS if ids is None else ids
+    return Tick(table.id_of(symbol), symbol, t.bid, t.ask, ms, backfilled)
+
+
+# numpy structured layout of a tick batch (28 bytes per tick)
+TICK_DTYPE = (
+    np.dtype([("symbol_id", "<u4"), ("bid", "<f8"), ("ask", "<f8"), ("time_msc", "<i8")])
+    if np is not None else None
+)
+
+
+def ticks_to_array(items: Iterable[Any], ids: Optional[SymbolIds] = None) -> Any:
+    """
+    Packs ticks (Tick objects or OnSymbolTickData) into one numpy structured array
+    of TICK_DTYPE. Requires numpy.
+    """
+    if np is None:
+        raise ImportError("ticks_to_array() requires numpy (pip install numpy)")
+    ticks = [t if type(t) is Tick else decode_tick(t, ids) for t in items]
+    arr = np.empty(len(ticks), dtype=TICK_DTYPE)
+    if ticks:
+        arr["symbol_id"] = [t.symbol_id for t in ticks]
+        arr["bid"] = [t.bid for t in ticks]
+        arr["ask"] = [t.ask for t in ticks]
+        arr["time_msc"] = [t.time_msc for t in ticks]
+    return arr
+
+
+"""
+Compact tick records for consumers that touch every tick.
+
+- decode_tick(data) turns an OnSymbolTickData into a Tick (__slots__: symbol_id, symbol, bid,
+  ask, time_msc, backfilled). Fields are copied out of the protobuf message once, so the
+  consumer's attribute reads are plain slot reads afterwards.
+- symbol_id comes from a SymbolIds table (process-wide SYMBOL_IDS by default), so vectorized
+  code can key arrays by a small integer instead of a string.
+- ticks_to_array(ticks) builds a numpy structured array (TICK_DTYPE) for a batch; numpy is
+  optional and only imported here.
+
+Used by MT4Service.on_symbol_tick(..., decode="tick"):
+    async for t in svc.on_symbol_tick(["EURUSD", "GBPUSD"], decode="tick"):
+        print(t.symbol, t.bid, t.ask, t.spread)
+    arr = ticks_to_array(batch)                  # arr["bid"], arr["symbol_id"], ...
+    SYMBOL_IDS.name_of(int(arr["symbol_id"][0]))
+
+Throughput: examples/Bench_tick_decode.py
+"""
@@ -14,10 +14,21 @@ like MT4Sugar for more convenient trading operations.
 """
 from __future__ import annotations
 
-from typing import Any, Optional, Union, Sequence, Iterable, AsyncIterator, TYPE_CHECKING
+import inspect
+import time
+import weakref
+from typing import Any, Callable, Optional, Union, Sequence, Iterable, AsyncIterator, TYPE_CHECKING
 from datetime import datetime, timedelta
 
 from MetaRpcMT4.mt4_account import MT4Account
+from app.Helper.quote_batcher import QuoteBatcher
+from app.Helper.single_flight import SingleFlight
+from app.Helper.symbols import norm_symbol
+from app.Helper.tick_hub import TickHub
+from app.Helper.order_store import OrderStore
+from app.Helper.bar_store import BarStore, TF_MS, dt_to_ms, history_to_array, rows_to_array
+from app.Helper.history_downloader import HistoryDownloader
+from app.Helper.ticks import decode_tick, ticks_to_array
 # Protobuf enums for mapping types
 from package.MetaRpcMT4 import mt4_term_api_market_info_pb2 as market_info_pb2
 from package.MetaRpcMT4 import mt4_term_api_account_helper_pb2 as account_helper_pb2
@@ -50,7 +61,7 @@ def _as_list(obj: Any) -> list:
     for attr in (
         "data", "items", "symbols", "names", "values",
         "Data", "Items", "Symbols", "Names", "Values",
-        "result", "Result",
+        "result", "Result", "SymbolNameInfos", "symbol_infos",
     ):
         if hasattr(obj, attr):
             try:
@@ -82,12 +93,7 @@ def _norm_sym_name(s: str) -> str:
     - Converts to uppercase
     - Removes trailing dots (e.g., 'EURUSD.' -> 'EURUSD')
     """
-    if not s:
-        return ""
-    s = str(s).strip().upper()
-    if s.endswith("."):
-        s = s[:-1]
-    return s
+    return norm_symbol(s)
 
 
 def _sym_name(x: Any) -> str:
@@ -149,33 +155,115 @@ def _sym_name(x: Any) -> str:
     return ""
 
 
+# Timeframe spellings -> ENUM_QUOTE_HISTORY_TIMEFRAME value, built once at import
+_TF_ENUM: dict[str, int] = {
+    **dict(market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME.items()),
+    **{
+        alias: market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME.Value(name)
+        for name, aliases in {
+            "QH_PERIOD_M1": ("M1", "1M"),
+            "QH_PERIOD_M5": ("M5", "5M"),
+            "QH_PERIOD_M15": ("M15", "15M"),
+            "QH_PERIOD_M30": ("M30", "30M"),
+            "QH_PERIOD_H1": ("H1", "1H"),
+            "QH_PERIOD_H4": ("H4", "4H"),
+            "QH_PERIOD_D1": ("D1", "1D", "D"),
+            "QH_PERIOD_W1": ("W1", "1W", "W"),
+            "QH_PERIOD_MN1": ("MN1", "1MN", "MN", "MO"),
+        }.items()
+        for alias in aliases
+    },
+}
+# enum value -> short name ("H1")
+_TF_NAME: dict[int, str] = {
+    value: name[len("QH_PERIOD_"):] for name, value in market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME.items()
+}
+# short name -> bar length in minutes (window estimate when since is omitted)
+_TF_MINUTES: dict[str, int] = {
+    "M1": 1, "M5": 5, "M15": 15, "M30": 30,
+    "H1": 60, "H4": 240, "D1": 1440, "W1": 10080, "MN1": 43200,
+}
+
+
 def _to_timeframe_enum(tf: Union[str, int]) -> int:
     """
     Convert timeframe string to protobuf enum value.
 
-    Supports MT4 standard format ("M1", "H1", "D1") and enum names ("QH_PERIOD_H1").
-    Returns the corresponding ENUM_QUOTE_HISTORY_TIMEFRAME value.
+    Supports MT4 standard format ("M1", "H1", "D1"), enum names ("QH_PERIOD_H1") and enum
+    values. Returns the corresponding ENUM_QUOTE_HISTORY_TIMEFRAME value (one dict lookup);
+    anything else raises ValueError.
     """
     if isinstance(tf, int):
+        if tf not in _TF_NAME:
+            raise ValueError(f"Unsupported timeframe: {tf}")
         return tf
-    key = str(tf).strip().upper()
-    # Allow direct enum name like "QH_PERIOD_H1"
-    if hasattr(market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME, key):
-        return getattr(market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME, key)
-    # Map short forms to enum names
-    table = {
-        "M1": "QH_PERIOD_M1", "1M": "QH_PERIOD_M1",
-        "M5": "QH_PERIOD_M5", "5M": "QH_PERIOD_M5",
-        "M15": "QH_PERIOD_M15", "15M": "QH_PERIOD_M15",
-        "M30": "QH_PERIOD_M30", "30M": "QH_PERIOD_M30",
-        "H1": "QH_PERIOD_H1", "1H": "QH_PERIOD_H1",
-        "H4": "QH_PERIOD_H4", "4H": "QH_PERIOD_H4",
-        "D1": "QH_PERIOD_D1", "1D": "QH_PERIOD_D1", "D": "QH_PERIOD_D1",
-        "W1": "QH_PERIOD_W1", "1W": "QH_PERIOD_W1", "W": "QH_PERIOD_W1",
-        "MN1": "QH_PERIOD_MN1", "1MN": "QH_PERIOD_MN1", "MN": "QH_PERIOD_MN1", "MO": "QH_PERIOD_MN1",
-    }
-    name = table.get(key, key)
-    return getattr(market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME, name)
+    try:
+        return _TF_ENUM[str(tf).strip().upper()]
+    except KeyError:
+        raise ValueError(f"Unsupported timeframe: {tf}") from None
+
+
+def _timeframe_name(tf: Union[str, int]) -> str:
+    """"H1" / "1H" / QH_PERIOD_H1 / enum value -> short name ("H1")."""
+    return _TF_NAME[_to_timeframe_enum(tf)]
+
+
+# quote_history call shapes seen across package builds: (probe args, probe kwargs), adapter
+def _qh_since_until(fn, symbol, tf, since, until, limit):
+    return fn(symbol=symbol, since=since, until=until, limit=limit)
+
+
+def _qh_start_end(fn, symbol, tf, since, until, limit):
+    return fn(symbol=symbol, start=since, end=until, limit=limit)
+
+
+def _qh_positional(fn, symbol, tf, since, until, limit):
+    return fn(symbol, tf, since, until)
+
+
+def _qh_timeframe_kw(fn, symbol, tf, since, until, limit):
+    return fn(symbol=symbol, timeframe=tf, since=since, until=until, limit=limit)
+
+
+_QH_SHAPES = (
+    (((), {"symbol": "", "since": None, "until": None, "limit": None}), _qh_since_until),
+    (((), {"symbol": "", "start": None, "end": None, "limit": None}), _qh_start_end),
+    ((("", 0, None, None), {}), _qh_positional),
+    (((), {"symbol": "", "timeframe": 0, "since": None, "until": None, "limit": None}), _qh_timeframe_kw),
+)
+
+# MT4Account -> resolved adapter (adapters hold no reference to the account)
+_QH_ADAPTERS: "weakref.WeakKeyDictionary[Any, Callable[..., Any]]" = weakref.WeakKeyDictionary()
+
+
+def _quote_history_adapter(acc: Any) -> Callable[..., Any]:
+    """
+    Returns adapter(fn, symbol, tf_enum, since, until, limit) for this account's quote_history.
+
+    The candidate shapes are checked against the method's signature once (no RPC is made);
+    the first that binds is cached per account object.
+    """
+    adapter = _QH_ADAPTERS.get(acc)
+    if adapter is not None:
+        return adapter
+    adapter = _qh_positional          # MT4Account's own shape when nothing can be inspected
+    try:
+        sig = inspect.signature(acc.quote_history)
+    except (TypeError, ValueError):
+        sig = None
+    if sig is not None:
+        for (args, kwargs), candidate in _QH_SHAPES:
+            try:
+                sig.bind(*args, **kwargs)
+            except TypeError:
+                continue
+            adapter = candidate
+            break
+    try:
+        _QH_ADAPTERS[acc] = adapter
+    except TypeError:
+        pass                          # not weak-referenceable: probed again next time
+    return adapter
 
 
 def _to_opened_sort(sort: Optional[Union[str, int]]) -> Optional[int]:
@@ -246,9 +334,63 @@ class MT4Service:
     This service can be used directly or wrapped by MT4Sugar for high-level operations.
     """
 
-    def __init__(self, account: MT4Account) -> None:
+    def __init__(
+        self,
+        account: MT4Account,
+        *,
+        quote_batch_window_ms: Optional[float] = None,
+        quote_batch_max: int = 64,
+        read_dedup: bool = True,
+        read_ttl_ms: float = 0.0,
+        tick_hub: bool = True,
+        orders_reconcile_s: float = 30.0,
+        bar_store: Optional[str] = None,
+        history_concurrency: int = 4,
+    ) -> None:
+        """
+        Args:
+            account: Connected (or connectable) MT4Account.
+            quote_batch_window_ms: If set, concurrent quote() calls arriving within this
+                window are merged into one QuoteMany RPC (see app.Helper.quote_batcher).
+            quote_batch_max: Flush a quote batch as soon as it holds this many symbols.
+            read_dedup: Concurrent identical account_summary()/opened_orders()/symbols()
+                calls share one RPC (see app.Helper.single_flight).
+            read_ttl_ms: Additionally reuse those results for this many milliseconds.
+            tick_hub: on_symbol_tick() consumers share one upstream stream for the union
+                of their symbols (see app.Helper.tick_hub); False = one stream per call.
+            orders_reconcile_s: How often order_store re-checks its on_trade-fed mirror
+                against opened_orders() (see app.Helper.order_store).
+            bar_store: sqlite file for a persistent quote_history bar cache (":memory:" for
+                a process-local one); history reads then download only missing ranges
+                (see app.Helper.bar_store). None = off.
+            history_concurrency: Chunks in flight at once when long quote_history ranges and
+                download_history() are split up (see app.Helper.history_downloader).
+        """
         self._acc = account
         self._sugar: Optional["MT4Sugar"] = None
+        self._quote_batcher: Optional[QuoteBatcher] = None
+        if quote_batch_window_ms is not None:
+            self._quote_batcher = QuoteBatcher(
+                self._acc.quote,
+                self._acc.quote_many,
+                window_ms=quote_batch_window_ms,
+                max_batch=quote_batch_max,
+            )
+        self._reads: Optional[SingleFlight] = SingleFlight(read_ttl_ms / 1000.0) if read_dedup else None
+        self.tick_hub: Optional[TickHub] = (
+            TickHub(self._acc.on_symbol_tick, metrics=self._acc.metrics, fetch_bars=self._m1_bars)
+            if tick_hub else None
+        )
+        # Opened orders mirror (started lazily by its first reader)
+        self.order_store = OrderStore(self._acc.opened_orders, self._acc.on_trade, reconcile_s=orders_reconcile_s)
+        # Long history ranges: chunked, concurrent, retried per chunk
+        self.history_downloader = HistoryDownloader(self._history_chunk, max_concurrency=history_concurrency)
+        # Persistent bar cache in front of quote_history (opt-in)
+        self.bar_store: Optional[BarStore] = (
+            BarStore(bar_store, self._fetch_history, server_now=self._server_now_ms) if bar_store else None
+        )
+        self._qh_adapter: Optional[Callable[..., Any]] = None    # resolved on first quote_history
+        self._server_offset: Optional[tuple[int, float]] = None  # (server - local ms, taken at monotonic)
 
     @property
     def sugar(self) -> "MT4Sugar":
@@ -258,6 +400,21 @@ class MT4Service:
             self._sugar = MT4Sugar(self)
         return self._sugar  # type: ignore[return-value]
 
+    async def close(self) -> None:
+        """
+        Stops everything this service started in the background: sugar workers and feeds,
+        the order mirror, the shared tick stream, history download workers and the bar store.
+        The account (and its channels) belongs to the caller and stays open.
+        """
+        if self._sugar is not None:
+            await self._sugar.aclose()
+        await self.order_store.close()
+        if self.tick_hub is not None:
+            await self.tick_hub.close()
+        await self.history_downloader.close()
+        if self.bar_store is not None:
+            await self.bar_store.close()
+
     # ───────────────── CONNECTION ─────────────────
 
     def get_headers(self) -> dict:
@@ -268,6 +425,31 @@ class MT4Service:
         """Reconnect to MT4 server using existing credentials."""
         await self._acc.reconnect()
 
+    def channel_stats(self) -> list[dict]:
+        """Per sub-channel transport counters (calls, errors, in-flight, open streams)."""
+        return self._acc.channel_stats()
+
+    def reconnect_stats(self) -> dict:
+        """Shared reconnect counters (attempts, coalesced waiters, durations, circuit state)."""
+        return self._acc.reconnect_stats()
+
+    def stream_health(self) -> dict:
+        """Stall watchdog view of the open streams (staleness, expected timeout, stalls)."""
+        return self._acc.stream_health()
+
+    @property
+    def metrics(self):
+        """Metrics registry of the underlying account (shared by every layer above it)."""
+        return self._acc.metrics
+
+    def metrics_snapshot(self) -> dict:
+        """Per-RPC/per-stream latency histograms, outcomes, retries and reconnects as a dict."""
+        return self._acc.metrics_snapshot()
+
+    def metrics_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return self._acc.metrics_prometheus()
+
     async def connect_by_host_port(
         self,
         host: str,
@@ -306,8 +488,25 @@ class MT4Service:
 
     # ───────────────── ACCOUNT ────────────────────
 
+    async def _read(self, key: tuple, fn) -> Any:
+        """Runs a read RPC through the single-flight layer (if enabled)."""
+        if self._reads is None:
+            return await fn()
+        return await self._reads.do(key, fn)
+
+    def _invalidate_account_reads(self) -> None:
+        """Called after order operations: balances and opened orders have changed."""
+        if self._reads is not None:
+            self._reads.invalidate(("account_summary",))
+            self._reads.invalidate_prefix("opened_orders")
+        self.order_store.mark_dirty()
+
+    def read_dedup_stats(self) -> dict:
+        """Counters of the read single-flight layer (empty dict when disabled)."""
+        return self._reads.stats() if self._reads is not None else {}
+
     async def account_summary(self) -> Any:
-        return await self._acc.account_summary()
+        return await self._read(("account_summary",), self._acc.account_summary)
 
     # ─────────────── SYMBOLS / QUOTES ─────────────
 
@@ -319,7 +518,7 @@ class MT4Service:
           - str -> substring (case-insensitive)
           - Sequence[str] -> exact names (case-insensitive), with normalization
         """
-        raw = await self._acc.symbols()
+        raw = await self._read(("symbols",), self._acc.symbols)
         items = _as_list(raw)
 
         if mask is None:
@@ -361,8 +560,14 @@ class MT4Service:
         return out
 
     async def quote(self, symbol: str) -> Any:
+        if self._quote_batcher is not None:
+            return await self._quote_batcher.quote(symbol)
         return await self._acc.quote(symbol)
 
+    def quote_batch_stats(self) -> dict:
+        """Counters of the quote batcher (empty dict when batching is off)."""
+        return self._quote_batcher.stats() if self._quote_batcher is not None else {}
+
     async def quote_many(self, symbols: Sequence[str]) -> Any:
         return await self._acc.quote_many(list(symbols))
 
@@ -379,47 +584,105 @@ class MT4Service:
      If since/until are not specified, we substitute a window by tf and limit:
      until := now (UTC naive)
      since := until - bars * duration_per_bar
-     Then we try the packet signatures.
+     The package call signature is resolved once per account (_quote_history_adapter).
+     With bar_store the window is served from the persistent cache (same QuoteHistoryData shape).
         """
-        # 1) let's substitute a reasonable range
-        now = datetime.utcnow()
+        tf_val, tf_name, since, until = self._history_window(timeframe, since, until, limit)
+        if self.bar_store is not None:
+            rows = await self.bar_store.history(symbol, tf_name, dt_to_ms(since), dt_to_ms(until))
+            return BarStore.to_reply(symbol, rows)
+        if dt_to_ms(until) - dt_to_ms(since) > self.history_downloader.chunk_bars * TF_MS.get(tf_name, 0):
+            return await self._fetch_history(symbol, tf_val, since, until)
+        return await self._quote_history_rpc(symbol, tf_val, since, until, limit)
+
+    async def quote_history_array(
+        self,
+        symbol: str,
+        *,
+        timeframe: Union[str, int] = "H1",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: Optional[int] = 100,
+    ) -> Any:
+        """
+        Same window as quote_history(), returned as a numpy structured array of BAR_DTYPE
+        (time epoch ms, open, high, low, close, volume), oldest first. Columns are filled
+        straight from the reply (or the bar store rows); no per-bar dicts. Requires numpy.
+        """
+        tf_val, tf_name, since, until = self._history_window(timeframe, since, until, limit)
+        if self.bar_store is not None:
+            return rows_to_array(await self.bar_store.history(symbol, tf_name, dt_to_ms(since), dt_to_ms(until)))
+        return history_to_array(await self.quote_history(symbol, timeframe=tf_val, since=since, until=until, limit=limit))
+
+    @staticmethod
+    def _history_window(
+        timeframe: Union[str, int], since: datetime | None, until: datetime | None, limit: Optional[int],
+    ) -> tuple[int, str, datetime, datetime]:
+        """-> (tf enum, tf short name, since, until) with the defaults described in quote_history()."""
+        tf_val = _to_timeframe_enum(timeframe)
+        tf_name = _TF_NAME[tf_val]
         if until is None:
-            until = now
-
-        # bar length estimation
-        tf_map_minutes = {
-            "M1": 1, "M5": 5, "M15": 15, "M30": 30,
-            "H1": 60, "H4": 240, "D1": 1440, "W1": 10080, "MN1": 43200,
-        }
-        if isinstance(timeframe, str):
-            tf_key = timeframe.strip().upper()
-            bar_minutes = tf_map_minutes.get(tf_key, 60)
-        else:
-            bar_minutes = 60  # default if enum/int is passed
-
-        bars = int(limit or 100)
-        approx = timedelta(minutes=bar_minutes * bars)
+            until = datetime.utcnow()
         if since is None:
-            since = until - approx
-
-        fn = getattr(self._acc, "quote_history")
+            since = until - timedelta(minutes=_TF_MINUTES.get(tf_name, 60) * int(limit or 100))
+        return tf_val, tf_name, since, until
 
-        # 2) first signatures that expect since/until/limit by name
-        try:
-            return await fn(symbol=symbol, since=since, until=until, limit=limit)
-        except TypeError:
-            pass
+    async def _server_now_ms(self, symbol: str) -> int:
+        """
+        The broker's clock in epoch ms (bar and tick times are server time, not UTC): the live
+        tick offset from the tick hub when it has one, else the time of a fresh quote for
+        `symbol` (re-read at most once a minute). Falls back to the local clock.
+        """
+        local = int(time.time() * 1000)
+        offset = self.tick_hub.server_offset_ms if self.tick_hub is not None else None
+        if offset is not None:
+            return local + offset
+        if self._server_offset is not None and time.monotonic() - self._server_offset[1] < 60.0:
+            return local + self._server_offset[0]
         try:
-            return await fn(symbol=symbol, start=since, end=until, limit=limit)
-        except TypeError:
-            pass
+            q = await self.quote(symbol)
+            ts = getattr(getattr(q, "data", q), "date_time", None)
+            if ts is None or not ts.seconds:
+                return local
+            # no bar can be newer than the last tick, so a stale quote only makes "now" earlier
+            server_ms = ts.seconds * 1000 + ts.nanos // 1_000_000
+        except Exception:
+            return local
+        self._server_offset = (server_ms - local, time.monotonic())
+        return server_ms
+
+    async def _fetch_history(self, symbol: str, timeframe: Union[str, int], since: datetime, until: datetime) -> Any:
+        """Long ranges and BarStore top-ups: chunked download via history_downloader."""
+        return await self.history_downloader.download(symbol, _to_timeframe_enum(timeframe), since, until)
+
+    async def download_history(
+        self,
+        symbols: Union[str, Sequence[str], dict],
+        *,
+        timeframe: Union[str, int] = "H1",
+        since: datetime,
+        until: datetime | None = None,
+    ) -> Any:
+        """
+        Long-range history in parallel chunks. One symbol -> QuoteHistoryData; a list (priority =
+        position) or {symbol: priority} -> {symbol: QuoteHistoryData}.
+        """
+        until = until or datetime.utcnow()
+        tf = _to_timeframe_enum(timeframe)
+        if isinstance(symbols, str):
+            return await self.history_downloader.download(symbols, tf, since, until)
+        return await self.history_downloader.download_many(symbols, tf, since, until)
 
-        # 3) if the build requires a timeframe enum positionally
-        tf_val = _to_timeframe_enum(timeframe)
-        try:
-            return await fn(symbol, tf_val, since, until)
-        except TypeError:
-            return await fn(symbol=symbol, timeframe=tf_val, since=since, until=until, limit=limit)
+    async def _history_chunk(self, symbol: str, tf_val: int, since: datetime, until: datetime) -> Any:
+        """history_downloader fetch hook: one chunk through the resolved quote_history call."""
+        return await self._quote_history_rpc(symbol, tf_val, since, until, None)
+
+    async def _quote_history_rpc(
+        self, symbol: str, tf_val: int, since: datetime, until: datetime, limit: Optional[int],
+    ) -> Any:
+        if self._qh_adapter is None:
+            self._qh_adapter = _quote_history_adapter(self._acc)
+        return await self._qh_adapter(self._acc.quote_history, symbol, tf_val, since, until, limit)
 
     async def tick_value_with_size(
         self,
@@ -441,9 +704,12 @@ class MT4Service:
         sort: Optional[Union[str, int]] = None,
     ) -> Any:
         if sort is None:
-            return await self._acc.opened_orders()
+            return await self._read(("opened_orders", None), self._acc.opened_orders)
         sort_mode = _to_opened_sort(sort)
-        return await self._acc.opened_orders(sort_mode=sort_mode)
+        return await self._read(
+            ("opened_orders", sort_mode),
+            lambda: self._acc.opened_orders(sort_mode=sort_mode),
+        )
 
     async def opened_orders_tickets(self) -> Any:
         return await self._acc.opened_orders_tickets()
@@ -508,12 +774,15 @@ class MT4Service:
         if "tp" in kwargs and "takeprofit" not in kwargs:
             kwargs["takeprofit"] = kwargs.pop("tp")
 
-        return await self._acc.order_send(
-            symbol=symbol,
-            operation_type=operation_type,
-            volume=volume,
-            **kwargs,
-        )
+        try:
+            return await self._acc.order_send(
+                symbol=symbol,
+                operation_type=operation_type,
+                volume=volume,
+                **kwargs,
+            )
+        finally:
+            self._invalidate_account_reads()
 
     async def order_modify(self, ticket: int, **kwargs: Any) -> Any:
         """
@@ -526,26 +795,117 @@ class MT4Service:
             kwargs["new_stop_loss"] = kwargs.pop("sl_price")
         if "tp_price" in kwargs and "new_take_profit" not in kwargs:
             kwargs["new_take_profit"] = kwargs.pop("tp_price")
-        return await self._acc.order_modify(order_ticket=ticket, **kwargs)
+        try:
+            return await self._acc.order_modify(order_ticket=ticket, **kwargs)
+        finally:
+            self._invalidate_account_reads()
 
     async def order_close_delete(self, ticket: int, **kwargs: Any) -> Any:
         """Exact: order_close_delete(order_ticket, lots=None, closing_price=None, slippage=None)."""
-        return await self._acc.order_close_delete(order_ticket=ticket, **kwargs)
+        try:
+            return await self._acc.order_close_delete(order_ticket=ticket, **kwargs)
+        finally:
+            self._invalidate_account_reads()
 
     async def order_close_by(self, ticket_a: int, ticket_b: int, **kwargs: Any) -> Any:
         """Exact: order_close_by(ticket_to_close, opposite_ticket_closing_by)."""
-        return await self._acc.order_close_by(
-            ticket_to_close=ticket_a,
-            opposite_ticket_closing_by=ticket_b,
-            **kwargs,
-        )
+        try:
+            return await self._acc.order_close_by(
+                ticket_to_close=ticket_a,
+                opposite_ticket_closing_by=ticket_b,
+                **kwargs,
+            )
+        finally:
+            self._invalidate_account_reads()
 
     # ─────────────────── STREAMS ──────────────────
 
-    async def on_symbol_tick(self, symbols: Union[str, Iterable[str]]) -> AsyncIterator[Any]:
+    async def on_symbol_tick(
+        self,
+        symbols: Union[str, Iterable[str]],
+        *,
+        policy: str = "block",
+        maxsize: int = 4096,
+        resume: bool = False,
+        decode: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Ticks for `symbols`. With the tick hub each caller reads its own bounded queue:
+        policy "block" (default: lossless, a full queue holds back the shared stream through
+        gRPC flow control) / "drop_oldest" / "conflate" (latest tick per symbol), see TickHub.
+
+        resume=True yields TickEvent(data, backfilled): after a reconnect the missed interval
+        is replayed from M1 history (backfilled=True) before live ticks (backfilled=False).
+
+        decode="tick" yields compact app.Helper.ticks.Tick records (symbol_id, symbol, bid,
+        ask, time_msc, backfilled) instead of OnSymbolTickData.
+        """
+        if decode not in (None, "tick"):
+            raise ValueError(f"decode must be None or 'tick', got {decode!r}")
         names = [symbols] if isinstance(symbols, str) else list(symbols) or ["EURUSD"]
-        async for item in self._acc.on_symbol_tick(names):
-            yield item
+        if resume and self.tick_hub is None:
+            raise ValueError("on_symbol_tick(resume=True) requires tick_hub=True")
+        if self.tick_hub is None:
+            async for item in self._acc.on_symbol_tick(names):
+                yield item if decode is None else decode_tick(item)
+            return
+
+        sub = self.tick_hub.subscribe(names, policy=policy, maxsize=maxsize, resume=resume)
+        try:
+            if decode is None:
+                async for item in sub:
+                    yield item
+            else:
+                async for item in sub:
+                    yield decode_tick(item)
+        finally:
+            sub.close()
+
+    async def on_symbol_tick_batched(
+        self,
+        symbols: Union[str, Iterable[str]],
+        max_batch: int = 1024,
+        max_delay_ms: float = 50.0,
+        *,
+        as_array: bool = True,
+        policy: str = "block",
+        maxsize: int = 65536,
+    ) -> AsyncIterator[Any]:
+        """
+        Ticks for `symbols` in batches: each batch holds the ticks that arrived within
+        `max_delay_ms` of its first tick, at most `max_batch` of them, in arrival order.
+
+        Yields a numpy structured array (app.Helper.ticks.TICK_DTYPE: symbol_id, bid, ask,
+        time_msc; names via ticks.SYMBOL_IDS) or, with as_array=False, a list of Tick.
+        Lossless by default (policy="block"); pass "drop_oldest" to shed load instead.
+        """
+        if self.tick_hub is None:
+            raise ValueError("on_symbol_tick_batched() requires tick_hub=True")
+        if as_array:
+            ticks_to_array(())  # fail fast without numpy
+        names = [symbols] if isinstance(symbols, str) else list(symbols) or ["EURUSD"]
+        delay_s = max(0.0, float(max_delay_ms)) / 1000.0
+
+        sub = self.tick_hub.subscribe(names, policy=policy, maxsize=maxsize)
+        try:
+            while True:
+                batch = await sub.get_batch(max_batch, delay_s)
+                if not batch:
+                    return
+                ticks = [decode_tick(item) for item in batch]
+                yield ticks_to_array(ticks) if as_array else ticks
+        finally:
+            sub.close()
+
+    async def _m1_bars(self, symbol: str, since: datetime, until: datetime) -> Any:
+        """M1 quote history for tick backfill (TickHub resume mode)."""
+        return await self._quote_history_rpc(
+            symbol, market_info_pb2.ENUM_QUOTE_HISTORY_TIMEFRAME.QH_PERIOD_M1, since, until, None,
+        )
+
+    def tick_hub_stats(self) -> dict:
+        """Counters of the shared tick stream (empty dict when tick_hub=False)."""
+        return self.tick_hub.stats() if self.tick_hub is not None else {}
 
     async def on_trade(self) -> AsyncIterator[Any]:
         async for item in self._acc.on_trade():
@@ -591,16 +951,24 @@ class MT4Service:
 ║                                                                              ║
 ║ Exports:                                                                     ║
 ║   MT4Service class with:                                                     ║
-║     • Connection: get_headers(), reconnect(),                                ║
+║     • Connection: get_headers(), reconnect(), channel_stats(),               ║
+║       reconnect_stats(), stream_health(), metrics, metrics_snapshot(),       ║
+║       metrics_prometheus(),                                                  ║
 ║       connect_by_host_port(), connect_by_server_name().                      ║
-║     • Account:  account_summary().                                           ║
+║     • Account:  account_summary(), read_dedup_stats().                       ║
 ║     • Market:   symbols(), symbol_params_many(), quote(),                    ║
-║                  quote_many(), quote_history(), tick_value_with_size().      ║
+║                  quote_many(), quote_history(), tick_value_with_size(),      ║
+║                  quote_batch_stats(), download_history(),                    ║
+║                  quote_history_array().                                      ║
 ║     • Orders:   opened_orders(), opened_orders_tickets(), orders_history().  ║
 ║     • Trading:  order_send(), order_modify(),                                ║
 ║                  order_close_delete(), order_close_by().                     ║
-║     • Streams:  on_symbol_tick(), on_trade(),                                ║
-║                  on_opened_orders_tickets(), on_opened_orders_profit().      ║
+║     • Streams:  on_symbol_tick(), on_symbol_tick_batched(), on_trade(),      ║
+║                  on_opened_orders_tickets(), on_opened_orders_profit(),      ║
+║                  tick_hub, tick_hub_stats().                                 ║
+║     • order_store: opened orders mirror (on_trade events + reconcile).       ║
+║     • bar_store: persistent quote_history bar cache (opt-in, sqlite).        ║
+║     • history_downloader: chunked parallel quote_history downloads.          ║
 ║     • sugar property: lazy MT4Sugar facade for high-level ops.               ║
 ║                                                                              ║
 ║ Behavior / Defaults:                                                         ║
@@ -609,9 +977,31 @@ class MT4Service:
 ║   • Symbols normalized (trim/upper/remove trailing dot).                     ║
 ║   • symbols(mask): supports None / str contains / list-of-exact names.       ║
 ║   • quote_history(): timeframe str ("H1") or enum; auto infers since/until   ║
-║     by (limit * TF) if not provided; tries multiple package signatures.      ║
+║     by (limit * TF) if not provided; the package call signature is probed    ║
+║     once per MT4Account and cached (no TypeError fallbacks per call).        ║
+║   • quote_history_array(): same window as a numpy structured array           ║
+║     (time ms, open, high, low, close, volume) built in one pass, no dicts.   ║
+║     With bar_store=path only missing head/tail ranges are downloaded, bars   ║
+║     are merged on disk and ranges answered from there (survives restarts).   ║
+║     Windows above history_downloader.chunk_bars bars are split into chunks   ║
+║     fetched concurrently (bounded, retried per chunk, reassembled in order). ║
 ║   • Sorting: opened_orders/orders_history accept str/int mapped to pb enums. ║
-║   • Streams: simply relay underlying async generators from MT4Account.       ║
+║   • Streams: relay underlying async generators from MT4Account;              ║
+║     on_symbol_tick() consumers share ONE upstream stream via TickHub         ║
+║     (tick_hub=True), resubscribed when the union of symbols changes.         ║
+║     on_symbol_tick(resume=True): after a reconnect the gap is backfilled     ║
+║     from M1 quote_history, events flagged backfilled/live (TickEvent).       ║
+║     on_symbol_tick(decode="tick"): compact __slots__ Tick records.           ║
+║     on_symbol_tick_batched(): ticks per max_delay_ms window as one numpy     ║
+║     structured array (or list of Tick) for vectorized consumers.             ║
+║     Streams silent for longer than expected (ticks: learned rate, market     ║
+║     hours; timers: period) are resubscribed by the account stall watchdog.   ║
+║   • quote(): optional microbatching (quote_batch_window_ms) merges           ║
+║     concurrent calls into one QuoteMany RPC; off by default.                 ║
+║   • account_summary/opened_orders/symbols: identical concurrent calls share  ║
+║     one RPC (read_dedup, optional read_ttl_ms); order ops invalidate them.   ║
+║   • order_store: seeded from opened_orders(), updated by on_trade events,    ║
+║     reconciled every orders_reconcile_s and after each order operation.      ║
 ║                                                                              ║
 ║ Rate limit:                                                                  ║
 ║   • None at service level (no throttling here).                              ║
@@ -653,7 +1043,9 @@ class MT4Service:
 ║ _as_list(obj)             — safely flattens pb containers to Python list     ║
 ║ _norm_sym_name(s)         — trims/uppercases/removes trailing dot            ║
 ║ _sym_name(x)              — extracts symbol from str/dict/pb/nested fields   ║
-║ _to_timeframe_enum(tf)    — maps "H1"/"D1"/enum-name → pb enum               ║
+║ _to_timeframe_enum(tf)    — maps "H1"/"D1"/enum-name → pb enum (precompiled) ║
+║ _timeframe_name(tf)       — "1H"/enum/enum-name → short name ("H1")          ║
+║ _quote_history_adapter()  — resolves quote_history's call shape per account  ║
 ║ _to_opened_sort()/…       — maps string/int → sort enums for pb              ║
 ║ _to_operation_type(...)   — side+type/op → OrderSendOperationType            ║
 ╚══════════════════════════════════════════════════════════════════════════════╝
@@ -11,6 +11,11 @@ from typing import Any, Dict, Iterator, Optional
 from .Helper.errors import MT4Error, ConnectivityError, OrderRejected, ModifyRejected, map_backend_error
 from .Helper.hooks import HookBus
 from .Helper.rate_limit import RateLimiter
+from .Helper.symbol_registry import SymbolRegistry
+from .Helper.symbol_specs import SymbolSpec, SymbolSpecTable
+from .Helper.quote_cache import QuoteCache
+from .Helper.stream_deltas import profit_deltas, ticket_deltas
+from .Helper.bar_engine import BarEngine
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -25,7 +30,21 @@ class MT4Sugar:
 
     _defaults: Dict[str, Any]
 
-    def __init__(self, service: "MT4Service") -> None:
+    def __init__(
+        self,
+        service: "MT4Service",
+        *,
+        quote_max_age_ms: float = 1000.0,
+        bars_capacity: int = 500,
+    ) -> None:
+        """
+        Args:
+            service: MT4Service to drive.
+            quote_max_age_ms: Pricing helpers accept a cached quote up to this old before
+                falling back to a Quote RPC (see app.Helper.quote_cache).
+            bars_capacity: Bars kept in memory per symbol and timeframe by bar_engine
+                (see app.Helper.bar_engine).
+        """
         self._svc = service
 
         # Logger (simple, can be reconfigured in main)
@@ -42,6 +61,25 @@ class MT4Sugar:
         # Rate limiter for order submissions (10 ops/sec by default)
         self._order_send_rl = RateLimiter(per_second=10.0)
 
+        # Broker symbol universe, loaded once and refreshed in the background (5 min)
+        self.symbol_registry = SymbolRegistry(self._svc.symbols, refresh_s=300.0)
+
+        # Symbol specs for pricing/sizing: one SymbolParamsMany + one TickValueWithSize, 1 h TTL
+        self.symbol_specs = SymbolSpecTable(
+            lambda: self._svc.symbol_params_many(None),
+            lambda names: self._svc.tick_value_with_size(symbols=names),
+            ttl_s=3600.0,
+        )
+
+        # Last bid/ask per symbol, fed by the shared tick stream
+        self.quote_cache = QuoteCache(getattr(self._svc, "tick_hub", None), max_age_ms=quote_max_age_ms)
+
+        # Live M1..D1 bars, seeded from history by bars() and then fed by the tick stream
+        self.bar_engine = BarEngine(capacity=bars_capacity)
+        self._bars_seeded: set[tuple[str, str]] = set()
+        self._bar_sub: Any = None
+        self._bar_pump: Optional[asyncio.Task] = None
+
         # Minimal, sensible defaults
         self._defaults = {
             "symbol": None,
@@ -129,6 +167,38 @@ class MT4Sugar:
         """Return a default value by key with fallback."""
         return self._defaults.get(key, fallback)
 
+    async def aclose(self) -> None:
+        """Stop background work: watcher/trailing workers, bar feed, quote cache and symbol refresh.
+
+        Named aclose() because close(ticket) closes an order. MT4Service.close() calls it.
+        """
+        self._ensure_workers()
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        for task in workers:
+            try:
+                await task
+            except BaseException:
+                pass
+        self._workers.clear()
+        self._workers_meta.clear()
+
+        sub, pump = self._bar_sub, self._bar_pump
+        self._bar_sub = self._bar_pump = None
+        self._bars_seeded.clear()
+        if sub is not None:
+            sub.close()
+        if pump is not None and not pump.done():
+            pump.cancel()
+            try:
+                await pump
+            except asyncio.CancelledError:
+                pass
+
+        await self.quote_cache.close()
+        await self.symbol_registry.close()
+
     # endregion
 
 
@@ -136,8 +206,15 @@ class MT4Sugar:
     # region SYMBOLS & PRICING UTILS
     # ──────────────────────────────────
 
-    # Simple in-memory cache for symbol params to avoid extra RPC calls
-    _sym_cache: dict[str, dict]
+    async def _quote(self, symbol: str) -> Any:
+        """Fresh cached quote, else a Quote RPC (whose reply is cached and the symbol watched)."""
+        q = self.quote_cache.get(symbol)
+        if q is not None:
+            return q
+        q = await self._svc.quote(symbol)
+        self.quote_cache.put_quote(symbol, q)
+        self.quote_cache.watch(symbol)
+        return q
 
     def _extract_quote_field(self, q: Any, field: str) -> float | None:
         """Extract field from quote (protobuf or dict)."""
@@ -149,22 +226,20 @@ class MT4Sugar:
             return float(q.get(field) or q.get(field.capitalize()) or 0)
         return None
 
-    async def _get_symbol_params(self, symbol: str, force_refresh: bool = False) -> dict:
-        """Fetch and cache symbol parameters via service.symbol_params_many()."""
-        if not hasattr(self, "_sym_cache"):
-            self._sym_cache = {}
+    async def _spec(self, symbol: str, force_refresh: bool = False) -> SymbolSpec:
+        """Return the cached SymbolSpec (safe defaults if the terminal doesn't report the symbol)."""
+        try:
+            spec = await self.symbol_specs.get(symbol, force_refresh=force_refresh)
+        except Exception as e:
+            raise map_backend_error(e, context="symbol_params_many", payload={"symbol": symbol})
+        return spec if spec is not None else SymbolSpec((symbol or "").strip().upper())
 
-        key = symbol.upper()
-        params = self._sym_cache.get(key) if not force_refresh else None
-        if params is None:
-            try:
-                # Expect service to return a mapping {symbol: {param_name: value, ...}}
-                data = await self._svc.symbol_params_many([key])
-            except Exception as e:
-                raise map_backend_error(e, context="symbol_params_many", payload={"symbol": key})
-            params = (data or {}).get(key) or {}
-            self._sym_cache[key] = params
-        return params
+    async def warmup(self) -> None:
+        """Load the symbol universe and all symbol specs up front (3 RPCs in total)."""
+        try:
+            await asyncio.gather(self.symbol_registry.load(), self.symbol_specs.load())
+        except Exception as e:
+            raise map_backend_error(e, context="warmup")
 
     async def ensure_symbol(
         self,
@@ -184,58 +259,44 @@ class MT4Sugar:
         if not key:
             raise ValueError("Symbol must be a non-empty string")
 
-        # 1) Try to ensure the symbol is known/loaded by the backend (and possibly activate it)
+        # 1) Check the symbol against the in-memory universe (no Symbols RPC per call)
         try:
-            _ = await self._svc.symbols([key])
+            name = await self.symbol_registry.resolve(key)
         except Exception:
             # Fallback for backends without symbols()
             try:
-                _ = await self._get_symbol_params(key, force_refresh=force_refresh)
+                await self.symbol_specs.load(force=force_refresh)
             except Exception as e:
                 raise map_backend_error(e, context="symbols", payload={"symbol": key})
+        else:
+            # An empty universe means the backend doesn't list symbols: don't reject anything
+            if name is None and len(self.symbol_registry):
+                raise MT4Error(f"Unknown symbol '{key}'", details={"symbol": key})
 
         # 2) Optionally preload params into local cache (and/or validate trade_allowed)
         if preload_params or require_trade_allowed or force_refresh:
-            p = await self._get_symbol_params(key, force_refresh=force_refresh)
+            spec = await self._spec(key, force_refresh=force_refresh)
 
-            if require_trade_allowed:
-                ta = (
-                    p.get("trade_allowed")
-                    if "trade_allowed" in p
-                    else p.get("TradeAllowed")
-                )
-                if ta is False:
-                    raise RuntimeError(f"Trade not allowed for symbol '{key}'")
+            if require_trade_allowed and not spec.trade_allowed:
+                raise RuntimeError(f"Trade not allowed for symbol '{key}'")
 
 
     async def point(self, symbol: str) -> float:
         """Return symbol's minimal price step (Point)."""
-        p = await self._get_symbol_params(symbol)
-        return float(p.get("point") or p.get("Point") or 1e-5)
+        return (await self._spec(symbol)).point
 
     async def digits(self, symbol: str) -> int:
         """Return symbol's digits."""
-        p = await self._get_symbol_params(symbol)
-        if "digits" in p:
-            return int(p["digits"])
-        if "Digits" in p:
-            return int(p["Digits"])
-        pt = float(p.get("point") or 1e-5)
-        import math
-        return max(0, int(round(-math.log10(pt))))
+        return (await self._spec(symbol)).digits
 
     async def pip_size(self, symbol: str) -> float:
         """Return pip size in price units for this symbol."""
-        pt = await self.point(symbol)
-        d = await self.digits(symbol)
-        if d in (3, 5):
-            return pt * 10.0
-        return pt
+        return (await self._spec(symbol)).pip_size
 
     async def spread_pips(self, symbol: str) -> float:
         """Return current spread in pips (ask-bid converted to pips)."""
         try:
-            q = await self._svc.quote(symbol)
+            q = await self._quote(symbol)
         except Exception as e:
             raise map_backend_error(e, context="quote", payload={"symbol": symbol})
         pip = await self.pip_size(symbol)
@@ -248,7 +309,7 @@ class MT4Sugar:
     async def mid_price(self, symbol: str) -> float:
         """Return mid price = (bid + ask)/2."""
         try:
-            q = await self._svc.quote(symbol)
+            q = await self._quote(symbol)
         except Exception as e:
             raise map_backend_error(e, context="quote", payload={"symbol": symbol})
         bid = self._extract_quote_field(q, "bid")
@@ -259,15 +320,12 @@ class MT4Sugar:
 
     async def _lot_step(self, symbol: str) -> float:
         """Return lot step (volume_step) or 0.01 as a safe default."""
-        p = await self._get_symbol_params(symbol)
-        return float(p.get("volume_step") or p.get("VolumeStep") or 0.01)
+        return (await self._spec(symbol)).volume_step
 
     async def _lot_bounds(self, symbol: str) -> tuple[float | None, float | None]:
         """Return (min_lot, max_lot) if available."""
-        p = await self._get_symbol_params(symbol)
-        mn = p.get("min_lot") or p.get("volume_min") or p.get("VolumeMin")
-        mx = p.get("max_lot") or p.get("volume_max") or p.get("VolumeMax")
-        return (float(mn) if mn is not None else None, float(mx) if mx is not None else None)
+        spec = await self._spec(symbol)
+        return spec.volume_min, spec.volume_max
 
     def _round_to_grid(self, value: float, step: float) -> float:
         """Round value to nearest multiple of step (banker's rounding avoided)."""
@@ -313,7 +371,7 @@ class MT4Sugar:
         """Return last bid/ask and time for a symbol."""
         await self.ensure_symbol(symbol)
         try:
-            q = await self._svc.quote(symbol)
+            q = await self._quote(symbol)
         except Exception as e:
             raise map_backend_error(e, context="quote", payload={"symbol": symbol})
         bid = self._extract_quote_field(q, "bid")
@@ -418,7 +476,7 @@ class MT4Sugar:
 
         while True:
             try:
-                q = await self._svc.quote(symbol)
+                q = await self._quote(symbol)
             except Exception as e:
                 raise map_backend_error(e, context="quote", payload={"symbol": symbol})
             bid = self._extract_quote_field(q, "bid")
@@ -441,75 +499,139 @@ class MT4Sugar:
         since: int | None = None,
         until: int | None = None,
     ) -> list[dict]:
-        """Return OHLCV bars; aggregates from ticks if bars API is unavailable."""
-        ticks = await self.ticks(symbol, since=since, until=until, limit=None)
-        if not ticks:
-            return []
-        tf_sec = self._timeframe_to_seconds(timeframe)
-        if tf_sec <= 0:
+        """Return OHLC bars, oldest first: [{'time': epoch_ms (bar open), 'open', 'high', 'low', 'close', 'volume', 'spread'}, ...].
+
+        Without since/until the bars come from bar_engine: the first call for a symbol/timeframe
+        seeds it from quote_history and starts the live tick feed, later calls are answered from
+        memory (the last bar is the one still forming). since/until (epoch ms or datetime) read
+        the server history directly.
+        """
+        tf = (timeframe or "").strip().upper()
+        if self._timeframe_to_seconds(tf) <= 0:
             raise ValueError(f"Unsupported timeframe: {timeframe}")
-        bars = self._aggregate_ticks_to_bars(ticks, tf_sec)
-        if count is not None and count > 0:
-            bars = bars[-count:]
-        return bars
+        await self.ensure_symbol(symbol)
+
+        live = (
+            since is None and until is None
+            and tf in self.bar_engine.timeframes
+            and (count is None or count <= self.bar_engine.capacity)
+            and getattr(self._svc, "tick_hub", None) is not None
+        )
+        if not live:
+            bars = await self._history_bars(symbol, tf, count=count, since=since, until=until)
+            return bars[-count:] if count else bars
+
+        key = (symbol.strip().upper().rstrip("."), tf)
+        if key not in self._bars_seeded or self._bar_pump is None or self._bar_pump.done():
+            await self._seed_bars(symbol, tf)
+            self._bars_seeded.add(key)
+        return self.bar_engine.bars(symbol, tf, count)
+
+    async def _seed_bars(self, symbol: str, tf: str) -> None:
+        # subscribe before reading history so no tick falls between the two
+        self._bar_feed(symbol)
+        rows = await self._history_bars(symbol, tf, count=self.bar_engine.capacity)
+        self.bar_engine.seed(symbol, tf, rows)
+
+    def _bar_feed(self, symbol: str) -> None:
+        hub = self._svc.tick_hub
+        if self._bar_sub is None or self._bar_sub.closed or self._bar_pump is None or self._bar_pump.done():
+            if self._bar_sub is not None:
+                self._bar_sub.close()
+            self._bars_seeded.clear()
+            self._bar_sub = hub.subscribe([symbol], policy="drop_oldest", maxsize=65536)
+            self._bar_pump = asyncio.ensure_future(self._run_bar_feed(self._bar_sub))
+        else:
+            self._bar_sub.add(symbol)
+
+    async def _run_bar_feed(self, sub) -> None:
+        update = self.bar_engine.update_tick
+        try:
+            while True:
+                batch = await sub.get_batch(4096, 0.0)   # everything queued, one wake-up
+                if not batch:
+                    return
+                for data in batch:
+                    update(data)
+        except Exception as e:
+            # next bars() call reseeds from history and resubscribes
+            self.log.error("bar feed stopped: %s", e, exc_info=False)
+
+    async def _history_bars(
+        self,
+        symbol: str,
+        tf: str,
+        *,
+        count: int | None = None,
+        since: Any = None,
+        until: Any = None,
+    ) -> list[dict]:
+        """Server OHLC bars from quote_history as bar dicts (time = bar open, epoch ms)."""
+        since_dt, until_dt = self._to_utc_dt(since), self._to_utc_dt(until)
+        try:
+            data = await self._svc.quote_history(symbol, timeframe=tf, since=since_dt, until=until_dt, limit=count or 100)
+        except Exception as e:
+            raise map_backend_error(e, context="quote_history", payload={"symbol": symbol, "timeframe": tf, "since": since, "until": until})
+        spec = await self._spec(symbol)
+        out: list[dict] = []
+        for q in getattr(data, "historical_quotes", None) or []:
+            out.append({
+                "time": self._ts_ms(q.time),
+                "open": float(q.open),
+                "high": float(q.high),
+                "low": float(q.low),
+                "close": float(q.close),
+                "volume": int(q.tick_volume),
+                "spread": float(q.spread) * spec.point,   # history spread is in points
+            })
+        out.sort(key=lambda b: b["time"])
+        return out
 
     async def ticks(
         self, symbol: str, *, since: int | None = None, until: int | None = None, limit: int | None = None
     ) -> list[dict]:
-        """Return tick history: [{'time': epoch_ms, 'bid': float, 'ask': float}, ...]."""
+        """Return price history: [{'time': epoch_ms, 'bid': float, 'ask': float}, ...].
+
+        quote_history only serves bars, so this is one point per M1 bar close (bid = ask = close).
+        """
         await self.ensure_symbol(symbol)
         try:
-            data = await self._svc.quote_history(symbol=symbol, since=since, until=until, limit=limit)
+            data = await self._svc.quote_history(
+                symbol, timeframe="M1", since=self._to_utc_dt(since), until=self._to_utc_dt(until), limit=limit,
+            )
         except Exception as e:
             raise map_backend_error(e, context="quote_history", payload={"symbol": symbol, "since": since, "until": until, "limit": limit})
 
         out: list[dict] = []
-
-        # Handle protobuf response - could be repeated field or list
-        ticks_list = []
-        if hasattr(data, "ticks"):
-            ticks_list = data.ticks
-        elif hasattr(data, "quotes"):
-            ticks_list = data.quotes
-        elif hasattr(data, "bars"):
-            ticks_list = data.bars
-        elif isinstance(data, list):
-            ticks_list = data
-        else:
-            # Try to extract any iterable field
-            ticks_list = data if data else []
-
-        for t in ticks_list:
-            try:
-                # Extract time field
-                time_val = None
-                if hasattr(t, "time"):
-                    time_val = int(t.time) if hasattr(t.time, '__int__') else int(t.time.seconds) if hasattr(t.time, 'seconds') else None
-                elif hasattr(t, "date_time"):
-                    dt = t.date_time
-                    time_val = int(dt.seconds) if hasattr(dt, 'seconds') else None
-                elif isinstance(t, dict):
-                    time_val = int(t.get("time") or t.get("date_time") or 0)
-
-                if time_val is None:
-                    continue
-
-                # Extract bid/ask
-                bid = self._extract_quote_field(t, "bid")
-                ask = self._extract_quote_field(t, "ask")
-
-                if bid is None or ask is None:
-                    continue
-
-                out.append({"time": time_val, "bid": float(bid), "ask": float(ask)})
-            except Exception:
-                continue
-
+        for q in getattr(data, "historical_quotes", None) or []:
+            close = float(q.close)
+            out.append({"time": self._ts_ms(q.time), "bid": close, "ask": close})
         out.sort(key=lambda x: x["time"])
+        if limit:
+            out = out[-limit:]
         return out
 
     # --- helpers (private) ---
 
+    @staticmethod
+    def _ts_ms(ts: Any) -> int:
+        """pb Timestamp / datetime / epoch number -> epoch milliseconds."""
+        if hasattr(ts, "seconds"):
+            return int(ts.seconds) * 1000 + int(ts.nanos) // 1_000_000
+        if hasattr(ts, "timestamp"):
+            return int(ts.timestamp() * 1000)
+        v = int(ts)
+        return v if v >= 100_000_000_000 else v * 1000   # epoch seconds -> ms
+
+    @staticmethod
+    def _to_utc_dt(x: Any):
+        """None / datetime / epoch ms or s -> naive UTC datetime (what quote_history takes)."""
+        from datetime import datetime, timezone
+        if x is None or isinstance(x, datetime):
+            return x
+        ms = MT4Sugar._ts_ms(x)
+        return datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).replace(tzinfo=None)
+
     def _timeframe_to_seconds(self, tf: str) -> int:
         """Translate common MT timeframes to seconds."""
         tf = (tf or "").upper()
@@ -522,39 +644,6 @@ class MT4Sugar:
         if tf == "D1":  return 86400
         return -1
 
-    def _aggregate_ticks_to_bars(self, ticks: list[dict], tf_sec: int) -> list[dict]:
-        """Aggregate tick sequence into OHLCV-like bars (no real volume available)."""
-        if not ticks:
-            return []
-        bars: list[dict] = []
-        ms_bucket = tf_sec * 1000
-
-        def _mid(t: dict) -> float:
-            return (float(t["bid"]) + float(t["ask"])) / 2.0
-
-        def _spr(t: dict) -> float:
-            return float(t["ask"]) - float(t["bid"])
-
-        cur_open_ms = (int(ticks[0]["time"]) // ms_bucket) * ms_bucket
-        open_px = high = low = close = _mid(ticks[0])
-        spr_sum = _spr(ticks[0]); spr_n = 1
-
-        for t in ticks[1:]:
-            ts = int(t["time"]); bucket = (ts // ms_bucket) * ms_bucket
-            px = _mid(t); sp = _spr(t)
-            if bucket != cur_open_ms:
-                bars.append({"time": cur_open_ms, "open": open_px, "high": high, "low": low, "close": close, "spread": spr_sum / max(1, spr_n)})
-                cur_open_ms = bucket; open_px = high = low = close = px
-                spr_sum = sp; spr_n = 1
-            else:
-                close = px
-                if px > high: high = px
-                if px < low:  low = px
-                spr_sum += sp; spr_n += 1
-
-        bars.append({"time": cur_open_ms, "open": open_px, "high": high, "low": low, "close": close, "spread": spr_sum / max(1, spr_n)})
-        return bars
-
     # endregion
 
 
@@ -568,10 +657,12 @@ class MT4Sugar:
 
         money_per_pip(lots) = tick_value_per_lot * lots * (pip_size / point)
         """
-        pip = await self.pip_size(symbol)
-        pt = await self.point(symbol)
-        if pip <= 0 or pt <= 0:
-            return 0.0
+        spec = await self._spec(symbol)
+        if spec.tick_value > 0:
+            return spec.money_per_pip(lots)
+
+        # No tick value in the spec table (unknown symbol): ask the terminal directly
+        pip, pt = spec.pip_size, spec.point
         try:
             # Get tick value info for the symbol (returns value per standard lot)
             result = await self._svc.tick_value_with_size(symbol=symbol)
@@ -640,21 +731,14 @@ class MT4Sugar:
             # Returns how much 1 tick movement is worth for 0.01 lots
         """
         await self.ensure_symbol(symbol)
-        try:
-            result = await self._svc.tick_value_with_size(symbol=symbol)
-        except Exception as e:
-            raise map_backend_error(e, context="tick_value_with_size", payload={"symbol": symbol, "lots": lots})
-
-        # Handle protobuf response
-        tick_val = None
-        if hasattr(result, "tick_value"):
-            tick_val = float(result.tick_value)
-        elif hasattr(result, "value"):
-            tick_val = float(result.value)
-        elif isinstance(result, dict):
-            tick_val = float(result.get("tick_value") or result.get("value") or 1.0)
-        else:
-            tick_val = 1.0
+        tick_val = (await self._spec(symbol)).tick_value
+        if tick_val <= 0:
+            try:
+                result = await self._svc.tick_value_with_size(symbol=symbol)
+            except Exception as e:
+                raise map_backend_error(e, context="tick_value_with_size", payload={"symbol": symbol, "lots": lots})
+            infos = getattr(result, "infos", None) or []
+            tick_val = float(infos[0].TradeTickValue) if infos else 1.0
 
         # Scale by lot size (1.0 lot is the base)
         return tick_val * float(lots)
@@ -805,7 +889,7 @@ class MT4Sugar:
 
     async def _entry_price_for_market(self, symbol: str, side: str) -> float:
         try:
-            q = await self._svc.quote(symbol)
+            q = await self._quote(symbol)
         except Exception as e:
             raise map_backend_error(e, context="quote", payload={"symbol": symbol})
         bid = self._extract_quote_field(q, "bid")
@@ -1051,37 +1135,18 @@ class MT4Sugar:
         return None
 
     async def _get_order_by_ticket(self, ticket: int):
-        """Find an opened order by ticket."""
+        """Find an opened order by ticket (from the service's order mirror)."""
         try:
-            orders_result = await self._svc.opened_orders()
+            return await self._svc.order_store.get(ticket)
         except Exception as e:
             raise map_backend_error(e, context="opened_orders")
 
-        # Extract orders from protobuf response
-        if hasattr(orders_result, "order_infos"):
-            orders = orders_result.order_infos
-        elif isinstance(orders_result, list):
-            orders = orders_result
-        else:
-            orders = []
-
-        for o in (orders or []):
-            # Handle both protobuf and dict
-            if hasattr(o, "ticket"):
-                t = o.ticket
-            elif hasattr(o, "Ticket"):
-                t = o.Ticket
-            elif isinstance(o, dict):
-                t = o.get("ticket") or o.get("Ticket") or o.get("order") or o.get("Order")
-            else:
-                continue
-
-            try:
-                if int(t) == int(ticket):
-                    return o
-            except Exception:
-                continue
-        return None
+    async def _opened_orders(self, *, symbol: str | None = None, magic: int | None = None) -> list:
+        """Opened orders (market + pending) from the order mirror, pre-filtered by its indexes."""
+        try:
+            return await self._svc.order_store.orders(symbol=symbol, magic=magic)
+        except Exception as e:
+            raise map_backend_error(e, context="opened_orders")
 
     def _order_symbol(self, o) -> str:
         return str(self._get_field(o, "symbol", "Symbol") or "").upper()
@@ -1118,12 +1183,12 @@ class MT4Sugar:
 
     def _is_pending(self, o) -> bool:
         """Heuristic to detect pending order."""
-        # For protobuf: order_type values 3-6 are pending orders
-        # (BUYLIMIT=3, BUYSTOP=4, SELLLIMIT=5, SELLSTOP=6)
+        # For protobuf: order_type values 2-5 are pending orders
+        # (BUYLIMIT=2, SELLLIMIT=3, BUYSTOP=4, SELLSTOP=5)
         order_type = self._get_field(o, "order_type", "type", "Type")
 
         if isinstance(order_type, int):
-            return order_type >= 3  # Pending orders have type >= 3
+            return order_type >= 2  # Pending orders have type >= 2
         elif isinstance(order_type, str):
             t = order_type.lower()
             return "limit" in t or "stop" in t or "pending" in t
@@ -1245,18 +1310,7 @@ class MT4Sugar:
         self, *, symbol: str | None = None, magic: int | None = None, only_profit: bool | None = None
     ) -> None:
         """Bulk close with filters."""
-        try:
-            orders_result = await self._svc.opened_orders()
-        except Exception as e:
-            raise map_backend_error(e, context="opened_orders")
-
-        # Extract orders from protobuf response
-        if hasattr(orders_result, "order_infos"):
-            orders = list(orders_result.order_infos)
-        elif isinstance(orders_result, list):
-            orders = orders_result
-        else:
-            orders = []
+        orders = await self._opened_orders(symbol=symbol, magic=magic)
 
         if not orders:
             return
@@ -1291,10 +1345,7 @@ class MT4Sugar:
 
     async def cancel_pendings(self, *, symbol: str | None = None, magic: int | None = None) -> None:
         """Cancel pending orders by filters."""
-        try:
-            orders = await self._svc.opened_orders()
-        except Exception as e:
-            raise map_backend_error(e, context="opened_orders")
+        orders = await self._opened_orders(symbol=symbol, magic=magic)
         if not orders:
             return
 
@@ -1307,10 +1358,10 @@ class MT4Sugar:
             osym = self._order_symbol(o)
             if sym_up and osym != sym_up:
                 continue
-            omagic = o.get("magic") or o.get("Magic")
+            omagic = self._get_field(o, "magic", "Magic", "magic_number")
             if mgc is not None and str(omagic) != mgc:
                 continue
-            t = int(o.get("ticket") or o.get("Ticket"))
+            t = int(self._get_field(o, "ticket", "Ticket"))
             try:
                 await self._svc.order_close_delete(ticket=t)
             except Exception as e:
@@ -1388,7 +1439,7 @@ class MT4Sugar:
 
                     # current mid price
                     try:
-                        q = await self._svc.quote(symbol)
+                        q = await self._quote(symbol)
                     except Exception as e:
                         # map and stop worker on hard backend error
                         self.log.error("trailing quote failed: %s", e, exc_info=False)
@@ -1405,8 +1456,8 @@ class MT4Sugar:
                     desired_sl = await self.normalize_price(symbol, desired_sl)
 
                     # current SL if any
-                    cur_sl = o.get("sl") or o.get("sl_price") or o.get("SL") or o.get("StopLoss")
-                    cur_sl = float(cur_sl) if cur_sl is not None else None
+                    cur_sl = self._get_field(o, "stop_loss", "sl", "sl_price", "SL", "StopLoss")
+                    cur_sl = float(cur_sl) if cur_sl else None  # 0.0 = no stop loss
 
                     # Only tighten SL (improve protection)
                     need = False
@@ -1499,7 +1550,7 @@ class MT4Sugar:
                     if not cur:
                         return
                     try:
-                        q = await self._svc.quote(symbol)
+                        q = await self._quote(symbol)
                     except Exception as e:
                         self.log.error("auto_be quote failed: %s", e, exc_info=False)
                         return
@@ -1539,26 +1590,36 @@ class MT4Sugar:
     # ──────────────────────────────────
 
     async def watch_ticks(
-        self, symbol: str, on_tick, *, throttle_ms: int | None = None
+        self,
+        symbol: str,
+        on_tick,
+        *,
+        throttle_ms: int | None = None,
+        policy: str | None = None,
+        queue_size: int = 1024,
     ) -> str:
-        """Subscribe to symbol ticks; return subscription id."""
+        """Subscribe to symbol ticks; return subscription id.
+
+        The callback runs in this subscription's own task, fed from a bounded queue. `policy`
+        picks what happens when the queue is full: "block" (default: every tick is delivered;
+        a callback that falls behind holds back the shared stream), "drop_oldest", or
+        "conflate" (default with throttle_ms, which already asks for fewer ticks: the callback
+        sees the latest tick and throttling never stalls the shared stream).
+        """
         import asyncio, time, uuid
 
         self._ensure_workers()
         sym = await self._resolve_symbol(symbol)
         sub_id = f"ticks-{sym}-{uuid.uuid4().hex[:8]}"
         interval = (throttle_ms or 0) / 1000.0
+        if policy is None:
+            policy = "conflate" if interval > 0 else "block"
 
         async def _worker() -> None:
             last_emit = 0.0
             try:
-                # backend stream
-                async for t in self._svc.on_symbol_tick(sym):
-                    now = time.monotonic()
-                    if interval > 0 and (now - last_emit) < interval:
-                        await asyncio.sleep(interval - (now - last_emit))
-                        now = time.monotonic()
-                    last_emit = now
+                # own queue on the shared tick stream (throttle sleeps only delay this consumer)
+                async for t in self._svc.on_symbol_tick(sym, policy=policy, maxsize=queue_size):
                     try:
                         res = on_tick(t)
                         if asyncio.iscoroutine(res):
@@ -1566,6 +1627,14 @@ class MT4Sugar:
                     except Exception:
                         # keep the stream alive even if callback failed
                         pass
+                    if interval > 0:
+                        # wait out the throttle window; ticks meanwhile queue (or conflate) up
+                        last_emit += interval
+                        now = time.monotonic()
+                        if last_emit > now:
+                            await asyncio.sleep(last_emit - now)
+                        else:
+                            last_emit = now
             except Exception as e:
                 # stop silently; caller can re-subscribe
                 self.log.error("watch_ticks stream error: %s", e, exc_info=False)
@@ -1575,7 +1644,7 @@ class MT4Sugar:
 
         task = asyncio.create_task(_worker(), name=sub_id)
         self._workers[sub_id] = task
-        self._workers_meta[sub_id] = {"kind": "watch_ticks", "symbol": sym, "throttle_ms": throttle_ms}
+        self._workers_meta[sub_id] = {"kind": "watch_ticks", "symbol": sym, "throttle_ms": throttle_ms, "policy": policy}
         return sub_id
 
     async def watch_trades(self, on_event) -> str:
@@ -1740,6 +1809,98 @@ class MT4Sugar:
         self._workers_meta[sub_id] = {"kind": "watch_tickets", "pull_ms": pull_interval_ms}
         return sub_id
 
+    async def watch_tickets_delta(
+        self,
+        on_delta,
+        *,
+        pull_interval_ms: int = 500,
+        initial: bool = True,
+    ) -> str:
+        """
+        Like watch_tickets(), but calls on_delta(TicketDelta) only when the ticket sets change.
+
+        The delta carries `added`, `removed` and `filled` (pending -> position) tickets
+        (see app.Helper.stream_deltas). With initial=True the first snapshot arrives as
+        "everything added".
+
+        Example:
+            def on_delta(d):
+                for t in d.added: ...
+                for t in d.removed: ...
+
+            sub_id = await sugar.watch_tickets_delta(on_delta)
+        """
+        import asyncio, uuid
+
+        self._ensure_workers()
+        sub_id = f"tickets-delta-{uuid.uuid4().hex[:8]}"
+
+        async def _worker() -> None:
+            try:
+                stream = self._svc.on_opened_orders_tickets(pull_interval_milliseconds=pull_interval_ms)
+                async for delta in ticket_deltas(stream, initial=initial):
+                    try:
+                        res = on_delta(delta)
+                        if asyncio.iscoroutine(res):
+                            await res
+                    except Exception:
+                        pass
+            except Exception as e:
+                self.log.error("watch_tickets_delta stream error: %s", e, exc_info=False)
+            finally:
+                self._workers.pop(sub_id, None)
+                self._workers_meta.pop(sub_id, None)
+
+        task = asyncio.create_task(_worker(), name=sub_id)
+        self._workers[sub_id] = task
+        self._workers_meta[sub_id] = {"kind": "watch_tickets_delta", "pull_ms": pull_interval_ms}
+        return sub_id
+
+    async def watch_profit_delta(
+        self,
+        on_delta,
+        *,
+        threshold: float = 0.01,
+        timer_period_ms: int = 1000,
+        initial: bool = True,
+    ) -> str:
+        """
+        Like watch_profit(), but calls on_delta(ProfitDelta) only for tickets whose profit
+        moved by at least `threshold` (account currency) since last reported, plus tickets
+        that opened or closed.
+
+        Example:
+            def on_delta(d):
+                for ticket, (old, new) in d.changed.items(): ...
+
+            sub_id = await sugar.watch_profit_delta(on_delta, threshold=0.5)
+        """
+        import asyncio, uuid
+
+        self._ensure_workers()
+        sub_id = f"profit-delta-{uuid.uuid4().hex[:8]}"
+
+        async def _worker() -> None:
+            try:
+                stream = self._svc.on_opened_orders_profit(timer_period_milliseconds=timer_period_ms)
+                async for delta in profit_deltas(stream, threshold=threshold, initial=initial):
+                    try:
+                        res = on_delta(delta)
+                        if asyncio.iscoroutine(res):
+                            await res
+                    except Exception:
+                        pass
+            except Exception as e:
+                self.log.error("watch_profit_delta stream error: %s", e, exc_info=False)
+            finally:
+                self._workers.pop(sub_id, None)
+                self._workers_meta.pop(sub_id, None)
+
+        task = asyncio.create_task(_worker(), name=sub_id)
+        self._workers[sub_id] = task
+        self._workers_meta[sub_id] = {"kind": "watch_profit_delta", "timer_ms": timer_period_ms, "threshold": threshold}
+        return sub_id
+
     async def unwatch(self, subscription_id: str) -> None:
         """Cancel a subscription created by watch_* methods."""
         task = self._workers.get(subscription_id)
@@ -1753,35 +1914,46 @@ class MT4Sugar:
         self._workers_meta.pop(subscription_id, None)
 
     async def wait_filled(self, ticket: int, *, timeout_s: float | None = None) -> dict:
-        """Await order filled; return final fill info."""
-        import asyncio, time
+        """Await order filled; return final fill info (woken by on_trade events, no polling)."""
+        import asyncio
 
-        start = time.monotonic()
-        while True:
-            o = await self._get_order_by_ticket(ticket)
-            if o and not self._is_pending(o):
-                return o
-            if timeout_s is not None and (time.monotonic() - start) > timeout_s:
-                raise TimeoutError(f"wait_filled timeout for ticket {ticket}")
-            await asyncio.sleep(0.2)
+        store = self._svc.order_store
+
+        def _filled():
+            o = store.peek(ticket)
+            return o if o is not None and not self._is_pending(o) else None
+
+        try:
+            return await store.wait_for(_filled, timeout_s=timeout_s)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"wait_filled timeout for ticket {ticket}") from None
+        except Exception as e:
+            raise map_backend_error(e, context="opened_orders")
 
     async def wait_closed(self, ticket: int, *, timeout_s: float | None = None) -> dict:
         """Await order closed; return {'ticket': int, 'status': 'closed', ...}."""
-        import asyncio, time
+        import asyncio
 
+        store = self._svc.order_store
         last = await self._get_order_by_ticket(ticket)
-        start = time.monotonic()
-        while True:
-            cur = await self._get_order_by_ticket(ticket)
-            if cur is None:
-                info = {"ticket": int(ticket), "status": "closed"}
-                if last:
-                    info.update({"symbol": self._order_symbol(last), "lots": self._order_lots(last)})
-                return info
-            last = cur
-            if timeout_s is not None and (time.monotonic() - start) > timeout_s:
-                raise TimeoutError(f"wait_closed timeout for ticket {ticket}")
-            await asyncio.sleep(0.25)
+
+        def _closed() -> bool:
+            nonlocal last
+            cur = store.peek(ticket)
+            if cur is not None:
+                last = cur
+            return cur is None
+
+        try:
+            await store.wait_for(_closed, timeout_s=timeout_s)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"wait_closed timeout for ticket {ticket}") from None
+        except Exception as e:
+            raise map_backend_error(e, context="opened_orders")
+        info = {"ticket": int(ticket), "status": "closed"}
+        if last:
+            info.update({"symbol": self._order_symbol(last), "lots": self._order_lots(last)})
+        return info
 
     # endregion
 
@@ -1858,12 +2030,7 @@ class MT4Sugar:
             return out
 
         # opened (default), possibly filtered by "open"/"pending"
-        try:
-            opened = await self._svc.opened_orders()
-        except Exception as e:
-            raise map_backend_error(e, context="opened_orders")
-
-        for o in await self._normalize_orders(opened):
+        for o in await self._opened_orders(symbol=symbol, magic=magic):
             if not self._match_symbol(o, sym_up):
                 continue
             if not self._match_magic(o, mgc):
@@ -1887,14 +2054,9 @@ class MT4Sugar:
         sym_up = symbol.upper() if symbol else None
         mgc = str(magic) if magic is not None else None
 
-        try:
-            opened = await self._svc.opened_orders()
-        except Exception as e:
-            raise map_backend_error(e, context="opened_orders")
-
         total = {"lots_net": 0.0, "lots_long": 0.0, "lots_short": 0.0, "pnl": 0.0, "margin": 0.0}
 
-        for o in await self._normalize_orders(opened):
+        for o in await self._opened_orders(symbol=symbol, magic=magic):
             if self._is_pending(o):
                 continue
             if not self._match_symbol(o, sym_up):
@@ -1921,12 +2083,7 @@ class MT4Sugar:
 
     async def orders_for_symbol(self, symbol: str) -> list[dict]:
         """Quick filter to get symbol's orders (opened: market + pending)."""
-        sym_up = symbol.upper()
-        try:
-            opened = await self._svc.opened_orders()
-        except Exception as e:
-            raise map_backend_error(e, context="opened_orders")
-        return [o for o in await self._normalize_orders(opened) if self._order_symbol(o) == sym_up]
+        return list(await self._opened_orders(symbol=symbol))
 
     # endregion
 
@@ -2053,19 +2210,24 @@ class MT4Sugar:
 ║   - .Helper.errors: MT4Error, map_backend_error, ...                         ║
 ║   - .Helper.hooks.HookBus (event hooks)                                      ║
 ║   - .Helper.rate_limit.RateLimiter                                           ║
+║   - .Helper.symbol_registry.SymbolRegistry (cached symbol universe)          ║
+║   - .Helper.symbol_specs.SymbolSpecTable (cached point/pip/lot/tick data)    ║
+║   - .Helper.quote_cache.QuoteCache (last bid/ask fed by the tick stream)     ║
 ╠══════════════════════════════════════════════════════════════════════════════╣
 ║ Architecture Overview                                                        ║
 ║   [Defaults] set_defaults / with_defaults → stored in _defaults              ║
-║   [Symbols] ensure_connected → ensure_symbol → _get_symbol_params cache      ║
-║   [Prices] point/digits/pip_size → pips_to_price/price_to_pips/normalize_*   ║
+║   [Symbols] ensure_connected → ensure_symbol → SymbolRegistry (in memory)    ║
+║   [Prices] SymbolSpec (point/digits/pip_size) → pips_to_price/normalize_*    ║
+║   [Quotes] _quote → QuoteCache (fresh ≤ quote_max_age_ms) → else svc.quote   ║
 ║   [Orders] place_order → _prepare_order_payload → svc.order_send             ║
 ║   [Modify] order_modify mapping via svc.order_modify                         ║
 ║   [Close] close / close_partial / close_by / close_all / cancel_pendings     ║
 ║   [Risk] calc_lot_by_risk / calc_cash_risk / tick_value                      ║
 ║   [Automation] set_trailing_stop / auto_breakeven (background workers)       ║
 ║   [Watch] watch_ticks/trades/opened_orders/profit/tickets + unwatch          ║
-║   [Awaiters] wait_filled / wait_closed                                       ║
+║   [Awaiters] wait_filled / wait_closed (event-driven via svc.order_store)    ║
 ║   [Diagnostics] diag_snapshot / exposure_summary                             ║
+║   [Orders state] find_orders/positions_value/... read svc.order_store        ║
 ╠══════════════════════════════════════════════════════════════════════════════╣
 ║ Defaults & Context                                                           ║
 ║   • set_defaults(symbol, magic, deviation_pips, slippage_pips, risk_percent) ║
@@ -2078,7 +2240,8 @@ class MT4Sugar:
 ║                                                                              ║
 ║ [A] Symbols & Pricing                                                        ║
 ║   ensure_connected()                 → Reconnect if needed                   ║
-║   ensure_symbol(symbol, ...)         → Validate symbol; optional trade flag  ║
+║   ensure_symbol(symbol, ...)         → Validate symbol (cached); trade flag  ║
+║   warmup()                           → Preload symbols + specs (3 RPCs)      ║
 ║   point(symbol)                      → Minimal price step (Point)            ║
 ║   digits(symbol)                     → Digits; infers from point if absent   ║
 ║   pip_size(symbol)                   → Pip size (5/3-digit aware)            ║
@@ -2091,8 +2254,9 @@ class MT4Sugar:
 ║   last_quote(symbol)                 → {bid, ask, time}                      ║
 ║   quotes(symbols)                    → {SYM: {bid,ask,time}, ...}            ║
 ║   wait_price(symbol, target, dir, t) → Await mid crosses target              ║
-║   ticks(symbol, since/until/limit)   → Tick history (best-effort)            ║
-║   bars(symbol, timeframe, ...)       → OHLC from ticks (aggregation)         ║
+║   ticks(symbol, since/until/limit)   → M1 close history (epoch ms)           ║
+║   bars(symbol, timeframe, count?)    → OHLC from bar_engine (live, in memory)║
+║   bars(symbol, timeframe, since/until) → OHLC from server history            ║
 ║                                                                              ║
 ║ [B] Risk & Sizing                                                            ║
 ║   calc_lot_by_risk(symbol, risk%, sl_pips, balance?) → Lots by risk          ║
@@ -2133,11 +2297,13 @@ class MT4Sugar:
 ║   auto_breakeven(ticket, trigger_pips, plus_pips=0) → Start worker; id       ║
 ║                                                                              ║
 ║ [F] Watchers & Awaiters                                                      ║
-║   watch_ticks(symbol, on_tick, throttle_ms?) → Stream ticks → callback; id   ║
+║   watch_ticks(symbol, on_tick, throttle_ms?, policy?) → Queued ticks → cb    ║
 ║   watch_trades(on_event)              → Stream trade events; id              ║
 ║   watch_opened_orders(on_event)       → Stream/poll opened orders; id        ║
 ║   watch_profit(on_event, timer_ms=1000) → Stream profit aggregate; id        ║
 ║   watch_tickets(on_event, pull_interval_ms=500) → Stream ticket sets; id     ║
+║   watch_tickets_delta(on_delta, pull_interval_ms=500) → added/removed/filled ║
+║   watch_profit_delta(on_delta, threshold=0.01) → per-ticket profit changes   ║
 ║   unwatch(sub_id)                     → Cancel watcher/worker by id          ║
 ║   wait_filled(ticket, timeout_s?)     → Await pending → filled               ║
 ║   wait_closed(ticket, timeout_s?)     → Await ticket disappears              ║
@@ -0,0 +1,145 @@
+# examples/Bench_invoker_overhead.py
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Per-call Python overhead of MT4Account unary RPCs
+
+The gRPC stubs are replaced with in-memory coroutines that return a prebuilt reply,
+so the numbers are pure client-side Python cost (no network, no serialization):
+
+- before: the old per-method pattern (fresh `grpc_call` closure + lambda error selector,
+          timeout recomputed from datetime.utcnow(), new request message per call)
+          routed through execute_with_reconnect()
+- after:  the table-driven MT4Account._invoke() path used by the public methods
+
+Usage:
+    python examples/Bench_invoker_overhead.py [--calls 200000]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+# ---- Path bootstrap ----
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PKG = REPO_ROOT / "package"
+for p in [str(PKG), str(REPO_ROOT)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# ---- Imports ----
+import grpc
+
+from MetaRpcMT4.mt4_account import MT4Account
+import MetaRpcMT4.mt4_term_api_account_helper_pb2 as account_helper_pb2
+import MetaRpcMT4.mt4_term_api_market_info_pb2 as market_info_pb2
+
+
+def make_account() -> MT4Account:
+    """Account whose sub-channels answer from memory."""
+    acc = MT4Account(
+        user=0,
+        password="",
+        grpc_server="localhost:1",
+        channel_credentials=grpc.local_channel_credentials(grpc.LocalConnectionType.LOCAL_TCP),
+    )
+    acc.server_name, acc.id = "bench", "bench"
+
+    summary = account_helper_pb2.AccountSummaryReply(
+        data=account_helper_pb2.AccountSummaryData(account_balance=1000.0)
+    )
+    quote = market_info_pb2.QuoteReply(data=market_info_pb2.QuoteData(symbol="EURUSD", bid=1.1, ask=1.1002))
+
+    async def AccountSummary(request, metadata=None, timeout=None):
+        return summary
+
+    async def Quote(request, metadata=None, timeout=None):
+        return quote
+
+    for ch in acc._pool.channels + acc._pool.trade_channels:
+        ch.account_client = SimpleNamespace(AccountSummary=AccountSummary)
+        ch.market_info_client = SimpleNamespace(Quote=Quote)
+    return acc
+
+
+# ──────────────────────────── legacy call pattern ────────────────────────────
+
+async def legacy_account_summary(acc: MT4Account, deadline=None):
+    request = account_helper_pb2.AccountSummaryRequest()
+
+    async def grpc_call(headers, ch):
+        timeout = None
+        if deadline:
+            timeout = (deadline - datetime.utcnow()).total_seconds()
+            if timeout < 0:
+                timeout = 0
+        return await ch.account_client.AccountSummary(request, metadata=headers, timeout=timeout)
+
+    res = await acc.execute_with_reconnect(
+        grpc_call=grpc_call,
+        error_selector=lambda r: getattr(r, "error", None),
+        deadline=deadline,
+    )
+    return res.data
+
+
+async def legacy_quote(acc: MT4Account, symbol: str, deadline=None):
+    request = market_info_pb2.QuoteRequest(symbol=symbol)
+
+    async def grpc_call(headers, ch):
+        timeout = None
+        if deadline:
+            timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
+        return await ch.market_info_client.Quote(request, metadata=headers, timeout=timeout)
+
+    res = await acc.execute_with_reconnect(
+        grpc_call=grpc_call,
+        error_selector=lambda r: getattr(r, "error", None),
+        deadline=deadline,
+    )
+    return res.data
+
+
+# ──────────────────────────────── measurement ─────────────────────────────────
+
+async def measure(fn, calls: int) -> float:
+    """Average microseconds per call."""
+    for _ in range(1000):
+        await fn()
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        await fn()
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=200_000)
+    args = ap.parse_args()
+
+    acc = make_account()
+    deadline = datetime.utcnow() + timedelta(hours=1)
+
+    cases = [
+        ("account_summary()", lambda: legacy_account_summary(acc), lambda: acc.account_summary()),
+        ("account_summary(deadline)", lambda: legacy_account_summary(acc, deadline),
+         lambda: acc.account_summary(deadline=deadline)),
+        ("quote('EURUSD', deadline)", lambda: legacy_quote(acc, "EURUSD", deadline),
+         lambda: acc.quote("EURUSD", deadline=deadline)),
+    ]
+
+    print(f"{'call':<30}{'before µs':>12}{'after µs':>12}{'saved':>10}")
+    print("-" * 64)
+    for name, before, after in cases:
+        b = await measure(before, args.calls)
+        a = await measure(after, args.calls)
+        print(f"{name:<30}{b:>12.2f}{a:>12.2f}{(1 - a / b) * 100:>9.1f}%")
+
+    await acc.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
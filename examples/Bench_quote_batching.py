@@ -0,0 +1,148 @@
+# examples/Bench_quote_batching.py
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - quote() throughput with and without QuoteMany microbatching
+
+Starts a fake gateway in a separate process (localhost, no broker involved) that answers
+MarketInfo.Quote / QuoteMany after a fixed delay (simulated gateway round trip), then runs
+N concurrent callers that each call MT4Service.quote(symbol) in a loop, like guards and
+trailing workers do within one tick.
+
+For every caller count the script compares:
+- batching off                    (one Quote RPC per call)
+- quote_batch_window_ms=1.0 / 2.0 (concurrent calls merged into QuoteMany)
+
+Usage:
+    python examples/Bench_quote_batching.py [--callers 100 200 500] [--seconds 3] [--rtt-ms 5]
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import multiprocessing
+from pathlib import Path
+
+# ---- Path bootstrap ----
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PKG = REPO_ROOT / "package"
+APP = REPO_ROOT / "app"
+for p in [str(PKG), str(APP), str(REPO_ROOT)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# ---- Imports ----
+import grpc
+
+from MetaRpcMT4.mt4_account import MT4Account
+import MetaRpcMT4.mt4_term_api_market_info_pb2 as market_info_pb2
+import MetaRpcMT4.mt4_term_api_market_info_pb2_grpc as market_info_pb2_grpc
+from app.MT4Service import MT4Service
+
+
+LOCAL_TCP = grpc.LocalConnectionType.LOCAL_TCP
+SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "USDCHF", "AUDUSD", "NZDUSD", "USDCAD", "EURGBP",
+           "EURJPY", "GBPJPY", "XAUUSD", "XAGUSD", "EURCHF", "AUDJPY", "CADJPY", "CHFJPY"]
+
+
+# ──────────────────────────────── fake gateway ────────────────────────────────
+
+class _Market(market_info_pb2_grpc.MarketInfoServicer):
+    def __init__(self, rtt_s: float) -> None:
+        self.rtt_s = rtt_s
+
+    @staticmethod
+    def _q(symbol: str) -> market_info_pb2.QuoteData:
+        return market_info_pb2.QuoteData(symbol=symbol, bid=1.1, ask=1.1002)
+
+    async def Quote(self, request, context):
+        await asyncio.sleep(self.rtt_s)
+        return market_info_pb2.QuoteReply(data=self._q(request.symbol))
+
+    async def QuoteMany(self, request, context):
+        await asyncio.sleep(self.rtt_s)
+        return market_info_pb2.QuoteManyReply(
+            data=market_info_pb2.QuoteManyData(quotes=[self._q(s) for s in request.symbols])
+        )
+
+
+async def _serve(rtt_s: float, port_out) -> None:
+    server = grpc.aio.server()
+    market_info_pb2_grpc.add_MarketInfoServicer_to_server(_Market(rtt_s), server)
+    port = server.add_secure_port("localhost:0", grpc.local_server_credentials(LOCAL_TCP))
+    await server.start()
+    port_out.put(port)
+    await server.wait_for_termination()
+
+
+def start_server(rtt_s: float) -> tuple[multiprocessing.Process, int]:
+    port_out = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=lambda: asyncio.run(_serve(rtt_s, port_out)), daemon=True)
+    proc.start()
+    return proc, port_out.get(timeout=30)
+
+
+# ──────────────────────────────── measurement ─────────────────────────────────
+
+async def run_scenario(port: int, callers: int, seconds: float, window_ms) -> dict:
+    acc = MT4Account(
+        user=0,
+        password="",
+        grpc_server=f"localhost:{port}",
+        channel_credentials=grpc.local_channel_credentials(LOCAL_TCP),
+    )
+    # Local server has no terminal behind it: mark the account as connected directly
+    acc.server_name, acc.id = "bench", "bench"
+    svc = MT4Service(acc, quote_batch_window_ms=window_ms)
+
+    latencies: list[float] = []
+    stop_at = time.perf_counter() + seconds
+
+    async def caller() -> None:
+        rnd = random.Random()
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            await svc.quote(rnd.choice(SYMBOLS))
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    await svc.quote("EURUSD")  # warm-up (channel connect)
+    acc.metrics.reset()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(callers)))
+    elapsed = time.perf_counter() - t0
+
+    rpcs = sum(m.calls for m in acc.metrics.rpcs.values())
+    await acc.close()
+    ordered = sorted(latencies)
+    return {
+        "qps": len(latencies) / elapsed,
+        "rpcs": rpcs,
+        "p50": statistics.median(ordered),
+        "p99": ordered[int(0.99 * (len(ordered) - 1))],
+    }
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--callers", type=int, nargs="+", default=[100, 200, 500])
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--rtt-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    server, port = start_server(args.rtt_ms / 1000.0)
+    try:
+        print(f"{'callers':>8}{'window':>10}{'quotes/s':>12}{'RPCs':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        print("-" * 60)
+        for callers in args.callers:
+            for window in (None, 1.0, 2.0):
+                r = await run_scenario(port, callers, args.seconds, window)
+                label = "off" if window is None else f"{window:g} ms"
+                print(f"{callers:>8}{label:>10}{r['qps']:>12.0f}{r['rpcs']:>10}{r['p50']:>10.2f}{r['p99']:>10.2f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+# examples/Bench_tick_codec.py
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Tick archive codec: compression ratio and encode/decode speed vs raw columns
+
+Synthetic ticks for `--symbols` symbols (random-walk bid in points, spread 8-25 points,
+bursty irregular time gaps) are stored two ways:
+
+- raw:      TickRecorder layout, 24 bytes/tick (time i8, bid f8, ask f8)
+- archive:  app.Helper.tick_codec (delta-of-delta time, delta points, zigzag varints, blocks)
+
+MB/s is always measured in raw-equivalent megabytes (ticks * 24 bytes) so the two columns
+compare directly; raw decode copies the columns out of the buffer. "seek" decodes a 1-minute
+window from the middle through the block index.
+
+Usage:
+    python examples/Bench_tick_codec.py [--ticks 1000000] [--symbols 10] [--block 4096]
+"""
+
+import io
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# ---- Path bootstrap ----
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PKG = REPO_ROOT / "package"
+for p in [str(PKG), str(REPO_ROOT)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# ---- Imports ----
+from app.Helper.tick_codec import TickArchiveWriter, TickArchiveReader, np
+
+
+def make_symbol(n: int, seed: int) -> tuple:
+    rnd = random.Random(seed)
+    t, pts = 1_760_000_000_000, 110_000 + seed * 1_000
+    times, bids, asks = [], [], []
+    for _ in range(n):
+        t += rnd.choice((0, 1, 3, 15, 40, 120, 250, 700, 2_000))
+        pts += rnd.randint(-3, 3)
+        times.append(t)
+        bids.append(pts / 100_000)
+        asks.append((pts + rnd.randint(8, 25)) / 100_000)
+    return times, bids, asks
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--ticks", type=int, default=1_000_000, help="total ticks over all symbols")
+    ap.add_argument("--symbols", type=int, default=10)
+    ap.add_argument("--block", type=int, default=4096, help="ticks per archive block")
+    args = ap.parse_args()
+    if np is None:
+        print("numpy not installed: measuring the pure-Python codec (expect far lower MB/s)")
+
+    per = args.ticks // args.symbols
+    data = [make_symbol(per, s) for s in range(args.symbols)]
+    n = per * args.symbols
+    raw_mb = n * 24 / 1e6
+
+    # raw columns (what TickRecorder writes)
+    t0 = time.perf_counter()
+    raws = []
+    for times, bids, asks in data:
+        if np is not None:
+            raws.append((np.asarray(times, "<i8").tobytes(), np.asarray(bids, "<f8").tobytes(), np.asarray(asks, "<f8").tobytes()))
+        else:
+            from array import array
+            raws.append((array("q", times).tobytes(), array("d", bids).tobytes(), array("d", asks).tobytes()))
+    raw_enc = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for cols in raws:
+        if np is not None:
+            # copied out, like the archive's decoded arrays (a bare frombuffer view is free)
+            [np.frombuffer(b, d).copy() for d, b in zip(("<i8", "<f8", "<f8"), cols)]
+        else:
+            from array import array
+            [array(c, b) for c, b in zip("qdd", cols)]
+    raw_dec = time.perf_counter() - t0
+    raw_bytes = sum(len(c) for cols in raws for c in cols)
+
+    # archive
+    bufs = []
+    t0 = time.perf_counter()
+    for s, (times, bids, asks) in enumerate(data):
+        buf = io.BytesIO()
+        with TickArchiveWriter(buf, f"SYM{s:03d}", 0.00001, block_ticks=args.block) as w:
+            w.extend(times, bids, asks)
+        bufs.append(buf)
+    arc_enc = time.perf_counter() - t0
+    arc_bytes = sum(len(b.getvalue()) for b in bufs)
+
+    t0 = time.perf_counter()
+    decoded = [TickArchiveReader(buf).read() for buf in bufs]
+    arc_dec = time.perf_counter() - t0
+    exact = all(
+        list(map(int, dt)) == times and list(map(float, db)) == bids and list(map(float, da)) == asks
+        for (dt, db, da), (times, bids, asks) in zip(decoded, data)
+    )
+
+    reader = TickArchiveReader(bufs[0])
+    mid = data[0][0][per // 2]
+    t0 = time.perf_counter()
+    win = reader.read(mid, mid + 60_000)
+    seek_ms = (time.perf_counter() - t0) * 1e3
+
+    print(f"{n} ticks, {args.symbols} symbols, block={args.block} (one core)")
+    print(f"{'format':<10}{'bytes':>14}{'B/tick':>9}{'ratio':>8}{'enc MB/s':>11}{'dec MB/s':>11}")
+    print("-" * 63)
+    print(f"{'raw':<10}{raw_bytes:>14,}{raw_bytes / n:>9.2f}{1.0:>8.1f}{raw_mb / raw_enc:>11,.0f}{raw_mb / raw_dec:>11,.0f}")
+    print(f"{'archive':<10}{arc_bytes:>14,}{arc_bytes / n:>9.2f}{raw_bytes / arc_bytes:>8.1f}"
+          f"{raw_mb / arc_enc:>11,.0f}{raw_mb / arc_dec:>11,.0f}")
+    print(f"lossless round trip: {exact}   seek 1-min window: {len(win[0])} ticks in {seek_ms:.2f} ms "
+          f"({len(reader.blocks)} blocks indexed)")
+
+
+if __name__ == "__main__":
+    main()
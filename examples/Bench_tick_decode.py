@@ -0,0 +1,125 @@
+# examples/Bench_tick_decode.py
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Tick decode throughput (ticks/sec on one core)
+
+Synthetic OnSymbolTickReply messages are serialized once and then parsed + consumed in a
+loop, the way the stream reader sees them. Each case then reads symbol, bid, ask and time
+of every tick `--reads` times (a callback that checks the spread, computes a mid price,
+updates a bar, formats a row ...):
+
+- protobuf:  consumer works on the OnSymbolTickData message (nested attribute lookups)
+- Tick:      message decoded once into app.Helper.ticks.Tick (__slots__), consumer reads slots
+- numpy:     batches decoded into a TICK_DTYPE structured array, consumer works on columns
+
+Usage:
+    python examples/Bench_tick_decode.py [--ticks 200000] [--symbols 50] [--batch 256] [--reads 5]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# ---- Path bootstrap ----
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PKG = REPO_ROOT / "package"
+for p in [str(PKG), str(REPO_ROOT)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# ---- Imports ----
+import MetaRpcMT4.mt4_term_api_subscriptions_pb2 as subscriptions_pb2
+
+from app.Helper.ticks import SymbolIds, decode_tick, ticks_to_array, np
+
+
+def make_wire(n: int, symbols: int) -> list[bytes]:
+    """Serialized OnSymbolTickReply messages, round-robin over `symbols` names."""
+    names = [f"SYM{i:03d}" for i in range(symbols)]
+    base_ms = 1_760_000_000_000
+    out = []
+    for i in range(n):
+        reply = subscriptions_pb2.OnSymbolTickReply()
+        t = reply.data.symbol_tick
+        t.symbol = names[i % symbols]
+        t.bid = 1.1 + (i % 97) * 1e-5
+        t.ask = t.bid + 2e-4
+        t.time_msc = base_ms + i
+        t.time.FromMilliseconds(base_ms + i)
+        out.append(reply.SerializeToString())
+    return out
+
+
+# ──────────────────────────────── consumers ───────────────────────────────────
+
+def run_protobuf(wire: list[bytes], reads: int) -> float:
+    parse = subscriptions_pb2.OnSymbolTickReply.FromString
+    acc = 0.0
+    for raw in wire:
+        data = parse(raw).data
+        for _ in range(reads):
+            t = data.symbol_tick
+            acc += (t.ask - t.bid) + len(t.symbol) + t.time_msc * 0.0
+    return acc
+
+
+def run_tick(wire: list[bytes], reads: int) -> float:
+    parse = subscriptions_pb2.OnSymbolTickReply.FromString
+    ids = SymbolIds()
+    acc = 0.0
+    for raw in wire:
+        t = decode_tick(parse(raw).data, ids)
+        for _ in range(reads):
+            acc += (t.ask - t.bid) + len(t.symbol) + t.time_msc * 0.0
+    return acc
+
+
+def run_numpy(wire: list[bytes], batch: int, reads: int) -> float:
+    parse = subscriptions_pb2.OnSymbolTickReply.FromString
+    ids = SymbolIds()
+    acc = 0.0
+    for i in range(0, len(wire), batch):
+        arr = ticks_to_array([parse(raw).data for raw in wire[i:i + batch]], ids)
+        for _ in range(reads):
+            acc += float((arr["ask"] - arr["bid"]).sum()) + float(arr["symbol_id"].sum()) * 0.0
+    return acc
+
+
+def measure(fn, n: int) -> float:
+    """Ticks per second."""
+    t0 = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--ticks", type=int, default=200_000)
+    ap.add_argument("--symbols", type=int, default=50)
+    ap.add_argument("--batch", type=int, default=256)
+    ap.add_argument("--reads", type=int, default=5, help="field reads per tick by the consumer")
+    args = ap.parse_args()
+
+    wire = make_wire(args.ticks, args.symbols)
+    cases = [
+        ("protobuf (OnSymbolTickData)", lambda: run_protobuf(wire, args.reads)),
+        ("Tick (__slots__)", lambda: run_tick(wire, args.reads)),
+    ]
+    if np is not None:
+        cases.append((f"numpy batch={args.batch}", lambda: run_numpy(wire, args.batch, args.reads)))
+    else:
+        print("numpy not installed: skipping the structured-array case")
+
+    run_protobuf(wire[:10_000], args.reads)  # warm-up
+
+    print(f"{args.ticks} ticks, {args.symbols} symbols, {args.reads} reads/tick (one core)")
+    print(f"{'consumer':<30}{'ticks/s':>14}{'µs/tick':>10}")
+    print("-" * 54)
+    for name, fn in cases:
+        rate = measure(fn, len(wire))
+        print(f"{name:<30}{rate:>14,.0f}{1e6 / rate:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# examples/Bench_tick_recorder.py
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - TickRecorder write throughput and TickReader range reads
+
+Synthetic OnSymbolTickData messages (round-robin over `--symbols`) are written in batches of
+`--batch`, the way the live recorder drains its tick-hub queue, with a sync (msync + fsync of
+the row counts) every `--sync-every` batches. The stream crosses a UTC midnight, so rotation
+is part of the measurement. Afterwards one symbol's full range is read back through the
+zero-copy reader.
+
+Target: >= 50,000 ticks/sec on one core.
+
+Usage:
+    python examples/Bench_tick_recorder.py [--ticks 500000] [--symbols 20] [--batch 2048] [--sync-every 25]
+"""
+
+import sys
+import time
+import asyncio
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+# ---- Path bootstrap ----
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PKG = REPO_ROOT / "package"
+for p in [str(PKG), str(REPO_ROOT)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# ---- Imports ----
+import MetaRpcMT4.mt4_term_api_subscriptions_pb2 as subscriptions_pb2
+
+from app.Helper.tick_recorder import TickRecorder, TickReader, np
+
+
+def make_ticks(n: int, symbols: int) -> list:
+    """OnSymbolTickData messages, 5 ms apart, starting 10 minutes before a UTC midnight."""
+    names = [f"SYM{i:03d}" for i in range(symbols)]
+    base_ms = 1_760_054_400_000 - 600_000
+    out = []
+    for i in range(n):
+        data = subscriptions_pb2.OnSymbolTickData()
+        t = data.symbol_tick
+        t.symbol = names[i % symbols]
+        t.bid = 1.1 + (i % 97) * 1e-5
+        t.ask = t.bid + 2e-4
+        t.time_msc = base_ms + i * 5
+        out.append(data)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--ticks", type=int, default=500_000)
+    ap.add_argument("--symbols", type=int, default=20)
+    ap.add_argument("--batch", type=int, default=2048)
+    ap.add_argument("--sync-every", type=int, default=25, help="batches between syncs")
+    ap.add_argument("--dir", default=None, help="output directory (default: temporary, removed afterwards)")
+    args = ap.parse_args()
+
+    ticks = make_ticks(args.ticks, args.symbols)
+    root = args.dir or tempfile.mkdtemp(prefix="ticks_")
+    try:
+        rec = TickRecorder(root)
+        t0 = time.perf_counter()
+        for k, i in enumerate(range(0, len(ticks), args.batch), 1):
+            rec.write(ticks[i:i + args.batch])
+            if k % args.sync_every == 0:
+                rec.sync()
+        rec.sync()
+        write_s = time.perf_counter() - t0
+        asyncio.run(rec.close())
+
+        print(f"{args.ticks} ticks, {args.symbols} symbols, batch={args.batch} (one core)")
+        print(f"{'case':<30}{'ticks/s':>14}{'µs/tick':>10}")
+        print("-" * 54)
+        rate = args.ticks / write_s
+        print(f"{'write + periodic sync':<30}{rate:>14,.0f}{1e6 / rate:>10.2f}")
+        s = rec.stats()
+        print(f"syncs={s['syncs']}  rotations={s['rotations']}  target 50,000/s: {'OK' if rate >= 50_000 else 'MISSED'}")
+
+        if np is None:
+            print("numpy not installed: skipping the reader case")
+            return
+        reader = TickReader(root)
+        t0 = time.perf_counter()
+        cols = reader.read("SYM000", 0, 2 ** 62)
+        mid = float(((cols["bid"] + cols["ask"]) * 0.5).mean())
+        read_s = time.perf_counter() - t0
+        print(f"read SYM000: {len(cols['time'])} rows over {len(reader.days('SYM000'))} day(s) in "
+              f"{read_s * 1e3:.2f} ms (mean mid {mid:.5f})")
+    finally:
+        if args.dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
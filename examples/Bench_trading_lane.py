@@ -0,0 +1,170 @@
+# examples/Bench_trading_lane.py
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Order-ack latency with and without the dedicated trade lane
+
+Starts an in-process gRPC server (localhost, no broker involved) that implements:
+- TradingHelper.OrderSend  -> answers immediately with a tiny reply
+- MarketInfo.QuoteHistory  -> answers with a large bar payload (bulk read)
+
+For every scenario the script measures order_send() round trips:
+1) trade_lane=False, idle            (orders share the connection, nothing else running)
+2) trade_lane=False, bulk readers    (orders queue behind history payloads on one HTTP/2 connection)
+3) trade_lane=True,  idle
+4) trade_lane=True,  bulk readers    (orders travel on their own connection)
+
+On loopback the client-side decode of the history payloads dominates; the lane
+difference grows with real network latency and HTTP/2 flow-control windows.
+
+Usage:
+    python examples/Bench_trading_lane.py [--orders 300] [--readers 8] [--bars 40000]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+import statistics
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# ---- Path bootstrap ----
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PKG = REPO_ROOT / "package"
+for p in [str(PKG), str(REPO_ROOT)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# ---- Imports ----
+import grpc
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from MetaRpcMT4.mt4_account import MT4Account
+from MetaRpcMT4.mt4_channel_pool import ChannelPoolOptions
+import MetaRpcMT4.mt4_term_api_market_info_pb2 as market_info_pb2
+import MetaRpcMT4.mt4_term_api_market_info_pb2_grpc as market_info_pb2_grpc
+import MetaRpcMT4.mt4_term_api_trading_helper_pb2 as trading_helper_pb2
+import MetaRpcMT4.mt4_term_api_trading_helper_pb2_grpc as trading_helper_pb2_grpc
+
+
+LOCAL_TCP = grpc.LocalConnectionType.LOCAL_TCP
+MAX_MSG = 64 * 1024 * 1024
+
+
+# ──────────────────────────────── fake gateway ────────────────────────────────
+
+class _Trading(trading_helper_pb2_grpc.TradingHelperServicer):
+    async def OrderSend(self, request, context):
+        return trading_helper_pb2.OrderSendReply(
+            data=trading_helper_pb2.OrderSendData(ticket=1, volume=request.volume)
+        )
+
+
+class _Market(market_info_pb2_grpc.MarketInfoServicer):
+    def __init__(self, bars: int) -> None:
+        ts = Timestamp(seconds=1_700_000_000)
+        quotes = [
+            market_info_pb2.HistoryQuote(symbol="EURUSD", index=i, time=ts, open=1.1, high=1.2,
+                                         low=1.0, close=1.15, tick_volume=100, real_volume=100)
+            for i in range(bars)
+        ]
+        self._reply = market_info_pb2.QuoteHistoryReply(
+            data=market_info_pb2.QuoteHistoryData(historical_quotes=quotes)
+        )
+
+    async def QuoteHistory(self, request, context):
+        return self._reply
+
+
+async def _serve(bars: int, port_out) -> None:
+    server = grpc.aio.server(options=[
+        ("grpc.max_send_message_length", MAX_MSG),
+        ("grpc.max_receive_message_length", MAX_MSG),
+    ])
+    trading_helper_pb2_grpc.add_TradingHelperServicer_to_server(_Trading(), server)
+    market_info_pb2_grpc.add_MarketInfoServicer_to_server(_Market(bars), server)
+    port = server.add_secure_port("localhost:0", grpc.local_server_credentials(LOCAL_TCP))
+    await server.start()
+    port_out.put(port)
+    await server.wait_for_termination()
+
+
+def start_server(bars: int) -> tuple[multiprocessing.Process, int]:
+    """Runs the fake gateway in its own process so server-side serialization
+    does not compete with the client event loop being measured."""
+    port_out = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=lambda: asyncio.run(_serve(bars, port_out)), daemon=True)
+    proc.start()
+    return proc, port_out.get(timeout=30)
+
+
+# ──────────────────────────────── measurement ─────────────────────────────────
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+async def run_scenario(port: int, *, trade_lane: bool, readers: int, orders: int) -> list[float]:
+    acc = MT4Account(
+        user=0,
+        password="",
+        grpc_server=f"localhost:{port}",
+        channel_options=ChannelPoolOptions(size=1, trade_lane=trade_lane, max_message_length=MAX_MSG),
+        channel_credentials=grpc.local_channel_credentials(LOCAL_TCP),
+    )
+    # Local server has no terminal behind it: mark the account as connected directly
+    acc.server_name, acc.id = "bench", "bench"
+
+    stop = asyncio.Event()
+    now = datetime.utcnow()
+
+    async def bulk_reader() -> None:
+        while not stop.is_set():
+            await acc.quote_history("EURUSD", market_info_pb2.QH_PERIOD_M1, now - timedelta(days=30), now)
+
+    # Warm up both lanes before measuring
+    await acc.order_send("EURUSD", trading_helper_pb2.OC_OP_BUY, 0.01)
+    tasks = [asyncio.create_task(bulk_reader()) for _ in range(readers)]
+    await asyncio.sleep(0.5 if readers else 0.0)
+
+    latencies: list[float] = []
+    try:
+        for _ in range(orders):
+            t0 = time.perf_counter()
+            await acc.order_send("EURUSD", trading_helper_pb2.OC_OP_BUY, 0.01)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            await asyncio.sleep(0.002)
+    finally:
+        stop.set()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await acc.close()
+    return latencies
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--orders", type=int, default=300)
+    ap.add_argument("--readers", type=int, default=8)
+    ap.add_argument("--bars", type=int, default=40000)
+    args = ap.parse_args()
+
+    server, port = start_server(args.bars)
+    try:
+        print(f"{'scenario':<34}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        print("-" * 64)
+        for trade_lane in (False, True):
+            for readers in (0, args.readers):
+                lat = await run_scenario(port, trade_lane=trade_lane, readers=readers, orders=args.orders)
+                name = f"trade_lane={trade_lane!s:<5} readers={readers}"
+                print(f"{name:<34}{statistics.median(lat):>10.2f}{percentile(lat, 99):>10.2f}{max(lat):>10.2f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
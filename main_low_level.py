@@ -292,7 +292,10 @@ async def amain() -> None:
     svc = MT4Service(acc)
 
     print(f"\n{BOLD}{FG_GREEN}[START LOW-LEVEL DEMO]{RESET} {datetime.now().isoformat(timespec='seconds')}")
-    await run_low_level_demo(svc, conf)
+    try:
+        await run_low_level_demo(svc, conf)
+    finally:
+        await svc.close()   # stop streams and background tasks the service started
     print(f"\n{BOLD}{FG_GREEN}[ALL DONE]{RESET}")
 
 
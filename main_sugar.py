@@ -326,7 +326,10 @@ async def amain() -> None:
     svc = MT4Service(acc)
 
     print(f"\n{BOLD}{FG_GN}[START SUGAR DEMO]{RESET} {datetime.now().isoformat(timespec='seconds')}")
-    await run_sugar_demo(svc, conf)
+    try:
+        await run_sugar_demo(svc, conf)
+    finally:
+        await svc.close()   # stop streams and background tasks the service started
     print(f"\n{BOLD}{FG_GN}[ALL DONE]{RESET}")
 
 
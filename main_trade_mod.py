@@ -315,7 +315,10 @@ async def amain():
     now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
     print(f"\n{BOLD}{FG_GREEN}[START TRADE_MOD DEMO]{RESET} {now}")
 
-    await run_trade_mod_demo(svc, conf)
+    try:
+        await run_trade_mod_demo(svc, conf)
+    finally:
+        await svc.close()   # stop streams and background tasks the service started
 
     print(f"\n{BOLD}{FG_GREEN}[ALL DONE]{RESET}")
 
@@ -1,5 +1,6 @@
 ﻿import asyncio
 import grpc
+import time
 import uuid
 from datetime import datetime
 from typing import Optional, Callable, Awaitable, AsyncGenerator, Any
@@ -19,6 +20,16 @@ import MetaRpcMT4.mt4_term_api_subscriptions_pb2 as subscriptions_pb2
 import MetaRpcMT4.mt4_term_api_subscriptions_pb2_grpc as subscriptions_pb2_grpc
 import MetaRpcMT4.mt4_term_api_market_info_pb2 as market_info_pb2
 import MetaRpcMT4.mt4_term_api_market_info_pb2_grpc as market_info_pb2_grpc
+from MetaRpcMT4.mt4_channel_pool import ChannelPool, ChannelPoolOptions, LANE_SHARED
+import MetaRpcMT4.mt4_rpc_table as rpc
+from MetaRpcMT4.mt4_reconnect import ReconnectCoordinator, ReconnectPolicy, ReconnectCircuitOpenError
+from MetaRpcMT4.mt4_metrics import MetricsRegistry
+from MetaRpcMT4.mt4_hedging import Hedger, HedgingPolicy
+from MetaRpcMT4.mt4_watchdog import StallPolicy, StallWatchdog, TICKS, TIMER, EVENTS
+
+
+# API error codes that mean the terminal instance is gone and a reconnect is needed
+_RECONNECT_ERROR_CODES = frozenset(("TERMINAL_INSTANCE_NOT_FOUND", "TERMINAL_REGISTRY_TERMINAL_NOT_FOUND"))
 
 
 
@@ -33,21 +44,46 @@ class ApiExceptionMT4(Exception):
         self.error = error
 
 
+def _metric_outcome(ex: BaseException) -> tuple[str, Optional[str]]:
+    """Maps a failed call to (gRPC status name, API error_code) for the metrics registry."""
+    if isinstance(ex, grpc.aio.AioRpcError):
+        return ex.code().name, None
+    if isinstance(ex, ApiExceptionMT4):
+        return "OK", getattr(ex.error, "error_code", None) or "API_ERROR"
+    if isinstance(ex, asyncio.CancelledError):
+        return "CANCELLED", None
+    return type(ex).__name__, None
+
+
 # === MT5Account Class ===
 class MT4Account:
-    def __init__(self, user: int, password: str, grpc_server: Optional[str] = None, id_: Optional[str] = None):
+    def __init__(
+        self,
+        user: int,
+        password: str,
+        grpc_server: Optional[str] = None,
+        id_: Optional[str] = None,
+        channel_options: Optional[ChannelPoolOptions] = None,
+        channel_credentials: Optional[grpc.ChannelCredentials] = None,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        stall_policy: Optional[StallPolicy] = None,
+    ):
         self.user = user
         self.password = password
         self.grpc_server = grpc_server or "mt4.mrpc.pro:443"   # default server
         self.id = id_
 
-        # Async gRPC secure channel (TLS)
-        self.channel = grpc.aio.secure_channel(
+        # Pool of async gRPC secure channels (TLS); one sub-channel by default
+        self._pool = ChannelPool(
             self.grpc_server,
-            grpc.ssl_channel_credentials()
+            channel_credentials or grpc.ssl_channel_credentials(),
+            channel_options,
         )
+        self.channel = self._pool.channels[0].channel
 
-        # Init stubs directly (like in C#)
+        # Init stubs directly (like in C#); RPCs pick their own sub-channel from the pool
         self.connection_client = connection_pb2_grpc.ConnectionStub(self.channel)
         self.subscription_client = subscriptions_pb2_grpc.SubscriptionServiceStub(self.channel)
         self.account_client = account_helper_pb2_grpc.AccountHelperStub(self.channel)
@@ -61,11 +97,72 @@ class MT4Account:
         self.base_chart_symbol = None
         self.connect_timeout_seconds = 30
 
+        # Per-RPC / per-stream latency and error metrics (pass one registry to share it)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+
+        # One shared reconnect for all failing calls/streams (backoff + circuit breaker)
+        self._reconnector = ReconnectCoordinator(self.reconnect, reconnect_policy, self.metrics)
+
+        # Opt-in hedging of read-only RPCs (trading RPCs are never hedged)
+        self._hedger: Optional[Hedger] = Hedger(hedging, self.metrics) if hedging is not None else None
+
+        # Streams that go silent without an error are cancelled and resubscribed
+        self._watchdog = StallWatchdog(stall_policy, self.metrics)
+
 
     # === Utility: headers ===
     def get_headers(self):
         return [("id", self.id)]
 
+    # === Utility: transport ===
+    def channel_stats(self) -> list[dict]:
+        """
+        Returns per sub-channel counters of the channel pool.
+
+        Returns:
+            list[dict]: One dict per sub-channel with index, calls, errors, in_flight,
+                streams_opened, open_streams and last_error_code.
+        """
+        return self._pool.stats()
+
+    async def close(self, grace: Optional[float] = None):
+        """Closes every sub-channel of the channel pool."""
+        await self._pool.close(grace)
+
+    def reconnect_stats(self) -> dict:
+        """
+        Returns counters of the shared reconnect.
+
+        Returns:
+            dict: state (closed/open/half_open), attempts, successes, failures,
+                coalesced_waiters, last/max/avg duration in seconds and last_error.
+        """
+        return self._reconnector.stats()
+
+    def hedging_stats(self) -> dict:
+        """Returns hedging counters (calls, hedged, hedge_wins, budget_denied); empty if hedging is off."""
+        return self._hedger.stats() if self._hedger is not None else {}
+
+    def stream_health(self) -> dict:
+        """
+        Returns the stall watchdog view of every open stream.
+
+        Returns:
+            dict: enabled, total stalls and per stream: name, kind, messages, staleness_s,
+                avg_gap_s, timeout_s (None = not watched right now) and stalls.
+        """
+        return self._watchdog.stats()
+
+    def metrics_snapshot(self) -> dict:
+        """Returns the metrics registry as a plain dict (rpcs, streams, reconnects, counters, gauges)."""
+        self._watchdog.publish()
+        return self.metrics.snapshot()
+
+    def metrics_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        self._watchdog.publish()
+        return self.metrics.to_prometheus()
+
     # === Utility: reconnect ===
     async def reconnect(self, deadline: Optional[datetime] = None):
         if self.server_name:
@@ -76,37 +173,146 @@ class MT4Account:
                                             self.base_chart_symbol or "EURUSD", True,
                                             self.connect_timeout_seconds, deadline)
 
+    async def _shared_reconnect(self, generation: int, deadline: Optional[datetime] = None):
+        """
+        Joins (or starts) the single shared reconnect for a failure seen at `generation`.
+
+        A failed attempt that is itself a transport error is swallowed so the caller
+        retries its call and the next attempt backs off further; once the circuit
+        opens, callers fail fast with ConnectExceptionMT4.
+        """
+        try:
+            await self._reconnector.reconnect(generation, deadline)
+        except ReconnectCircuitOpenError as ex:
+            raise ConnectExceptionMT4(str(ex)) from ex
+        except grpc.aio.AioRpcError as ex:
+            if ex.code() not in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED):
+                raise
+
     # === Core retry wrapper ===
     async def execute_with_reconnect(
         self,
-        grpc_call: Callable[[list[tuple[str, str]]], Awaitable[Any]],
+        grpc_call: Callable[[list[tuple[str, str]], Any], Awaitable[Any]],
         error_selector: Callable[[Any], Optional[Any]],
         deadline: Optional[datetime] = None,
         cancellation_event: Optional[asyncio.Event] = None,
+        lane: str = LANE_SHARED,
+        name: str = "execute_with_reconnect",
     ):
-        while cancellation_event is None or not cancellation_event.is_set():
-            headers = self.get_headers()
-            try:
-                res = await grpc_call(headers)
-            except grpc.aio.AioRpcError as ex:
-                if ex.code() == grpc.StatusCode.UNAVAILABLE:
-                    await asyncio.sleep(0.5)
-                    await self.reconnect(deadline)
+        metrics = self.metrics
+        started = time.perf_counter()
+        try:
+            while cancellation_event is None or not cancellation_event.is_set():
+                headers = self.get_headers()
+                generation = self._reconnector.generation
+                attempt_started = time.perf_counter()
+                try:
+                    with self._pool.lease(lane=lane) as ch:
+                        res = await grpc_call(headers, ch)
+                except grpc.aio.AioRpcError as ex:
+                    if ex.code() == grpc.StatusCode.UNAVAILABLE:
+                        metrics.rpc_retry(name, reconnect=True)
+                        await self._shared_reconnect(generation, deadline)
+                        continue
+                    raise
+
+                error = error_selector(res)
+                if error and error.error_code in _RECONNECT_ERROR_CODES:
+                    metrics.rpc_retry(name, reconnect=True)
+                    await self._shared_reconnect(generation, deadline)
                     continue
-                raise
 
-            error = error_selector(res)
-            if error and error.error_code in ("TERMINAL_INSTANCE_NOT_FOUND", "TERMINAL_REGISTRY_TERMINAL_NOT_FOUND"):
-                await asyncio.sleep(0.5)
-                await self.reconnect(deadline)
-                continue
+                if res.HasField("error") and res.error.error_message:
+                    raise ApiExceptionMT4(res.error)
+
+                now = time.perf_counter()
+                metrics.observe_attempt(name, now - attempt_started)
+                metrics.observe_rpc(name, now - started)
+                return res
+
+            raise asyncio.CancelledError("The operation was canceled by the caller.")
+        except BaseException as ex:
+            metrics.observe_rpc(name, time.perf_counter() - started, *_metric_outcome(ex))
+            raise
+
+    # === Table-driven unary invoker ===
+    async def _invoke(
+        self,
+        spec: rpc.RpcSpec,
+        request: Any = None,
+        deadline: Optional[datetime] = None,
+        cancellation_event: Optional[asyncio.Event] = None,
+    ):
+        """
+        Runs the unary RPC described by `spec` with the same reconnect semantics as
+        execute_with_reconnect, without building a closure per call.
+
+        Args:
+            spec (RpcSpec): Entry of mt4_rpc_table (stub method, lane, data extractor).
+            request: Request message; None uses the spec's prebuilt request.
+            deadline (datetime, optional): UTC deadline, converted once to the monotonic clock.
+            cancellation_event (asyncio.Event, optional): Event to cancel the request.
 
-            if res.HasField("error") and res.error.error_message:
-                raise ApiExceptionMT4(res.error)
+        Returns:
+            The payload selected by `spec.data` (normally `reply.data`).
+        """
+        if not (self.host or self.server_name or self.id):
+            raise ConnectExceptionMT4("Please call connect method first")
+        if request is None:
+            request = spec.request
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        expires_at = None
+        if deadline is not None:
+            expires_at = time.monotonic() + (deadline - datetime.utcnow()).total_seconds()
+
+        try:
+            while cancellation_event is None or not cancellation_event.is_set():
+                generation = self._reconnector.generation
+                timeout = None if expires_at is None else max(expires_at - time.monotonic(), 0)
+                attempt_started = time.perf_counter()
+                hedged = False
+                try:
+                    hedger = self._hedger
+                    if hedger is not None and spec.hedgeable and hedger.applies(spec.name):
+                        res, hedged = await hedger.run(spec.name, lambda: self._attempt(spec, request, timeout))
+                    else:
+                        with self._pool.lease(lane=spec.lane) as ch:
+                            res = await ch.rpc(spec)(request, metadata=self.get_headers(), timeout=timeout)
+                except grpc.aio.AioRpcError as ex:
+                    if ex.code() == grpc.StatusCode.UNAVAILABLE:
+                        metrics.rpc_retry(spec.name, reconnect=True)
+                        await self._shared_reconnect(generation, deadline)
+                        continue
+                    raise
 
-            return res
+                if res.HasField("error"):
+                    error = res.error
+                    if error.error_code in _RECONNECT_ERROR_CODES:
+                        metrics.rpc_retry(spec.name, reconnect=True)
+                        await self._shared_reconnect(generation, deadline)
+                        continue
+                    if error.error_message:
+                        raise ApiExceptionMT4(error)
 
-        raise asyncio.CancelledError("The operation was canceled by the caller.")
+                data = spec.data(res)
+                now = time.perf_counter()
+                if not hedged:
+                    # the hedge delay is derived from these: keep retries and hedges out of them
+                    metrics.observe_attempt(spec.name, now - attempt_started)
+                metrics.observe_rpc(spec.name, now - started)
+                return data
+
+            raise asyncio.CancelledError("The operation was canceled by the caller.")
+        except BaseException as ex:
+            metrics.observe_rpc(spec.name, time.perf_counter() - started, *_metric_outcome(ex))
+            raise
+
+    async def _attempt(self, spec: rpc.RpcSpec, request: Any, timeout: Optional[float]):
+        """One raw attempt of `spec` on the least loaded sub-channel of its lane."""
+        with self._pool.lease(lane=spec.lane) as ch:
+            return await ch.rpc(spec)(request, metadata=self.get_headers(), timeout=timeout)
 
     # === Connect methods ===
     async def connect_by_host_port(
@@ -210,31 +416,7 @@ class MT4Account:
             ApiExceptionMT4: If the server returns an error in the response.
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
         """
-        if not (self.host or self.server_name):
-            raise ConnectExceptionMT4("Please call connect method first")
-
-        request = account_helper_pb2.AccountSummaryRequest()
-
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = (deadline - datetime.utcnow()).total_seconds()
-                if timeout < 0:
-                    timeout = 0
-            return await self.account_client.AccountSummary(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-
-        return res.data
+        return await self._invoke(rpc.ACCOUNT_SUMMARY, None, deadline, cancellation_event)
 
     async def opened_orders(
         self,
@@ -260,33 +442,10 @@ class MT4Account:
             ApiExceptionMT4: If the server returns an error in the response.
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         # Build request
         request = account_helper_pb2.OpenedOrdersRequest(sort_type=sort_mode)
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = (deadline - datetime.utcnow()).total_seconds()
-                if timeout < 0:
-                    timeout = 0
-            return await self.account_client.OpenedOrders(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        # Execute with automatic reconnect logic
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-
-        return res.data
+        return await self._invoke(rpc.OPENED_ORDERS, request, deadline, cancellation_event)
 
 
     async def opened_orders_tickets(
@@ -305,31 +464,7 @@ class MT4Account:
             ApiExceptionMT4: If the server returns an error in the response.
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
-        request = account_helper_pb2.OpenedOrdersTicketsRequest()
-
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = (deadline - datetime.utcnow()).total_seconds()
-                if timeout < 0:
-                    timeout = 0
-            return await self.account_client.OpenedOrdersTickets(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-
-        return res.data
+        return await self._invoke(rpc.OPENED_ORDERS_TICKETS, None, deadline, cancellation_event)
 
 
     async def orders_history(
@@ -360,9 +495,6 @@ class MT4Account:
             ApiExceptionMT4: If the server returns an error in the response.
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         # Convert datetime → Timestamp (protobuf)
         ts_from = None
         ts_to = None
@@ -381,26 +513,7 @@ class MT4Account:
             items_per_page=items_per_page,
         )
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = (deadline - datetime.utcnow()).total_seconds()
-                if timeout < 0:
-                    timeout = 0
-            return await self.account_client.OrdersHistory(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-
-        return res.data
+        return await self._invoke(rpc.ORDERS_HISTORY, request, deadline, cancellation_event)
 
 
     async def symbol_params_many(
@@ -423,31 +536,9 @@ class MT4Account:
             ApiExceptionMT4: If the server returns an error in the response.
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         request = account_helper_pb2.SymbolParamsManyRequest(symbol_name=symbol_name or "")
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = (deadline - datetime.utcnow()).total_seconds()
-                if timeout < 0:
-                    timeout = 0
-            return await self.account_client.SymbolParamsMany(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-
-        return res.data
+        return await self._invoke(rpc.SYMBOL_PARAMS_MANY, request, deadline, cancellation_event)
 
 
     async def tick_value_with_size(
@@ -470,31 +561,9 @@ class MT4Account:
             ApiExceptionMT4: If the server returns an error in the response.
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         request = account_helper_pb2.TickValueWithSizeRequest(symbol_names=symbol_names)
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = (deadline - datetime.utcnow()).total_seconds()
-                if timeout < 0:
-                    timeout = 0
-            return await self.account_client.TickValueWithSize(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-
-        return res.data
+        return await self._invoke(rpc.TICK_VALUE_WITH_SIZE, request, deadline, cancellation_event)
 
 #
 #    Streams --------------------------------------------------------------------------------------------------------
@@ -503,76 +572,121 @@ class MT4Account:
     async def execute_stream_with_reconnect(
         self,
         request: Any,
-        stream_invoker: Callable[[Any, list[tuple[str, str]]], grpc.aio.StreamStreamCall],
+        stream_invoker: Callable[[Any, list[tuple[str, str]], Any], grpc.aio.StreamStreamCall],
         get_error: Callable[[Any], Optional[Any]],
         get_data: Callable[[Any], Any],
         cancellation_event: Optional[asyncio.Event] = None,
+        name: str = "stream",
+        on_reconnected: Optional[Callable[[], Any]] = None,
+        activity: str = EVENTS,
+        period_s: Optional[float] = None,
     ) -> AsyncGenerator[Any, None]:
         """
         Executes a gRPC server-streaming call with automatic reconnection logic on recoverable errors.
 
         Args:
             request: The request object to initiate the stream with.
-            stream_invoker (Callable): A function that opens the stream. It receives the request and metadata headers,
-                and returns an async streaming call.
+            stream_invoker (Callable): A function that opens the stream. It receives the request, metadata headers
+                and the pooled sub-channel to open it on, and returns an async streaming call.
             get_error (Callable): A function that extracts the error object (if any) from a reply.
                 Return an object with .error_code == "TERMINAL_INSTANCE_NOT_FOUND" to trigger reconnect,
                 or any non-null error to raise ApiExceptionMT5.
             get_data (Callable): A function that extracts the data object from a reply. If it returns None, the
                 message is skipped.
             cancellation_event (asyncio.Event, optional): Event to cancel streaming and reconnection attempts.
+            name (str): Series name used in the metrics registry.
+            on_reconnected (Callable, optional): Called (and awaited if it returns an awaitable) after a
+                reconnect, before the stream is reopened. Lets the consumer fill the gap, e.g. from history.
+            activity (str): Expected activity for the stall watchdog: "ticks" (market data), "timer"
+                (one message per `period_s`) or "events" (sporadic, never considered stalled).
+            period_s (float, optional): Server timer / pull period of a "timer" stream.
 
         Yields:
             Extracted data items streamed from the server.
 
         Raises:
-            ConnectExceptionMT4: If reconnection logic fails due to missing account context.
+            ConnectExceptionMT4: If reconnection logic fails due to missing account context
+                or the reconnect circuit is open.
             ApiExceptionMT4: When the stream response contains a known API error.
             grpc.aio.AioRpcError: If a non-recoverable gRPC error occurs.
         """
-        while cancellation_event is None or not cancellation_event.is_set():
-            reconnect_required = False
-            stream = None
-            try:
-                stream = stream_invoker(request, self.get_headers())
-                async for reply in stream:
-                    error = get_error(reply)
-
-                    if error and error.error_code in (
-                        "TERMINAL_INSTANCE_NOT_FOUND",
-                        "TERMINAL_REGISTRY_TERMINAL_NOT_FOUND",
-                    ):
-                        reconnect_required = True
-                        break
-
-                    if error and getattr(error, "message", None):
-                        raise ApiExceptionMT4(error)
-
-                    data = get_data(reply)
-                    if data is not None:
-                        yield data
-
-            except grpc.aio.AioRpcError as ex:
-                if ex.code() == grpc.StatusCode.UNAVAILABLE:
-                    reconnect_required = True
+        metrics = self.metrics
+        act = self._watchdog.track(name, activity, period_s)
+        try:
+            while cancellation_event is None or not cancellation_event.is_set():
+                reconnect_required = False
+                stalled = False
+                stream = None
+                generation = self._reconnector.generation
+                try:
+                    with self._pool.lease(stream=True) as ch:
+                        stream = stream_invoker(request, self.get_headers(), ch)
+                        metrics.stream_opened(name)
+                        # one timer per call: cancels it once silent for longer than expected
+                        act.arm(stream.cancel)
+                        async for reply in stream:
+                            act.beat()
+                            metrics.stream_message(name)
+                            error = get_error(reply)
+
+                            if error and error.error_code in _RECONNECT_ERROR_CODES:
+                                metrics.stream_error(name, api_error=error.error_code)
+                                reconnect_required = True
+                                break
+
+                            if error and getattr(error, "message", None):
+                                metrics.stream_error(name, api_error=error.error_code or "API_ERROR")
+                                raise ApiExceptionMT4(error)
+
+                            data = get_data(reply)
+                            if data is not None:
+                                yield data
+                            act.waiting()
+
+                except asyncio.CancelledError:
+                    task = asyncio.current_task()
+                    if not act.fired or (task is not None and getattr(task, "cancelling", lambda: 0)()):
+                        raise
+                    stalled = True  # our watchdog cancelled the call: open but silent
+
+                except grpc.aio.AioRpcError as ex:
+                    if act.fired and ex.code() == grpc.StatusCode.CANCELLED:
+                        stalled = True
+                    else:
+                        metrics.stream_error(name, status=ex.code().name)
+                        if ex.code() == grpc.StatusCode.UNAVAILABLE:
+                            reconnect_required = True
+                        else:
+                            raise
+
+                finally:
+                    act.disarm()
+                    if stream:
+                        stream.cancel()  # close stream properly
+
+                stalled = stalled or act.fired
+
+                if reconnect_required:
+                    metrics.stream_reconnect(name)
+                    await self._shared_reconnect(generation)
+                    if on_reconnected is not None:
+                        res = on_reconnected()
+                        if asyncio.iscoroutine(res) or isinstance(res, asyncio.Future):
+                            await res
+                elif stalled:
+                    # the channel may be fine: resubscribe on a fresh call, no reconnect
+                    self._watchdog.stalled(act)
                 else:
-                    raise
-
-            finally:
-                if stream:
-                    stream.cancel()  # close stream properly
-
-            if reconnect_required:
-                await asyncio.sleep(0.5)
-                await self.reconnect()
-            else:
-                break
+                    break
+        finally:
+            self._watchdog.untrack(act)
 
 
     async def on_symbol_tick(
         self,
         symbols: list[str],
         cancellation_event: Optional[asyncio.Event] = None,
+        on_reconnected: Optional[Callable[[], Any]] = None,
     ):
         """
         Subscribes to real-time tick data for specified symbols.
@@ -580,6 +694,8 @@ class MT4Account:
         Args:
             symbols (list[str]): The symbol names to subscribe to.
             cancellation_event (asyncio.Event, optional): Event to cancel streaming.
+            on_reconnected (Callable, optional): Hook run after a reconnect, before ticks resume
+                (see execute_stream_with_reconnect).
 
         Yields:
             OnSymbolTickData: Async stream of tick data responses.
@@ -597,10 +713,13 @@ class MT4Account:
 
         async for data in self.execute_stream_with_reconnect(
             request=request,
-            stream_invoker=lambda req, headers: self.subscription_client.OnSymbolTick(req, metadata=headers),
+            stream_invoker=lambda req, headers, ch: ch.subscription_client.OnSymbolTick(req, metadata=headers),
             get_error=lambda reply: reply.error,
             get_data=lambda reply: reply.data,
             cancellation_event=cancellation_event,
+            name="on_symbol_tick",
+            on_reconnected=on_reconnected,
+            activity=TICKS,
         ):
             yield data
 
@@ -629,10 +748,11 @@ class MT4Account:
 
         async for data in self.execute_stream_with_reconnect(
             request=request,
-            stream_invoker=lambda req, headers: self.subscription_client.OnTrade(req, metadata=headers),
+            stream_invoker=lambda req, headers, ch: ch.subscription_client.OnTrade(req, metadata=headers),
             get_error=lambda reply: reply.error,
             get_data=lambda reply: reply.data,
             cancellation_event=cancellation_event,
+            name="on_trade",
         ):
             yield data
 
@@ -666,12 +786,15 @@ class MT4Account:
 
         async for data in self.execute_stream_with_reconnect(
             request=request,
-            stream_invoker=lambda req, headers: self.subscription_client.OnOpenedOrdersTickets(
+            stream_invoker=lambda req, headers, ch: ch.subscription_client.OnOpenedOrdersTickets(
                 req, metadata=headers
             ),
             get_error=lambda reply: reply.error,
             get_data=lambda reply: reply.data,
             cancellation_event=cancellation_event,
+            name="on_opened_orders_tickets",
+            activity=TIMER,
+            period_s=pull_interval_milliseconds / 1000.0,
         ):
             yield data
 
@@ -705,12 +828,15 @@ class MT4Account:
 
         async for data in self.execute_stream_with_reconnect(
             request=request,
-            stream_invoker=lambda req, headers: self.subscription_client.OnOpenedOrdersProfit(
+            stream_invoker=lambda req, headers, ch: ch.subscription_client.OnOpenedOrdersProfit(
                 req, metadata=headers
             ),
             get_error=lambda reply: reply.error,
             get_data=lambda reply: reply.data,
             cancellation_event=cancellation_event,
+            name="on_opened_orders_profit",
+            activity=TIMER,
+            period_s=timer_period_milliseconds / 1000.0,
         ):
             yield data
 
@@ -759,9 +885,6 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         req = trading_helper_pb2.OrderSendRequest(
             symbol=symbol,
             operation_type=operation_type,
@@ -784,19 +907,7 @@ class MT4Account:
             ts.FromDatetime(expiration)
             req.expiration.CopyFrom(ts)
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.trade_client.OrderSend(req, metadata=headers, timeout=timeout)
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.ORDER_SEND, req, deadline, cancellation_event)
 
 
     async def order_modify(
@@ -830,9 +941,6 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         req = trading_helper_pb2.OrderModifyRequest(order_ticket=order_ticket)
         if new_price is not None:
             req.new_price = new_price
@@ -845,19 +953,7 @@ class MT4Account:
             ts.FromDatetime(new_expiration)
             req.new_expiration.CopyFrom(ts)
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.trade_client.OrderModify(req, metadata=headers, timeout=timeout)
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.ORDER_MODIFY, req, deadline, cancellation_event)
 
 
     async def order_close_delete(
@@ -889,9 +985,6 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         req = trading_helper_pb2.OrderCloseDeleteRequest(order_ticket=order_ticket)
         if lots is not None:
             req.lots = lots
@@ -900,19 +993,7 @@ class MT4Account:
         if slippage is not None:
             req.slippage = slippage
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.trade_client.OrderCloseDelete(req, metadata=headers, timeout=timeout)
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.ORDER_CLOSE_DELETE, req, deadline, cancellation_event)
 
 
     async def order_close_by(
@@ -940,27 +1021,12 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         req = trading_helper_pb2.OrderCloseByRequest(
             ticket_to_close=ticket_to_close,
             opposite_ticket_closing_by=opposite_ticket_closing_by,
         )
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.trade_client.OrderCloseBy(req, metadata=headers, timeout=timeout)
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.ORDER_CLOSE_BY, req, deadline, cancellation_event)
 
 #
 # Market info --------------------------------------------------------------------------------------------------------
@@ -989,28 +1055,9 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         request = market_info_pb2.QuoteRequest(symbol=symbol)
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.market_info_client.Quote(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.QUOTE, request, deadline, cancellation_event)
 
 
     async def quote_many(
@@ -1036,28 +1083,9 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         request = market_info_pb2.QuoteManyRequest(symbols=symbols)
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.market_info_client.QuoteMany(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.QUOTE_MANY, request, deadline, cancellation_event)
 
 
     async def symbols(
@@ -1081,28 +1109,7 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
-        request = market_info_pb2.SymbolsRequest()
-
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.market_info_client.Symbols(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.SYMBOLS, None, deadline, cancellation_event)
 
 
     async def quote_history(
@@ -1134,9 +1141,6 @@ class MT4Account:
             grpc.aio.AioRpcError: If the gRPC call fails due to communication or protocol errors.
             asyncio.CancelledError: If cancelled via `cancellation_event`.
         """
-        if not (self.host or self.server_name or self.id):
-            raise ConnectExceptionMT4("Please call connect method first")
-
         ts_from = Timestamp()
         ts_from.FromDatetime(from_time)
         ts_to = Timestamp()
@@ -1149,20 +1153,4 @@ class MT4Account:
             toTime=ts_to,
         )
 
-        async def grpc_call(headers):
-            timeout = None
-            if deadline:
-                timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
-            return await self.market_info_client.QuoteHistory(
-                request,
-                metadata=headers,
-                timeout=timeout,
-            )
-
-        res = await self.execute_with_reconnect(
-            grpc_call=grpc_call,
-            error_selector=lambda r: getattr(r, "error", None),
-            deadline=deadline,
-            cancellation_event=cancellation_event,
-        )
-        return res.data
+        return await self._invoke(rpc.QUOTE_HISTORY, request, deadline, cancellation_event)
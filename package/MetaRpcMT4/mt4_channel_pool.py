@@ -0,0 +1,235 @@
+import itertools
+import grpc
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import MetaRpcMT4.mt4_term_api_connection_pb2_grpc as connection_pb2_grpc
+import MetaRpcMT4.mt4_term_api_account_helper_pb2_grpc as account_helper_pb2_grpc
+import MetaRpcMT4.mt4_term_api_trading_helper_pb2_grpc as trading_helper_pb2_grpc
+import MetaRpcMT4.mt4_term_api_market_info_pb2_grpc as market_info_pb2_grpc
+import MetaRpcMT4.mt4_term_api_subscriptions_pb2_grpc as subscriptions_pb2_grpc
+
+
+_COMPRESSION_BY_NAME = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+# === Pool configuration ===
+@dataclass
+class ChannelPoolOptions:
+    """
+    Transport settings for the MT4Account channel pool.
+
+    Every sub-channel owns its own HTTP/2 connection, so long-lived tick streams,
+    history downloads and orders no longer share one connection.
+
+    Attributes:
+        size (int): Number of shared sub-channels (HTTP/2 connections) in the pool.
+        trade_lane (bool): Reserve dedicated sub-channels for TradingHelper RPCs. Market data,
+            history and streams never use them, so bulk reads cannot delay an order.
+        trade_lane_size (int): Number of sub-channels in the trade lane.
+        keepalive_time_ms (int, optional): Interval between keepalive pings.
+        keepalive_timeout_ms (int, optional): Time to wait for a keepalive ack.
+        keepalive_permit_without_calls (bool): Send keepalive pings even with no active calls.
+        max_message_length (int, optional): Max send/receive message size in bytes.
+        compression (str | grpc.Compression, optional): "gzip", "deflate" or a grpc.Compression value.
+        extra_options (list[tuple[str, Any]], optional): Raw gRPC channel arguments appended as-is.
+    """
+    size: int = 1
+    trade_lane: bool = True
+    trade_lane_size: int = 1
+    keepalive_time_ms: Optional[int] = None
+    keepalive_timeout_ms: Optional[int] = None
+    keepalive_permit_without_calls: bool = False
+    max_message_length: Optional[int] = None
+    compression: Optional[Union[str, grpc.Compression]] = None
+    extra_options: Optional[list] = None
+
+    def channel_args(self) -> list:
+        """Builds the gRPC channel arguments for one sub-channel."""
+        # A local subchannel pool stops gRPC from collapsing identical channels
+        # onto one shared connection.
+        args: list = [("grpc.use_local_subchannel_pool", 1)]
+        if self.keepalive_time_ms is not None:
+            args.append(("grpc.keepalive_time_ms", int(self.keepalive_time_ms)))
+        if self.keepalive_timeout_ms is not None:
+            args.append(("grpc.keepalive_timeout_ms", int(self.keepalive_timeout_ms)))
+        if self.keepalive_permit_without_calls:
+            args.append(("grpc.keepalive_permit_without_calls", 1))
+            args.append(("grpc.http2.max_pings_without_data", 0))
+        if self.max_message_length is not None:
+            args.append(("grpc.max_send_message_length", int(self.max_message_length)))
+            args.append(("grpc.max_receive_message_length", int(self.max_message_length)))
+        if self.extra_options:
+            args.extend(self.extra_options)
+        return args
+
+    def grpc_compression(self) -> Optional[grpc.Compression]:
+        """Resolves `compression` into a grpc.Compression value (or None)."""
+        if self.compression is None or isinstance(self.compression, grpc.Compression):
+            return self.compression
+        return _COMPRESSION_BY_NAME[str(self.compression).strip().lower()]
+
+
+# === Lanes ===
+LANE_SHARED = "shared"
+LANE_TRADE = "trade"
+
+
+# === Per-channel statistics ===
+class ChannelStats:
+    __slots__ = ("index", "lane", "calls", "errors", "in_flight", "streams_opened", "open_streams", "last_error_code")
+
+    def __init__(self, index: int, lane: str):
+        self.index = index
+        self.lane = lane
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.streams_opened = 0
+        self.open_streams = 0
+        self.last_error_code: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PooledChannel:
+    """One sub-channel of the pool with its own stubs and stats."""
+
+    def __init__(self, index: int, channel: grpc.aio.Channel, lane: str = LANE_SHARED):
+        self.index = index
+        self.lane = lane
+        self.channel = channel
+        self.stats = ChannelStats(index, lane)
+
+        self.connection_client = connection_pb2_grpc.ConnectionStub(channel)
+        self.subscription_client = subscriptions_pb2_grpc.SubscriptionServiceStub(channel)
+        self.account_client = account_helper_pb2_grpc.AccountHelperStub(channel)
+        self.trade_client = trading_helper_pb2_grpc.TradingHelperStub(channel)
+        self.market_info_client = market_info_pb2_grpc.MarketInfoStub(channel)
+        self._rpc: dict = {}
+
+    def rpc(self, spec):
+        """Returns the bound stub method for an RpcSpec (looked up once per sub-channel)."""
+        fn = self._rpc.get(spec.name)
+        if fn is None:
+            fn = self._rpc[spec.name] = getattr(getattr(self, spec.stub), spec.method)
+        return fn
+
+
+class ChannelLease:
+    """
+    Context manager that holds a sub-channel for the duration of one call or stream.
+
+    Keeps the in-flight / open-stream counters of the channel accurate so the pool
+    can route the next call to the least busy connection.
+    """
+
+    __slots__ = ("_ch", "_stream")
+
+    def __init__(self, ch: PooledChannel, stream: bool):
+        self._ch = ch
+        self._stream = stream
+
+    def __enter__(self) -> PooledChannel:
+        st = self._ch.stats
+        st.in_flight += 1
+        if self._stream:
+            st.open_streams += 1
+            st.streams_opened += 1
+        else:
+            st.calls += 1
+        return self._ch
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        st = self._ch.stats
+        st.in_flight -= 1
+        if self._stream:
+            st.open_streams -= 1
+        if isinstance(exc, grpc.aio.AioRpcError):
+            st.errors += 1
+            st.last_error_code = exc.code().name
+        return False
+
+
+# === Channel pool ===
+class ChannelPool:
+    """
+    N gRPC sub-channels to the same gateway.
+
+    Unary calls go to the sub-channel with the fewest calls in flight; streams go to
+    the sub-channel with the fewest open streams, so long-lived subscriptions end up
+    spread across connections instead of stacking on one.
+
+    With `trade_lane` enabled, TradingHelper calls get their own sub-channels that
+    carry nothing else (no streams, no history, no quotes).
+    """
+
+    def __init__(
+        self,
+        target: str,
+        credentials: grpc.ChannelCredentials,
+        options: Optional[ChannelPoolOptions] = None,
+    ):
+        self.target = target
+        self.options = options or ChannelPoolOptions()
+        if self.options.size < 1:
+            raise ValueError("ChannelPoolOptions.size must be >= 1")
+        if self.options.trade_lane and self.options.trade_lane_size < 1:
+            raise ValueError("ChannelPoolOptions.trade_lane_size must be >= 1")
+
+        args = self.options.channel_args()
+        compression = self.options.grpc_compression()
+        self.channels: list[PooledChannel] = [
+            PooledChannel(
+                i,
+                grpc.aio.secure_channel(target, credentials, options=args, compression=compression),
+            )
+            for i in range(self.options.size)
+        ]
+
+        # Order payloads are tiny: the trade lane skips compression to keep ack latency low
+        self.trade_channels: list[PooledChannel] = []
+        if self.options.trade_lane:
+            self.trade_channels = [
+                PooledChannel(
+                    self.options.size + i,
+                    grpc.aio.secure_channel(target, credentials, options=args),
+                    LANE_TRADE,
+                )
+                for i in range(self.options.trade_lane_size)
+            ]
+        self._rr = itertools.count()
+
+    def pick(self, stream: bool = False, lane: str = LANE_SHARED) -> PooledChannel:
+        """Returns the least loaded sub-channel of the lane (round-robin among equals)."""
+        channels = self.trade_channels if lane == LANE_TRADE and self.trade_channels else self.channels
+        n = len(channels)
+        if n == 1:
+            return channels[0]
+        start = next(self._rr) % n
+        best = None
+        best_load = None
+        for i in range(n):
+            ch = channels[(start + i) % n]
+            st = ch.stats
+            load = (st.open_streams, st.in_flight) if stream else st.in_flight
+            if best is None or load < best_load:
+                best, best_load = ch, load
+        return best
+
+    def lease(self, stream: bool = False, lane: str = LANE_SHARED) -> ChannelLease:
+        """Picks a sub-channel of the lane and returns a lease for `with` blocks."""
+        return ChannelLease(self.pick(stream, lane), stream)
+
+    def stats(self) -> list[dict]:
+        """Per sub-channel counters (lane, calls, errors, in-flight, streams)."""
+        return [ch.stats.as_dict() for ch in self.channels + self.trade_channels]
+
+    async def close(self, grace: Optional[float] = None) -> None:
+        for ch in self.channels + self.trade_channels:
+            await ch.channel.close(grace)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+# === Hedging policy ===
+@dataclass
+class HedgingPolicy:
+    """
+    Opt-in request hedging for read-only unary RPCs of MT4Account.
+
+    If the first attempt has not answered after the hedge delay, a second copy is sent
+    (on the least loaded sub-channel) and whichever succeeds first wins. Trading RPCs are
+    never hedged, whatever this policy says.
+
+    Attributes:
+        percentile (float): Hedge delay = this percentile of the RPC's per-attempt latency
+            (acc.metrics attempt_latency: single successful unhedged attempts, so retries,
+            reconnect waits and hedged calls don't inflate it).
+        min_samples (int): Attempts to observe before the percentile is trusted; until then
+            `initial_delay_ms` is used.
+        initial_delay_ms (float): Hedge delay while there is not enough history.
+        min_delay_ms (float): Lower clamp for the hedge delay.
+        max_delay_ms (float): Upper clamp for the hedge delay.
+        budget_ratio (float): Extra load cap: each call earns this many hedge tokens
+            (0.05 = at most ~5% additional requests).
+        budget_burst (float): Max tokens that can be saved up for bursts.
+        rpcs (set[str], optional): Restrict hedging to these RPC names (e.g. {"quote"}).
+    """
+    percentile: float = 0.95
+    min_samples: int = 50
+    initial_delay_ms: float = 100.0
+    min_delay_ms: float = 2.0
+    max_delay_ms: float = 1000.0
+    budget_ratio: float = 0.05
+    budget_burst: float = 10.0
+    rpcs: Optional[set] = None
+
+
+class Hedger:
+    """Runs hedged attempts for one MT4Account and enforces the hedging budget."""
+
+    def __init__(self, policy: HedgingPolicy, metrics: Optional[Any] = None):
+        self.policy = policy
+        self.metrics = metrics
+        self._tokens = policy.budget_burst
+
+        # Stats
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def applies(self, name: str) -> bool:
+        return self.policy.rpcs is None or name in self.policy.rpcs
+
+    def delay_s(self, name: str) -> float:
+        """Current hedge delay for RPC `name` in seconds."""
+        p = self.policy
+        delay_ms = p.initial_delay_ms
+        if self.metrics is not None:
+            series = self.metrics.rpcs.get(name)
+            if series is not None and series.attempt_latency.count >= p.min_samples:
+                delay_ms = series.attempt_latency.quantile(p.percentile) * 1000.0
+        return min(max(delay_ms, p.min_delay_ms), p.max_delay_ms) / 1000.0
+
+    def _try_spend(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        self.budget_denied += 1
+        return False
+
+    async def run(self, name: str, attempt: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Runs `attempt` and, if it is slower than the hedge delay, one more copy of it.
+
+        Returns (first successful reply, whether a hedge was sent); raises the first error
+        only when both fail.
+        """
+        self.calls += 1
+        self._tokens = min(self.policy.budget_burst, self._tokens + self.policy.budget_ratio)
+
+        first = asyncio.ensure_future(attempt())
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay_s(name))
+            if done or not self._try_spend():
+                return await first, False
+
+            self.hedged += 1
+            if self.metrics is not None:
+                self.metrics.inc("rpc_hedges_total", rpc=name)
+            tasks.append(asyncio.ensure_future(attempt()))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if not t.cancelled() and t.exception() is None:
+                        if t is not first:
+                            self.hedge_wins += 1
+                            if self.metrics is not None:
+                                self.metrics.inc("rpc_hedge_wins_total", rpc=name)
+                        return t.result(), True
+            return first.result(), True  # both failed: surface the primary attempt's error
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "tokens": round(self._tokens, 3),
+        }
@@ -0,0 +1,324 @@
+import threading
+from bisect import bisect_left
+from typing import Optional
+
+
+# Latency buckets in seconds (upper bounds); the last implicit bucket is +Inf
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+# === Histogram ===
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative on export, like Prometheus)."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: tuple = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the q-quantile (0..1) by linear interpolation inside the bucket.
+
+        Returns 0.0 when nothing has been observed.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.bounds[i] if i < len(self.bounds) else self.max
+            if n and seen + n >= rank:
+                return lower + (upper - lower) * ((rank - seen) / n)
+            seen += n
+            lower = upper
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p99": self.quantile(0.99),
+        }
+
+
+# === Per-RPC / per-stream series ===
+class RpcMetrics:
+    """Latency, outcome and retry counters of one unary RPC."""
+
+    __slots__ = ("name", "latency", "attempt_latency", "calls", "by_status", "api_errors", "retries", "reconnects")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = Histogram()          # whole call: retries and reconnect waits included
+        self.attempt_latency = Histogram()  # successful attempts that were not hedged
+        self.calls = 0
+        self.by_status: dict[str, int] = {}
+        self.api_errors: dict[str, int] = {}
+        self.retries = 0
+        self.reconnects = 0
+
+    @property
+    def errors(self) -> int:
+        return sum(n for status, n in self.by_status.items() if status != "OK") + sum(self.api_errors.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "by_status": dict(self.by_status),
+            "api_errors": dict(self.api_errors),
+            "retries": self.retries,
+            "reconnects": self.reconnects,
+            "latency_s": self.latency.as_dict(),
+            "attempt_latency_s": self.attempt_latency.as_dict(),
+        }
+
+
+class StreamMetrics:
+    """Open/message/error counters of one server stream."""
+
+    __slots__ = ("name", "opened", "messages", "by_status", "api_errors", "reconnects")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.opened = 0
+        self.messages = 0
+        self.by_status: dict[str, int] = {}
+        self.api_errors: dict[str, int] = {}
+        self.reconnects = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "opened": self.opened,
+            "messages": self.messages,
+            "by_status": dict(self.by_status),
+            "api_errors": dict(self.api_errors),
+            "reconnects": self.reconnects,
+        }
+
+
+def _inc(d: dict, key: str, n: int = 1) -> None:
+    d[key] = d.get(key, 0) + n
+
+
+def _esc(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in labels.items()) + "}"
+
+
+# === Registry ===
+class MetricsRegistry:
+    """
+    In-process metrics for MT4Account and the layers above it.
+
+    Every unary RPC and stream gets its own series (latency histogram, calls by gRPC
+    status, API error codes, retries, reconnects). Upper layers can add plain counters
+    and gauges with `inc()` / `set_gauge()`. Read it with `snapshot()` or export
+    Prometheus text with `to_prometheus()`.
+    """
+
+    def __init__(self, prefix: str = "mt4", enabled: bool = True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.rpcs: dict[str, RpcMetrics] = {}
+        self.streams: dict[str, StreamMetrics] = {}
+        self.reconnect_latency: dict[str, Histogram] = {}
+        self.counters: dict[tuple, float] = {}
+        self.gauges: dict[tuple, float] = {}
+
+    # --- series lookup ---
+    def rpc(self, name: str) -> RpcMetrics:
+        m = self.rpcs.get(name)
+        if m is None:
+            with self._lock:
+                m = self.rpcs.setdefault(name, RpcMetrics(name))
+        return m
+
+    def stream(self, name: str) -> StreamMetrics:
+        m = self.streams.get(name)
+        if m is None:
+            with self._lock:
+                m = self.streams.setdefault(name, StreamMetrics(name))
+        return m
+
+    # --- unary RPCs ---
+    def observe_rpc(self, name: str, seconds: float, status: str = "OK", api_error: Optional[str] = None) -> None:
+        """Records one finished call (including its retries) of RPC `name`."""
+        if not self.enabled:
+            return
+        m = self.rpc(name)
+        m.calls += 1
+        m.latency.observe(seconds)
+        _inc(m.by_status, status)
+        if api_error:
+            _inc(m.api_errors, api_error)
+
+    def observe_attempt(self, name: str, seconds: float) -> None:
+        """Records the latency of one successful, unhedged attempt of RPC `name`."""
+        if self.enabled:
+            self.rpc(name).attempt_latency.observe(seconds)
+
+    def rpc_retry(self, name: str, reconnect: bool = False) -> None:
+        if not self.enabled:
+            return
+        m = self.rpc(name)
+        m.retries += 1
+        if reconnect:
+            m.reconnects += 1
+
+    # --- streams ---
+    def stream_opened(self, name: str) -> None:
+        if self.enabled:
+            self.stream(name).opened += 1
+
+    def stream_message(self, name: str) -> None:
+        if self.enabled:
+            self.stream(name).messages += 1
+
+    def stream_error(self, name: str, status: Optional[str] = None, api_error: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        m = self.stream(name)
+        if status:
+            _inc(m.by_status, status)
+        if api_error:
+            _inc(m.api_errors, api_error)
+
+    def stream_reconnect(self, name: str) -> None:
+        if self.enabled:
+            self.stream(name).reconnects += 1
+
+    # --- reconnects ---
+    def observe_reconnect(self, seconds: float, ok: bool) -> None:
+        """Records the duration of one shared reconnect attempt."""
+        if not self.enabled:
+            return
+        outcome = "success" if ok else "failure"
+        h = self.reconnect_latency.get(outcome)
+        if h is None:
+            h = self.reconnect_latency.setdefault(outcome, Histogram())
+        h.observe(seconds)
+
+    # --- generic counters / gauges ---
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        if self.enabled:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    # --- export ---
+    def reset(self) -> None:
+        with self._lock:
+            self.rpcs.clear()
+            self.streams.clear()
+            self.reconnect_latency.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def snapshot(self) -> dict:
+        """Plain-dict view of every series (safe to json.dumps)."""
+        return {
+            "rpcs": {name: m.as_dict() for name, m in list(self.rpcs.items())},
+            "streams": {name: m.as_dict() for name, m in list(self.streams.items())},
+            "reconnects": {k: h.as_dict() for k, h in list(self.reconnect_latency.items())},
+            "counters": {name + _labels(**dict(lbl)): v for (name, lbl), v in list(self.counters.items())},
+            "gauges": {name + _labels(**dict(lbl)): v for (name, lbl), v in list(self.gauges.items())},
+        }
+
+    def to_prometheus(self) -> str:
+        """Renders all series in the Prometheus text exposition format."""
+        p = self.prefix
+        out: list[str] = []
+
+        def histogram(metric: str, h: Histogram, **labels) -> None:
+            cumulative = 0
+            for bound, n in zip(h.bounds, h.counts):
+                cumulative += n
+                out.append(f"{metric}_bucket{_labels(**labels, le=repr(bound))} {cumulative}")
+            out.append(f"{metric}_bucket{_labels(**labels, le='+Inf')} {h.count}")
+            out.append(f"{metric}_sum{_labels(**labels)} {h.sum}")
+            out.append(f"{metric}_count{_labels(**labels)} {h.count}")
+
+        rpcs = list(self.rpcs.items())
+        if rpcs:
+            out.append(f"# HELP {p}_rpc_latency_seconds Unary RPC latency including retries.")
+            out.append(f"# TYPE {p}_rpc_latency_seconds histogram")
+            for name, m in rpcs:
+                histogram(f"{p}_rpc_latency_seconds", m.latency, rpc=name)
+            out.append(f"# HELP {p}_rpc_attempt_latency_seconds Latency of single successful unhedged attempts.")
+            out.append(f"# TYPE {p}_rpc_attempt_latency_seconds histogram")
+            for name, m in rpcs:
+                histogram(f"{p}_rpc_attempt_latency_seconds", m.attempt_latency, rpc=name)
+            out.append(f"# TYPE {p}_rpc_calls_total counter")
+            for name, m in rpcs:
+                for status, n in m.by_status.items():
+                    out.append(f"{p}_rpc_calls_total{_labels(rpc=name, status=status)} {n}")
+            out.append(f"# TYPE {p}_rpc_api_errors_total counter")
+            for name, m in rpcs:
+                for code, n in m.api_errors.items():
+                    out.append(f"{p}_rpc_api_errors_total{_labels(rpc=name, error_code=code)} {n}")
+            out.append(f"# TYPE {p}_rpc_retries_total counter")
+            for name, m in rpcs:
+                out.append(f"{p}_rpc_retries_total{_labels(rpc=name)} {m.retries}")
+            out.append(f"# TYPE {p}_rpc_reconnects_total counter")
+            for name, m in rpcs:
+                out.append(f"{p}_rpc_reconnects_total{_labels(rpc=name)} {m.reconnects}")
+
+        streams = list(self.streams.items())
+        if streams:
+            for metric, attr in (("opened", "opened"), ("messages", "messages"), ("reconnects", "reconnects")):
+                out.append(f"# TYPE {p}_stream_{metric}_total counter")
+                for name, m in streams:
+                    out.append(f"{p}_stream_{metric}_total{_labels(stream=name)} {getattr(m, attr)}")
+            out.append(f"# TYPE {p}_stream_errors_total counter")
+            for name, m in streams:
+                for status, n in m.by_status.items():
+                    out.append(f"{p}_stream_errors_total{_labels(stream=name, status=status)} {n}")
+                for code, n in m.api_errors.items():
+                    out.append(f"{p}_stream_errors_total{_labels(stream=name, error_code=code)} {n}")
+
+        if self.reconnect_latency:
+            out.append(f"# HELP {p}_reconnect_duration_seconds Duration of shared reconnect attempts.")
+            out.append(f"# TYPE {p}_reconnect_duration_seconds histogram")
+            for outcome, h in list(self.reconnect_latency.items()):
+                histogram(f"{p}_reconnect_duration_seconds", h, outcome=outcome)
+
+        for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+            typed = set()
+            for (name, lbl), v in sorted(series.items()):
+                metric = f"{p}_{name}"
+                if metric not in typed:
+                    out.append(f"# TYPE {metric} {kind}")
+                    typed.add(metric)
+                out.append(f"{metric}{_labels(**dict(lbl))} {v}")
+
+        return "\n".join(out) + "\n"
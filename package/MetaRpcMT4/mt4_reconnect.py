@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+
+# === Reconnect policy ===
+@dataclass
+class ReconnectPolicy:
+    """
+    Backoff and circuit-breaker settings for the shared reconnect of MT4Account.
+
+    Attributes:
+        initial_backoff_s (float): Delay before the first reconnect attempt.
+        max_backoff_s (float): Upper bound for the delay between attempts.
+        multiplier (float): Growth factor of the delay after each failed attempt.
+        jitter (float): Relative jitter applied to every delay (0.2 = ±20%).
+        failure_threshold (int): Consecutive failed reconnects that open the circuit.
+        open_timeout_s (float): How long the circuit stays open before one trial reconnect is allowed.
+    """
+    initial_backoff_s: float = 0.5
+    max_backoff_s: float = 10.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    failure_threshold: int = 5
+    open_timeout_s: float = 30.0
+
+    def backoff(self, failures: int) -> float:
+        """Delay before the next attempt after `failures` consecutive failures."""
+        base = min(self.max_backoff_s, self.initial_backoff_s * (self.multiplier ** failures))
+        if self.jitter:
+            base *= 1.0 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+
+
+class ReconnectCircuitOpenError(ConnectionError):
+    """Raised while the circuit is open and reconnect attempts are suspended."""
+
+
+# === Circuit states ===
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class ReconnectCoordinator:
+    """
+    Single-flight reconnect shared by every call and stream of one MT4Account.
+
+    The first caller that hits a dropped connection starts the reconnect; everybody
+    failing while it runs awaits the same attempt instead of issuing its own ConnectEx.
+    Callers pass the `generation` they observed before their call: if a reconnect has
+    completed since then, they return immediately and simply retry.
+
+    Failed attempts back off exponentially (with jitter); after `failure_threshold`
+    consecutive failures the circuit opens and callers fail fast with
+    ReconnectCircuitOpenError until `open_timeout_s` has passed.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[Optional[object]], Awaitable[None]],
+        policy: Optional[ReconnectPolicy] = None,
+        metrics: Optional[object] = None,
+    ):
+        self._connect = connect
+        self.policy = policy or ReconnectPolicy()
+        self.metrics = metrics
+        self.generation = 0
+        self._inflight: Optional[asyncio.Future] = None
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+        # Stats
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.coalesced_waiters = 0
+        self.circuit_opened = 0
+        self.last_duration_s = 0.0
+        self.max_duration_s = 0.0
+        self.total_duration_s = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CIRCUIT_CLOSED
+        if time.monotonic() - self._opened_at >= self.policy.open_timeout_s:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+    async def reconnect(self, generation: int, deadline: Optional[object] = None) -> None:
+        """
+        Waits for a reconnect that covers the failure observed at `generation`.
+
+        Args:
+            generation (int): Value of `self.generation` read before the failed call.
+            deadline (datetime, optional): Passed to the connect function by the caller that starts the attempt.
+
+        Raises:
+            ReconnectCircuitOpenError: If the circuit is open.
+            Exception: Whatever the connect function raised for this attempt.
+        """
+        if generation != self.generation:
+            return  # somebody already reconnected after our call was issued
+
+        if self._inflight is not None:
+            self.coalesced_waiters += 1
+            # shield: a cancelled waiter must not cancel the attempt the others wait on
+            await asyncio.shield(self._inflight)
+            return
+
+        if self.state == CIRCUIT_OPEN:
+            raise ReconnectCircuitOpenError(
+                f"Reconnect circuit is open after {self._failures} failed attempts ({self.last_error})"
+            )
+
+        self._inflight = asyncio.get_running_loop().create_task(self._attempt(deadline))
+        await asyncio.shield(self._inflight)
+
+    async def _attempt(self, deadline: Optional[object]) -> None:
+        try:
+            await asyncio.sleep(self.policy.backoff(self._failures))
+            self.attempts += 1
+            started = time.monotonic()
+            try:
+                await self._connect(deadline)
+            except Exception as ex:
+                self._record(started, ok=False)
+                self.failures += 1
+                self._failures += 1
+                code = getattr(ex, "code", None)
+                detail = code().name if callable(code) else str(ex)
+                self.last_error = f"{type(ex).__name__}: {detail}"
+                if self._opened_at is not None or self._failures >= self.policy.failure_threshold:
+                    # a failed trial in half-open state re-opens the circuit
+                    if self._opened_at is None:
+                        self.circuit_opened += 1
+                    self._opened_at = time.monotonic()
+                raise
+
+            self._record(started, ok=True)
+            self.successes += 1
+            self._failures = 0
+            self._opened_at = None
+            self.generation += 1
+        finally:
+            self._inflight = None
+
+    def _record(self, started: float, ok: bool) -> None:
+        took = time.monotonic() - started
+        if self.metrics is not None:
+            self.metrics.observe_reconnect(took, ok)
+        self.last_duration_s = took
+        self.total_duration_s += took
+        if took > self.max_duration_s:
+            self.max_duration_s = took
+
+    def stats(self) -> dict:
+        """Reconnect counters: attempts, outcomes, coalesced waiters, durations and circuit state."""
+        return {
+            "state": self.state,
+            "generation": self.generation,
+            "in_progress": self._inflight is not None,
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self._failures,
+            "coalesced_waiters": self.coalesced_waiters,
+            "circuit_opened": self.circuit_opened,
+            "last_duration_s": self.last_duration_s,
+            "max_duration_s": self.max_duration_s,
+            "avg_duration_s": self.total_duration_s / self.attempts if self.attempts else 0.0,
+            "last_error": self.last_error,
+        }
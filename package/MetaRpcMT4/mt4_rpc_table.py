@@ -0,0 +1,84 @@
+from operator import attrgetter
+from typing import Any, Callable, Optional
+
+import MetaRpcMT4.mt4_term_api_account_helper_pb2 as account_helper_pb2
+import MetaRpcMT4.mt4_term_api_market_info_pb2 as market_info_pb2
+from MetaRpcMT4.mt4_channel_pool import LANE_SHARED, LANE_TRADE
+
+
+_DATA = attrgetter("data")
+
+
+class RpcSpec:
+    """
+    Static description of one unary RPC used by MT4Account._invoke.
+
+    Attributes:
+        name (str): Unique key (also used to cache the bound stub method per sub-channel).
+        stub (str): Stub attribute of PooledChannel, e.g. "account_client".
+        method (str): RPC method on that stub, e.g. "AccountSummary".
+        lane (str): Channel pool lane the call is routed to.
+        data (Callable): Extracts the payload from the reply (default: `reply.data`).
+        request (Any, optional): Prebuilt request reused for calls without parameters.
+        hedgeable (bool): Read-only and idempotent, so it may be hedged (never on the trade lane).
+    """
+
+    __slots__ = ("name", "stub", "method", "lane", "data", "request", "hedgeable")
+
+    def __init__(
+        self,
+        name: str,
+        stub: str,
+        method: str,
+        lane: str = LANE_SHARED,
+        data: Callable[[Any], Any] = _DATA,
+        request: Optional[Any] = None,
+        hedgeable: bool = False,
+    ):
+        if hedgeable and lane == LANE_TRADE:
+            raise ValueError(f"{name}: trading RPCs must never be hedged")
+        self.name = name
+        self.stub = stub
+        self.method = method
+        self.lane = lane
+        self.data = data
+        self.request = request
+        self.hedgeable = hedgeable
+
+    def __repr__(self) -> str:
+        return f"RpcSpec({self.name!r}, {self.stub}.{self.method}, lane={self.lane!r})"
+
+
+# === Account helper ===
+ACCOUNT_SUMMARY = RpcSpec("account_summary", "account_client", "AccountSummary",
+                          request=account_helper_pb2.AccountSummaryRequest(), hedgeable=True)
+OPENED_ORDERS = RpcSpec("opened_orders", "account_client", "OpenedOrders", hedgeable=True)
+OPENED_ORDERS_TICKETS = RpcSpec("opened_orders_tickets", "account_client", "OpenedOrdersTickets",
+                                request=account_helper_pb2.OpenedOrdersTicketsRequest(), hedgeable=True)
+ORDERS_HISTORY = RpcSpec("orders_history", "account_client", "OrdersHistory")
+SYMBOL_PARAMS_MANY = RpcSpec("symbol_params_many", "account_client", "SymbolParamsMany", hedgeable=True)
+TICK_VALUE_WITH_SIZE = RpcSpec("tick_value_with_size", "account_client", "TickValueWithSize", hedgeable=True)
+
+# === Trading helper (dedicated trade lane) ===
+ORDER_SEND = RpcSpec("order_send", "trade_client", "OrderSend", lane=LANE_TRADE)
+ORDER_MODIFY = RpcSpec("order_modify", "trade_client", "OrderModify", lane=LANE_TRADE)
+ORDER_CLOSE_DELETE = RpcSpec("order_close_delete", "trade_client", "OrderCloseDelete", lane=LANE_TRADE)
+ORDER_CLOSE_BY = RpcSpec("order_close_by", "trade_client", "OrderCloseBy", lane=LANE_TRADE)
+
+# === Market info ===
+QUOTE = RpcSpec("quote", "market_info_client", "Quote", hedgeable=True)
+QUOTE_MANY = RpcSpec("quote_many", "market_info_client", "QuoteMany", hedgeable=True)
+SYMBOLS = RpcSpec("symbols", "market_info_client", "Symbols",
+                  request=market_info_pb2.SymbolsRequest(), hedgeable=True)
+QUOTE_HISTORY = RpcSpec("quote_history", "market_info_client", "QuoteHistory")
+
+
+RPC_TABLE: dict[str, RpcSpec] = {
+    spec.name: spec
+    for spec in (
+        ACCOUNT_SUMMARY, OPENED_ORDERS, OPENED_ORDERS_TICKETS, ORDERS_HISTORY,
+        SYMBOL_PARAMS_MANY, TICK_VALUE_WITH_SIZE,
+        ORDER_SEND, ORDER_MODIFY, ORDER_CLOSE_DELETE, ORDER_CLOSE_BY,
+        QUOTE, QUOTE_MANY, SYMBOLS, QUOTE_HISTORY,
+    )
+}
@@ -0,0 +1,241 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+
+# Stream activity kinds
+TICKS = "ticks"     # market data: rate learned from the stream itself, silent when the market is closed
+TIMER = "timer"     # server timer / pull interval: one message per period, market open or not
+EVENTS = "events"   # sporadic (on_trade): silence is normal, never treated as a stall
+
+# How often an unwatched tick stream (market closed) re-checks whether it should be watched
+_UNWATCHED_RECHECK_S = 60.0
+
+
+def fx_market_open(now: datetime) -> bool:
+    """Default market-hours model: the FX week, Sunday 21:00 UTC to Friday 22:00 UTC."""
+    wd, hour = now.weekday(), now.hour
+    if wd == 5:                      # Saturday
+        return False
+    if wd == 6:                      # Sunday
+        return hour >= 21
+    if wd == 4:                      # Friday
+        return hour < 22
+    return True
+
+
+# === Stall policy ===
+@dataclass
+class StallPolicy:
+    """
+    When MT4Account considers a server stream stalled (open, no error, no messages).
+
+    A stalled stream is cancelled and resubscribed (no reconnect); every further stall in a
+    row doubles the allowed silence, up to `max_timeout_s`.
+
+    Attributes:
+        enabled (bool): False turns stall detection off.
+        tick_initial_timeout_s (float): Allowed silence of a tick stream before its rate is known.
+        tick_gap_factor (float): Tick streams stall after this many average message gaps.
+        tick_min_timeout_s (float): Lower clamp for the learned tick timeout.
+        timer_periods (float): Timer streams stall after this many missed periods ...
+        timer_grace_s (float): ... plus this grace.
+        max_timeout_s (float): Upper clamp for every timeout.
+        market_open (Callable[[datetime], bool], optional): Market-hours model (UTC). Tick streams
+            are not watched while it returns False. Defaults to fx_market_open.
+    """
+    enabled: bool = True
+    tick_initial_timeout_s: float = 60.0
+    tick_gap_factor: float = 30.0
+    tick_min_timeout_s: float = 15.0
+    timer_periods: float = 5.0
+    timer_grace_s: float = 5.0
+    max_timeout_s: float = 600.0
+    market_open: Optional[Callable[[datetime], bool]] = None
+
+
+class StreamActivity:
+    """
+    Heartbeat of one open server stream and the silence currently tolerated for it.
+
+    arm() starts one timer per open call. The read path only records times (beat() on a
+    message, waiting() when it goes back to reading); the timer, when it fires, re-arms itself
+    for the remaining silence, so there is no timer work per message. Time spent downstream
+    between the two is not silence. Once the silence exceeds timeout_s() the timer calls
+    `on_stall` (the call's cancel()) and sets `fired`.
+    """
+
+    __slots__ = ("id", "name", "kind", "period_s", "opened", "last_message", "messages",
+                 "avg_gap_s", "stalls", "consecutive_stalls", "busy", "waiting_since", "fired",
+                 "_policy", "_handle", "_on_stall")
+
+    def __init__(self, id_: int, name: str, kind: str, period_s: Optional[float], policy: StallPolicy):
+        self.id = id_
+        self.name = name
+        self.kind = kind
+        self.period_s = period_s
+        self._policy = policy
+        self.opened = time.monotonic()
+        self.last_message: Optional[float] = None
+        self.messages = 0
+        self.avg_gap_s: Optional[float] = None    # EWMA of the gap between messages
+        self.stalls = 0
+        self.consecutive_stalls = 0
+        self.busy = False          # a message is being handled downstream: not silence
+        self.waiting_since = self.opened
+        self.fired = False         # the current call was cancelled as stalled
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._on_stall: Optional[Callable[[], Any]] = None
+
+    def beat(self) -> None:
+        now = time.monotonic()
+        if self.last_message is not None:
+            gap = now - self.last_message
+            self.avg_gap_s = gap if self.avg_gap_s is None else self.avg_gap_s + 0.1 * (gap - self.avg_gap_s)
+        self.last_message = now
+        self.messages += 1
+        self.consecutive_stalls = 0
+        self.busy = True
+
+    def waiting(self) -> None:
+        """The stream loop is back to reading the next message."""
+        self.busy = False
+        self.waiting_since = time.monotonic()
+
+    def resubscribed(self) -> None:
+        """Records a stall; the silence clock restarts with the new subscription."""
+        self.stalls += 1
+        self.consecutive_stalls += 1
+        self.opened = time.monotonic()
+        self.last_message = None
+
+    def staleness_s(self, now: Optional[float] = None) -> float:
+        """Seconds since the last message (or since the stream was opened)."""
+        now = time.monotonic() if now is None else now
+        return now - (self.last_message if self.last_message is not None else self.opened)
+
+    def timeout_s(self) -> Optional[float]:
+        """Silence after which the stream counts as stalled; None = don't watch right now."""
+        p = self._policy
+        if not p.enabled or self.kind == EVENTS:
+            return None
+        if self.kind == TIMER:
+            if not self.period_s:
+                return None
+            base = p.timer_periods * self.period_s + p.timer_grace_s
+        else:
+            market_open = p.market_open or fx_market_open
+            if not market_open(datetime.now(timezone.utc)):
+                return None
+            if self.avg_gap_s is None:
+                base = p.tick_initial_timeout_s
+            else:
+                base = max(p.tick_min_timeout_s, p.tick_gap_factor * self.avg_gap_s)
+        return min(p.max_timeout_s, base * (2 ** self.consecutive_stalls))
+
+    def watched(self) -> bool:
+        """False when this stream can never stall (watchdog off, event stream, timer without period)."""
+        p = self._policy
+        return p.enabled and self.kind != EVENTS and not (self.kind == TIMER and not self.period_s)
+
+    def arm(self, on_stall: Callable[[], Any]) -> None:
+        """Starts watching the call just opened; `on_stall` cancels it."""
+        self.disarm()
+        self.fired = False
+        self.busy = False
+        self.waiting_since = time.monotonic()
+        if not self.watched():
+            return
+        self._on_stall = on_stall
+        self._schedule(self.timeout_s())
+
+    def disarm(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._on_stall = None
+
+    def _schedule(self, delay: Optional[float]) -> None:
+        loop = asyncio.get_running_loop()
+        self._handle = loop.call_later(_UNWATCHED_RECHECK_S if delay is None else delay, self._check)
+
+    def _check(self) -> None:
+        self._handle = None
+        if self._on_stall is None:
+            return
+        timeout = self.timeout_s()
+        if timeout is None:
+            self._schedule(None)                    # market closed: look again later
+            return
+        if self.busy:
+            self._schedule(timeout)                 # consumer still handling the last message
+            return
+        remaining = timeout - (time.monotonic() - self.waiting_since)
+        if remaining > 0:
+            self._schedule(remaining)
+            return
+        on_stall, self._on_stall = self._on_stall, None
+        self.fired = True
+        on_stall()
+
+    def as_dict(self) -> dict:
+        timeout = self.timeout_s()
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "messages": self.messages,
+            "staleness_s": round(self.staleness_s(), 3),
+            "avg_gap_s": None if self.avg_gap_s is None else round(self.avg_gap_s, 4),
+            "timeout_s": None if timeout is None else round(timeout, 3),
+            "stalls": self.stalls,
+        }
+
+
+class StallWatchdog:
+    """Tracks every open stream of one MT4Account and publishes their staleness."""
+
+    def __init__(self, policy: Optional[StallPolicy] = None, metrics: Optional[Any] = None):
+        self.policy = policy or StallPolicy()
+        self.metrics = metrics
+        self._active: Dict[int, StreamActivity] = {}
+        self._ids = itertools.count(1)
+        # stats
+        self.stalls = 0
+
+    def track(self, name: str, kind: str, period_s: Optional[float] = None) -> StreamActivity:
+        act = StreamActivity(next(self._ids), name, kind, period_s, self.policy)
+        self._active[act.id] = act
+        return act
+
+    def untrack(self, act: StreamActivity) -> None:
+        self._active.pop(act.id, None)
+        if self.metrics is not None and not any(a.name == act.name for a in self._active.values()):
+            self.metrics.set_gauge("stream_staleness_seconds", 0.0, stream=act.name)
+
+    def stalled(self, act: StreamActivity) -> None:
+        """Called by the stream loop right before it resubscribes a stalled stream."""
+        self.stalls += 1
+        act.resubscribed()
+        if self.metrics is not None:
+            self.metrics.inc("stream_stalls_total", stream=act.name)
+
+    def publish(self) -> None:
+        """Sets the stream_staleness_seconds gauge (worst open stream per name)."""
+        if self.metrics is None:
+            return
+        now = time.monotonic()
+        worst: Dict[str, float] = {}
+        for act in list(self._active.values()):
+            worst[act.name] = max(worst.get(act.name, 0.0), act.staleness_s(now))
+        for name, value in worst.items():
+            self.metrics.set_gauge("stream_staleness_seconds", round(value, 3), stream=name)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.policy.enabled,
+            "stalls": self.stalls,
+            "streams": [act.as_dict() for act in list(self._active.values())],
+        }